@@ -56,7 +56,7 @@ class RiskAssessor:
             risk_assessment = {}
             
             for symbol, data in market_data.items():
-                if 'ohlcv' not in data or '1h' not in data['ohlcv'] or not data['ohlcv']['1h']:
+                if 'ohlcv' not in data or '1h' not in data['ohlcv'] or len(data['ohlcv']['1h']) == 0:
                     logger.warning(f"No OHLCV data for {symbol}")
                     continue
                 
@@ -2,12 +2,16 @@
 Sentiment Analyzer - Elemzi a piaci hangulatot különböző forrásokból.
 """
 import logging
+import os
+import pickle
+from collections import OrderedDict
+from hashlib import blake2b
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime
 import re
-import random  # Csak a példa implementációhoz
+import time
 
 from src.utils.logger import setup_logger
 
@@ -18,6 +22,10 @@ class SentimentAnalyzer:
     Elemzi a piaci hangulatot különböző forrásokból, mint hírek, közösségi média és piaci adatok.
     """
     
+    # Példa implementáció véletlen tényezőinek tartománya forrásonként
+    # (hírek, közösségi média, piaci adatok)
+    RANDOM_FACTOR_RANGES = np.array([0.5, 0.6, 0.4])
+    
     def __init__(self, config: Dict):
         """
         Inicializálja a SentimentAnalyzer-t a megadott konfigurációval.
@@ -27,7 +35,8 @@ class SentimentAnalyzer:
         """
         self.config = config
         self.is_running = False
-        self.last_update_time = None
+        self.last_update_time = None  # Csak megjelenítéshez
+        self._last_update_mono = None  # Frissítési ellenőrzéshez (time.monotonic)
         
         # Konfigurációs beállítások
         self.update_interval = config.get('update_interval', 3600)  # másodperc
@@ -41,6 +50,14 @@ class SentimentAnalyzer:
         self.max_sources = config.get('max_sources', 3)  # Korlátozott források száma
         self.max_history = config.get('max_history', 24)  # Korlátozott előzmények
         
+        # Véletlenszám generátor a példa implementációhoz (kötegelt húzásokkal)
+        self._rng = np.random.default_rng()
+        
+        # Szöveg sentiment cache: blake2b(szöveg) -> sentiment érték (LRU)
+        self.text_cache_size = config.get('text_cache_size', 100000)
+        self.text_cache_file = config.get('text_cache_file', os.path.join('data', 'sentiment_cache.pkl'))
+        self._text_cache = self._load_text_cache()
+        
         logger.info("SentimentAnalyzer initialized")
     
     def start(self) -> bool:
@@ -78,6 +95,7 @@ class SentimentAnalyzer:
         
         try:
             self.is_running = False
+            self._save_text_cache()
             logger.info("SentimentAnalyzer stopped successfully")
             return True
         
@@ -96,18 +114,23 @@ class SentimentAnalyzer:
             
             logger.info("Updating sentiment data")
             
-            for symbol in self.symbols:
+            # Példa implementáció: az összes véletlen tényező egyetlen kötegelt húzással
+            # (oszlopok: hírek, közösségi média, piaci adatok; forrásonkénti tartománnyal)
+            draws = self._rng.uniform(-1.0, 1.0, size=(len(self.symbols), 3)) * self.RANDOM_FACTOR_RANGES
+            
+            for i, symbol in enumerate(self.symbols):
                 # Frissíti a sentiment adatokat minden forrásból
                 source_sentiments = {}
+                news_factor, social_media_factor, market_data_factor = draws[i]
                 
                 if 'news' in self.sources:
-                    source_sentiments['news'] = self._analyze_news_sentiment(symbol)
+                    source_sentiments['news'] = self._analyze_news_sentiment(symbol, news_factor)
                 
                 if 'social_media' in self.sources:
-                    source_sentiments['social_media'] = self._analyze_social_media_sentiment(symbol)
+                    source_sentiments['social_media'] = self._analyze_social_media_sentiment(symbol, social_media_factor)
                 
                 if 'market_data' in self.sources:
-                    source_sentiments['market_data'] = self._analyze_market_data_sentiment(symbol)
+                    source_sentiments['market_data'] = self._analyze_market_data_sentiment(symbol, market_data_factor)
                 
                 # Kiszámítja az átlagos sentiment-et
                 overall_sentiment = sum(source_sentiments.values()) / len(source_sentiments) if source_sentiments else 0.0
@@ -120,29 +143,34 @@ class SentimentAnalyzer:
                 }
             
             self.last_update_time = datetime.now()
+            self._last_update_mono = time.monotonic()
             logger.info("Sentiment data updated successfully")
         
         except Exception as e:
             logger.error(f"Error updating sentiment data: {str(e)}")
     
-    def _analyze_news_sentiment(self, symbol: str) -> float:
+    def _analyze_news_sentiment(self, symbol: str, random_factor: float = 0.0) -> float:
         """
         Elemzi a hírek hangulatát egy adott szimbólumra.
         
         Args:
             symbol: A szimbólum (pl. BTC)
+            random_factor: A példa implementáció véletlen tényezője
             
         Returns:
             float: A sentiment érték (-1.0 és 1.0 között)
         """
         try:
             # Valós implementációban itt lenne a hírek lekérdezése és elemzése
-            # Most csak egy példa implementációt adunk
+            headlines = self._fetch_news_headlines(symbol)
             
-            # Példa: véletlenszerű sentiment érték, de a BTC általában pozitívabb
-            base_sentiment = 0.2 if symbol == 'BTC' else (0.1 if symbol == 'ETH' else 0.0)
-            random_factor = random.uniform(-0.5, 0.5)
-            sentiment = base_sentiment + random_factor
+            if headlines:
+                # A már látott címek értékét a cache-ből vesszük
+                sentiment = sum(self._get_text_sentiment(headline) for headline in headlines) / len(headlines)
+            else:
+                # Példa: véletlenszerű sentiment érték, de a BTC általában pozitívabb
+                base_sentiment = 0.2 if symbol == 'BTC' else (0.1 if symbol == 'ETH' else 0.0)
+                sentiment = base_sentiment + random_factor
             
             # Korlátozza a sentiment értéket -1.0 és 1.0 közé
             sentiment = max(-1.0, min(1.0, sentiment))
@@ -154,12 +182,109 @@ class SentimentAnalyzer:
             logger.error(f"Error analyzing news sentiment for {symbol}: {str(e)}")
             return 0.0
     
-    def _analyze_social_media_sentiment(self, symbol: str) -> float:
+    def _fetch_news_headlines(self, symbol: str) -> List[str]:
+        """
+        Lekéri a friss hírek címeit egy adott szimbólumra.
+        
+        Args:
+            symbol: A szimbólum (pl. BTC)
+            
+        Returns:
+            List[str]: A hírek címei
+        """
+        # Valós implementációban itt lenne a hírforrások lekérdezése
+        return []
+    
+    def _get_text_sentiment(self, text: str) -> float:
+        """
+        Visszaadja egy szöveg sentiment értékét, a már elemzett szövegeket a cache-ből.
+        
+        Args:
+            text: Az elemzendő szöveg
+            
+        Returns:
+            float: A sentiment érték (-1.0 és 1.0 között)
+        """
+        key = blake2b(text.encode('utf-8'), digest_size=8).digest()
+        
+        sentiment = self._text_cache.get(key)
+        if sentiment is not None:
+            self._text_cache.move_to_end(key)
+            return sentiment
+        
+        sentiment = self._score_text(text)
+        self._text_cache[key] = sentiment
+        
+        if len(self._text_cache) > self.text_cache_size:
+            self._text_cache.popitem(last=False)
+        
+        return sentiment
+    
+    def _score_text(self, text: str) -> float:
+        """
+        Kiszámítja egy szöveg sentiment értékét.
+        
+        Args:
+            text: Az elemzendő szöveg
+            
+        Returns:
+            float: A sentiment érték (-1.0 és 1.0 között)
+        """
+        # Valós implementációban itt lenne az NLP modell futtatása
+        # Most csak egy egyszerű kulcsszó alapú példa implementációt adunk
+        positive_words = {'bull', 'bullish', 'rally', 'surge', 'gain', 'growth', 'adoption', 'record', 'up'}
+        negative_words = {'bear', 'bearish', 'crash', 'drop', 'loss', 'hack', 'ban', 'fraud', 'down'}
+        
+        words = re.findall(r'[a-z]+', text.lower())
+        positive = sum(1 for word in words if word in positive_words)
+        negative = sum(1 for word in words if word in negative_words)
+        
+        if positive + negative == 0:
+            return 0.0
+        
+        return (positive - negative) / (positive + negative)
+    
+    def _load_text_cache(self) -> OrderedDict:
+        """
+        Betölti a szöveg sentiment cache-t a lemezről.
+        
+        Returns:
+            OrderedDict: A betöltött cache, vagy üres cache ha nem létezik
+        """
+        try:
+            if os.path.exists(self.text_cache_file):
+                with open(self.text_cache_file, 'rb') as f:
+                    cache = pickle.load(f)
+                logger.info(f"Loaded {len(cache)} cached text sentiments")
+                return OrderedDict(cache)
+        
+        except Exception as e:
+            logger.error(f"Error loading sentiment cache: {str(e)}")
+        
+        return OrderedDict()
+    
+    def _save_text_cache(self) -> None:
+        """
+        Elmenti a szöveg sentiment cache-t a lemezre.
+        """
+        try:
+            if not self._text_cache:
+                return
+            
+            os.makedirs(os.path.dirname(self.text_cache_file) or '.', exist_ok=True)
+            with open(self.text_cache_file, 'wb') as f:
+                pickle.dump(self._text_cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        except Exception as e:
+            logger.error(f"Error saving sentiment cache: {str(e)}")
+    
+    def _analyze_social_media_sentiment(self, symbol: str, random_factor: float = 0.0) -> float:
         """
         Elemzi a közösségi média hangulatát egy adott szimbólumra.
         
         Args:
             symbol: A szimbólum (pl. BTC)
+            random_factor: A példa implementáció véletlen tényezője
             
         Returns:
             float: A sentiment érték (-1.0 és 1.0 között)
@@ -170,7 +295,6 @@ class SentimentAnalyzer:
             
             # Példa: véletlenszerű sentiment érték, de az ETH általában pozitívabb a közösségi médiában
             base_sentiment = 0.1 if symbol == 'BTC' else (0.3 if symbol == 'ETH' else 0.0)
-            random_factor = random.uniform(-0.6, 0.6)
             sentiment = base_sentiment + random_factor
             
             # Korlátozza a sentiment értéket -1.0 és 1.0 közé
@@ -183,12 +307,13 @@ class SentimentAnalyzer:
             logger.error(f"Error analyzing social media sentiment for {symbol}: {str(e)}")
             return 0.0
     
-    def _analyze_market_data_sentiment(self, symbol: str) -> float:
+    def _analyze_market_data_sentiment(self, symbol: str, random_factor: float = 0.0) -> float:
         """
         Elemzi a piaci adatok hangulatát egy adott szimbólumra.
         
         Args:
             symbol: A szimbólum (pl. BTC)
+            random_factor: A példa implementáció véletlen tényezője
             
         Returns:
             float: A sentiment érték (-1.0 és 1.0 között)
@@ -199,7 +324,6 @@ class SentimentAnalyzer:
             
             # Példa: véletlenszerű sentiment érték, de az ADA általában pozitívabb a piaci adatok alapján
             base_sentiment = 0.0 if symbol == 'BTC' else (0.1 if symbol == 'ETH' else 0.2)
-            random_factor = random.uniform(-0.4, 0.4)
             sentiment = base_sentiment + random_factor
             
             # Korlátozza a sentiment értéket -1.0 és 1.0 közé
@@ -227,7 +351,7 @@ class SentimentAnalyzer:
             return None
         
         # Ellenőrzi, hogy frissíteni kell-e a sentiment adatokat
-        if self.last_update_time is None or (datetime.now() - self.last_update_time).total_seconds() >= self.update_interval:
+        if self._last_update_mono is None or time.monotonic() - self._last_update_mono >= self.update_interval:
             self._update_sentiment()
         
         if symbol in self.sentiment_data:
@@ -248,7 +372,7 @@ class SentimentAnalyzer:
             return {}
         
         # Ellenőrzi, hogy frissíteni kell-e a sentiment adatokat
-        if self.last_update_time is None or (datetime.now() - self.last_update_time).total_seconds() >= self.update_interval:
+        if self._last_update_mono is None or time.monotonic() - self._last_update_mono >= self.update_interval:
             self._update_sentiment()
         
         return self.sentiment_data
@@ -265,7 +389,7 @@ class SentimentAnalyzer:
             return {}
         
         # Ellenőrzi, hogy frissíteni kell-e a sentiment adatokat
-        if self.last_update_time is None or (datetime.now() - self.last_update_time).total_seconds() >= self.update_interval:
+        if self._last_update_mono is None or time.monotonic() - self._last_update_mono >= self.update_interval:
             self._update_sentiment()
         
         summary = {}
@@ -3,11 +3,39 @@ Backtest Engine - Backtesting motor
 """
 import pandas as pd
 import numpy as np
+import functools
 import json
 import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import logging
 
+from database.ohlcv_store import OHLCVStore
+
+# Kereskedések rekord típusa (előre lefoglalt strukturált tömbhöz)
+TRADE_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ns]'),
+    ('side', 'U4'),
+    ('price', 'f8'),
+    ('amount', 'f8'),
+    ('commission', 'f8'),
+    ('profit_loss', 'f8'),
+    ('profit_loss_pct', 'f8'),
+    ('balance_after', 'f8'),
+    ('equity_after', 'f8')
+])
+
+# OHLCV oszlopok és a stratégiáknak átadott könnyű sor típus
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+Bar = namedtuple('Bar', OHLCV_COLUMNS)
+
+# Időkeret egységek másodpercben (pl. 15m, 4h, 1d)
+_TIMEFRAME_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# Báronként várható maximális jelszám (a kereskedés tömb előfoglalásához)
+MAX_SIGNALS_PER_BAR = 2
+
 class BacktestEngine:
     """
     Backtesting motor a stratégiák teszteléséhez
@@ -49,21 +77,28 @@ class BacktestEngine:
             bool: Sikeres-e a betöltés
         """
         try:
-            # Adatok elérési útja
-            data_file = os.path.join('data', 'price_data', f'{self.symbol.replace("/", "_")}_{self.timeframe}.csv')
+            # Adatok elérési útja (Parquet előnyben, CSV tartalékként)
+            base_path = os.path.join('data', 'price_data', f'{self.symbol.replace("/", "_")}_{self.timeframe}')
+            data_file = base_path + '.parquet'
             
             if not os.path.exists(data_file):
-                self.logger.error(f"Adatfájl nem található: {data_file}")
-                return False
+                data_file = base_path + '.csv'
             
-            # Adatok betöltése
-            self.data = pd.read_csv(data_file)
+            if not os.path.exists(data_file):
+                # Tartalékként az oszlopos OHLCV tároló (float32 árak, így az eredmények
+                # kis mértékben eltérhetnek az adatfájlból futtatott backtesttől)
+                return self._load_from_store(data_file)
             
-            # Dátum oszlop konvertálása
-            self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
+            # Adatok betöltése (folyamaton belül gyorsítótárazva, így a paraméter
+            # sweep-ek nem olvassák és parse-olják újra ugyanazt a fájlt; a módosítási
+            # idő a kulcs része, így a frissített fájl újra betöltődik)
+            data = _cached_load(data_file, os.stat(data_file).st_mtime_ns)
             
-            # Adatok szűrése a megadott időszakra
-            self.data = self.data[(self.data['timestamp'] >= self.start_date) & (self.data['timestamp'] <= self.end_date)]
+            # Adatok szűrése a megadott időszakra (rendezett idősoron bináris kereséssel)
+            timestamps = data['timestamp']
+            start = timestamps.searchsorted(pd.Timestamp(self.start_date), side='left')
+            end = timestamps.searchsorted(pd.Timestamp(self.end_date), side='right')
+            self.data = data.iloc[start:end].copy()
             
             if len(self.data) == 0:
                 self.logger.error(f"Nincs adat a megadott időszakra: {self.start_date} - {self.end_date}")
@@ -76,6 +111,31 @@ class BacktestEngine:
             self.logger.error(f"Hiba az adatok betöltése során: {e}")
             return False
     
+    def _load_from_store(self, data_file):
+        """
+        Adatok betöltése az oszlopos OHLCV tárolóból (ha nincs árfolyam adatfájl)
+        
+        Args:
+            data_file (str): A hiányzó adatfájl elérési útja (a naplózáshoz)
+        
+        Returns:
+            bool: Sikeres-e a betöltés
+        """
+        stored = OHLCVStore().read(self.symbol, self.timeframe, self.start_date, self.end_date)
+        if stored is None:
+            self.logger.error(f"Adatfájl nem található: {data_file}")
+            return False
+        
+        self.data = stored
+        
+        if _covers_period(stored['timestamp'], self.start_date, self.end_date, self.timeframe):
+            self.logger.info(f"Adatok betöltve a tárolóból: {len(self.data)} sor")
+        else:
+            # Hiányos lefedettség esetén a backtest csak a tárolt időszakra fut
+            self.logger.warning(f"Adatfájl nem található ({data_file}), a tároló hiányos adatai "
+                                f"kerülnek felhasználásra: {len(self.data)} sor")
+        return True
+    
     def initialize_strategy(self, config=None):
         """
         Stratégia inicializálása
@@ -114,10 +174,15 @@ class BacktestEngine:
             self.logger.error(f"Hiba a stratégia inicializálása során: {e}")
             return False
     
-    def run_backtest(self):
+    def run_backtest(self, include_curves=True):
         """
         Backtest futtatása
         
+        Args:
+            include_curves (bool): Egyenleg és drawdown görbék összeállítása
+                (paraméter sweep-eknél kikapcsolható, ha csak az összesítő
+                metrikák kellenek)
+        
         Returns:
             dict: Backtest eredmények
         """
@@ -164,58 +229,49 @@ class BacktestEngine:
             equity_curve = []
             drawdown_curve = []
             max_equity = balance
+            max_drawdown = 0.0
+            max_drawdown_pct = 0.0
             
-            # Kereskedések
-            trades = []
+            # Kereskedések (előre lefoglalt strukturált tömb, index alapú írással)
+            trades = np.empty(max(len(self.data) * MAX_SIGNALS_PER_BAR, 1), dtype=TRADE_DTYPE)
+            t_idx = 0
             
             # Backtest futtatása
-            for i, row in self.data.iterrows():
+            # itertuples sima tuple-öket ad vissza, így nem jön létre soronként Series
+            for values in self.data[OHLCV_COLUMNS].itertuples(index=False, name=None):
+                timestamp, open_, high, low, close, volume = values
+                
                 # Stratégia futtatása az aktuális adatokon
-                signals = self.strategy.generate_signals(row)
+                signals = self.strategy.generate_signals(Bar._make(values))
                 
                 # Kereskedések végrehajtása
                 for signal in signals:
-                    # Kereskedés létrehozása
-                    trade = {
-                        'timestamp': row['timestamp'],
-                        'symbol': self.symbol,
-                        'side': signal['side'],
-                        'price': row['close'],
-                        'amount': signal['amount'],
-                        'commission': signal['amount'] * row['close'] * self.commission / 100,
-                        'profit_loss': 0.0,
-                        'profit_loss_pct': 0.0,
-                        'balance_after': 0.0,
-                        'equity_after': 0.0
-                    }
+                    price = close
+                    amount = signal['amount']
+                    commission = amount * price * self.commission / 100
                     
                     # Kereskedés végrehajtása
+                    # (a profit/veszteség a ciklus után, FIFO párosítással számolódik)
                     if signal['side'] == 'buy':
                         # Vásárlás
-                        cost = trade['amount'] * trade['price'] + trade['commission']
+                        cost = amount * price + commission
                         balance -= cost
                     else:
                         # Eladás
-                        revenue = trade['amount'] * trade['price'] - trade['commission']
+                        revenue = amount * price - commission
                         balance += revenue
-                        
-                        # Profit/veszteség számítása
-                        trade['profit_loss'] = revenue - (trade['amount'] * signal['entry_price'])
-                        trade['profit_loss_pct'] = trade['profit_loss'] / (trade['amount'] * signal['entry_price']) * 100
                     
                     # Egyenleg és equity frissítése
-                    trade['balance_after'] = balance
                     equity = balance
-                    trade['equity_after'] = equity
+                    
+                    # Tömb bővítése, ha a becsült méret kevésnek bizonyul
+                    if t_idx >= len(trades):
+                        trades = np.concatenate([trades, np.empty(len(trades), dtype=TRADE_DTYPE)])
                     
                     # Kereskedés hozzáadása
-                    trades.append(trade)
-                
-                # Egyenleg görbe frissítése
-                equity_curve.append({
-                    'timestamp': row['timestamp'],
-                    'equity': equity
-                })
+                    trades[t_idx] = (timestamp, signal['side'], price, amount, commission,
+                                     0.0, 0.0, balance, equity)
+                    t_idx += 1
                 
                 # Max equity frissítése
                 if equity > max_equity:
@@ -225,12 +281,24 @@ class BacktestEngine:
                 drawdown = max_equity - equity
                 drawdown_pct = drawdown / max_equity * 100
                 
-                # Drawdown görbe frissítése
-                drawdown_curve.append({
-                    'timestamp': row['timestamp'],
-                    'drawdown': drawdown,
-                    'drawdown_pct': drawdown_pct
-                })
+                # Max drawdown frissítése
+                if drawdown > max_drawdown:
+                    max_drawdown = drawdown
+                    max_drawdown_pct = drawdown_pct
+                
+                if include_curves:
+                    # Egyenleg görbe frissítése
+                    equity_curve.append({
+                        'timestamp': timestamp,
+                        'equity': equity
+                    })
+                    
+                    # Drawdown görbe frissítése
+                    drawdown_curve.append({
+                        'timestamp': timestamp,
+                        'drawdown': drawdown,
+                        'drawdown_pct': drawdown_pct
+                    })
             
             # Eredmények számítása
             results['final_balance'] = balance
@@ -238,43 +306,47 @@ class BacktestEngine:
             results['profit_loss_pct'] = results['profit_loss'] / self.initial_balance * 100
             
             # Max drawdown
-            max_drawdown_record = max(drawdown_curve, key=lambda x: x['drawdown'])
-            results['max_drawdown'] = max_drawdown_record['drawdown']
-            results['max_drawdown_pct'] = max_drawdown_record['drawdown_pct']
+            results['max_drawdown'] = max_drawdown
+            results['max_drawdown_pct'] = max_drawdown_pct
+            
+            # Profit/veszteség számítása FIFO párosítással, vektorizáltan
+            trades = trades[:t_idx]
+            trades['profit_loss'], trades['profit_loss_pct'] = _fifo_profit_loss(
+                trades['side'] == 'buy', trades['price'], trades['amount'], trades['commission'])
             
-            # Kereskedési statisztikák
-            results['total_trades'] = len(trades)
-            results['winning_trades'] = len([t for t in trades if t['profit_loss'] > 0])
-            results['losing_trades'] = len([t for t in trades if t['profit_loss'] < 0])
+            # Kereskedések DataFrame-mé alakítása
+            trades_df = pd.DataFrame(trades)
+            trades_df.insert(1, 'symbol', self.symbol)
+            profit_loss = trades_df['profit_loss']
+            
+            # Kereskedési statisztikák egyetlen aggregációval
+            # (előjel szerint csoportosítva, a nulla PnL-ű vásárlások külön csoportba kerülnek)
+            stats = profit_loss.groupby(np.sign(profit_loss)).agg(['sum', 'mean', 'count'])
+            stats = stats.reindex([1.0, -1.0], fill_value=0)
+            
+            results['total_trades'] = len(trades_df)
+            results['winning_trades'] = int(stats.loc[1.0, 'count'])
+            results['losing_trades'] = int(stats.loc[-1.0, 'count'])
             
             if results['total_trades'] > 0:
                 results['win_rate'] = results['winning_trades'] / results['total_trades'] * 100
             
             # Átlagos profit és veszteség
-            winning_trades = [t for t in trades if t['profit_loss'] > 0]
-            losing_trades = [t for t in trades if t['profit_loss'] < 0]
-            
-            if len(winning_trades) > 0:
-                results['avg_profit'] = sum([t['profit_loss'] for t in winning_trades]) / len(winning_trades)
-            
-            if len(losing_trades) > 0:
-                results['avg_loss'] = sum([t['profit_loss'] for t in losing_trades]) / len(losing_trades)
+            results['avg_profit'] = float(stats.loc[1.0, 'mean'])
+            results['avg_loss'] = float(stats.loc[-1.0, 'mean'])
             
             # Profit faktor
-            total_profit = sum([t['profit_loss'] for t in winning_trades])
-            total_loss = sum([t['profit_loss'] for t in losing_trades])
-            
-            if total_loss != 0:
-                results['profit_factor'] = abs(total_profit / total_loss)
+            if stats.loc[-1.0, 'sum'] != 0:
+                results['profit_factor'] = abs(float(stats.loc[1.0, 'sum'] / stats.loc[-1.0, 'sum']))
             
             # Görbék
             results['equity_curve'] = equity_curve
             results['drawdown_curve'] = drawdown_curve
-            results['trades'] = trades
+            results['trades'] = trades_df
             
             # Eredmények mentése
             self.results = results
-            self.trades = trades
+            self.trades = trades_df
             
             self.logger.info(f"Backtest befejezve. Eredmény: {results['profit_loss_pct']:.2f}%")
             
@@ -313,7 +385,7 @@ class BacktestEngine:
             
             # Eredmények mentése
             with open(filepath, 'w') as f:
-                json.dump(self.results, f, indent=4, default=str)
+                json.dump(self.results, f, indent=4, default=_json_default)
             
             self.logger.info(f"Eredmények mentve: {filepath}")
             
@@ -322,3 +394,202 @@ class BacktestEngine:
         except Exception as e:
             self.logger.error(f"Hiba az eredmények mentése során: {e}")
             return False
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_load(data_file, mtime_ns):
+    """
+    Árfolyam adatfájl betöltése gyorsítótárazással
+    
+    A betöltött DataFrame modul szinten marad, így az azonos fájlt használó
+    backtestek (és fork-olt munkafolyamatok) osztoznak rajta. A visszaadott
+    DataFrame-et nem szabad módosítani.
+    
+    Args:
+        data_file (str): Adatfájl elérési útja (.parquet vagy .csv)
+        mtime_ns (int): A fájl módosítási ideje (csak a gyorsítótár kulcsához)
+    
+    Returns:
+        pd.DataFrame: Időbélyeg szerint rendezett árfolyam adatok
+    """
+    if data_file.endswith('.parquet'):
+        data = pd.read_parquet(data_file, memory_map=True)
+    else:
+        data = pd.read_csv(data_file)
+    
+    # Dátum oszlop konvertálása
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    
+    return data.sort_values('timestamp', ignore_index=True)
+
+def _covers_period(timestamps, start_date, end_date, timeframe):
+    """
+    Lefedik-e a gyertyák hézag nélkül a megadott időszakot
+    
+    Az időszak elején és végén legfeljebb egy gyertyányi hiány megengedett;
+    belül a szomszédos gyertyák távolsága legfeljebb egy nap (vagy egy
+    gyertya, ha az hosszabb) lehet, így egy kimaradt napi partíció is kiderül.
+    
+    Args:
+        timestamps (pd.Series): Rendezett időbélyegek
+        start_date (datetime): Kezdő időpont
+        end_date (datetime): Végső időpont
+        timeframe (str): Időkeret (pl. 1m, 4h, 1d)
+    
+    Returns:
+        bool: Lefedett-e az időszak
+    """
+    step = _TIMEFRAME_UNITS.get(timeframe[-1:])
+    if step is None or not timeframe[:-1].isdigit():
+        return False
+    
+    step = pd.Timedelta(seconds=int(timeframe[:-1]) * step)
+    max_gap = max(step, pd.Timedelta(days=1))
+    
+    if timestamps.iloc[0] > pd.Timestamp(start_date) + step or timestamps.iloc[-1] < pd.Timestamp(end_date) - step:
+        return False
+    
+    return len(timestamps) < 2 or timestamps.diff().max() <= max_gap
+
+def _fifo_profit_loss(is_buy, prices, amounts, commissions):
+    """
+    Eladások profit/veszteségének számítása FIFO párosítással
+    
+    Minden eladás a legrégebbi, még el nem adott vásárlási tételekkel párosul.
+    A párosítás a kumulált vásárolt és eladott mennyiségeken végzett bináris
+    kereséssel történik, így nincs szükség a stratégiák által követett
+    belépési árra. A vásárlási jutalék a bekerülési érték része. Az eladáskor
+    rendelkezésre álló készletet meghaladó mennyiség (fedezetlen eladás) az
+    eladási áron kerül be, így arra nem jut profit.
+    
+    Args:
+        is_buy (np.ndarray): Vásárlás-e a kereskedés (bool)
+        prices (np.ndarray): Kereskedési árak
+        amounts (np.ndarray): Kereskedési mennyiségek
+        commissions (np.ndarray): Jutalékok
+        
+    Returns:
+        tuple: (profit_loss, profit_loss_pct) tömbök, vásárlásoknál 0
+    """
+    profit_loss = np.zeros(len(prices))
+    profit_loss_pct = np.zeros(len(prices))
+    
+    is_sell = ~is_buy
+    if not is_sell.any():
+        return profit_loss, profit_loss_pct
+    
+    # Vásárlási tételek kumulált mennyisége és bekerülési értéke
+    buy_amounts = amounts[is_buy]
+    buy_costs = buy_amounts * prices[is_buy] + commissions[is_buy]
+    cum_buy_amount = np.concatenate(([0.0], np.cumsum(buy_amounts)))
+    cum_buy_cost = np.concatenate(([0.0], np.cumsum(buy_costs)))
+    unit_cost = np.append(np.divide(buy_costs, buy_amounts, out=np.zeros(len(buy_amounts)), where=buy_amounts > 0), 0.0)
+    
+    def cost_of_first(quantity):
+        # Az első `quantity` egységnyi vásárolt mennyiség bekerülési értéke
+        lot = np.maximum(np.searchsorted(cum_buy_amount, quantity, side='left'), 1)
+        return cum_buy_cost[lot - 1] + (quantity - cum_buy_amount[lot - 1]) * unit_cost[lot - 1]
+    
+    # Eladáskor rendelkezésre álló (addig vásárolt) mennyiség
+    available = np.cumsum(np.where(is_buy, amounts, 0.0))[is_sell]
+    
+    # Párosított (vásárlással fedezett) kumulált eladott mennyiség: m_i = min(m_{i-1} + s_i, B_i).
+    # Zárt alakban S_i + min(0, min_{j<=i}(B_j - S_j)), így a fedezetlen mennyiség nem
+    # fogyasztja el a későbbi vásárlási tételeket
+    sell_prices = prices[is_sell]
+    sell_amounts = amounts[is_sell]
+    cum_sell = np.cumsum(sell_amounts)
+    matched_end = cum_sell + np.minimum(0.0, np.minimum.accumulate(available - cum_sell))
+    matched_start = np.concatenate(([0.0], matched_end[:-1]))
+    unmatched = sell_amounts - (matched_end - matched_start)
+    
+    cost = cost_of_first(matched_end) - cost_of_first(matched_start) + unmatched * sell_prices
+    revenue = sell_amounts * sell_prices - commissions[is_sell]
+    
+    sell_profit_loss = revenue - cost
+    profit_loss[is_sell] = sell_profit_loss
+    profit_loss_pct[is_sell] = np.divide(sell_profit_loss, cost, out=np.zeros(len(cost)), where=cost > 0) * 100
+    
+    return profit_loss, profit_loss_pct
+
+def _json_default(obj):
+    """
+    JSON szerializáló segédfüggvény a nem natív típusokhoz
+    
+    Args:
+        obj: Szerializálandó objektum
+        
+    Returns:
+        JSON kompatibilis érték
+    """
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict('records')
+    
+    return str(obj)
+
+def _run_single(config):
+    """
+    Egyetlen backtest futtatása (munkafolyamatban)
+    
+    Args:
+        config (dict): Backtest konfiguráció (a BacktestEngine paraméterei,
+            opcionálisan 'strategy_config' és 'include_curves')
+        
+    Returns:
+        dict: Backtest eredmények vagy None hiba esetén
+    """
+    engine = BacktestEngine(
+        config['strategy_type'],
+        config['symbol'],
+        config['timeframe'],
+        config['start_date'],
+        config['end_date'],
+        initial_balance=config.get('initial_balance', 1000.0),
+        commission=config.get('commission', 0.1)
+    )
+    
+    if not engine.load_data():
+        return None
+    
+    if not engine.initialize_strategy(config.get('strategy_config')):
+        return None
+    
+    return engine.run_backtest(include_curves=config.get('include_curves', True))
+
+def run_portfolio_backtest(configs, max_workers=None):
+    """
+    Több szimbólumos backtest párhuzamos futtatása
+    
+    Minden konfiguráció külön folyamatban fut, így a GIL nem korlátozza a
+    független backtesteket. A folyamatok csak a konfigurációt kapják meg,
+    az adatokat maguk töltik be, így nagy DataFrame-eket nem kell pickle-ölni.
+    
+    Args:
+        configs (list): Backtest konfigurációk listája
+        max_workers (int): Folyamatok maximális száma (alapértelmezett: CPU magok száma)
+        
+    Returns:
+        list: Backtest eredmények a konfigurációk sorrendjében
+    """
+    logger = logging.getLogger(__name__)
+    
+    if not configs:
+        return []
+    
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(configs))
+    
+    results = []
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_single, config) for config in configs]
+        
+        for config, future in zip(configs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Hiba a backtest futtatása során ({config.get('symbol')}): {e}")
+                results.append(None)
+    
+    return results
@@ -4,12 +4,18 @@ Adatbázis konfigurációs beállítások - RPI4 optimalizált
 
 # SQLite beállítások
 SQLITE_CONFIG = {
+    # A sorrend számít: a page_size csak a séma létrehozása és a WAL mód
+    # bekapcsolása előtt állítható be
     'PRAGMA': [
+        'page_size = 8192',         # Nagyobb lapméret: kevesebb, nagyobb írás az SD kártyán
         'journal_mode = WAL',       # Write-Ahead Logging mód a jobb teljesítményért
         'synchronous = NORMAL',     # Csökkentett szinkronizáció a jobb teljesítményért
-        'cache_size = 5000',        # Cache méret növelése (kb. 5MB)
+        'wal_autocheckpoint = 1000',  # WAL checkpoint 1000 laponként (kötegelt kiírás)
+        'cache_size = -20000',      # Cache méret KB-ban (kb. 20MB, lapmérettől független)
         'temp_store = MEMORY',      # Ideiglenes táblák memóriában tárolása
         'mmap_size = 30000000',     # Memory-mapped I/O engedélyezése (kb. 30MB)
+        'busy_timeout = 5000',      # Várakozás zárolt adatbázisra (ms)
+        'foreign_keys = ON',        # Idegen kulcs megszorítások érvényesítése
     ],
     'POOL_SIZE': 1,                 # Connection pool mérete
     'TIMEOUT': 30,                  # Kapcsolat timeout másodpercben
@@ -1,19 +1,168 @@
 """
 Exchange Config - Exchange specifikus beállítások
 """
-import json
+import logging
 import os
+import sys
+from collections.abc import Mapping
+
+from config.frozen import freeze, thaw
+from config.json_io import CachedJsonFile, DebouncedWriter
+
+logger = logging.getLogger(__name__)
+
+# A fájl módosítási idejének ellenőrzési gyakorisága (másodperc)
+_STAT_TTL = 1.0
+
+# Beállítások fájl elérési útja
+_SETTINGS_PATH = os.path.join('config', 'exchange_settings.json')
+
+def _deep_merge(default, override):
+    """
+    Beállítások rekurzív összefésülése
+    
+    Args:
+        default (dict): Alapértelmezett beállítások
+        override (dict): Felülíró beállítások
+        
+    Returns:
+        dict: Összefésült beállítások (az eredeti dict-ek nem módosulnak)
+    """
+    merged = {**default, **override}
+    
+    for key, value in override.items():
+        default_value = default.get(key)
+        if isinstance(value, dict) and isinstance(default_value, Mapping):
+            merged[key] = _deep_merge(default_value, value)
+    
+    return merged
+
+# Lapított lekérdező táblák: (beállítások, díjak, min. méretek, pontosságok)
+# kulcsok: (exchange, díj típus), (exchange, szimbólum), (exchange, pontosság típus, szimbólum)
+_LOOKUP = None
+
+def _build_lookup(settings):
+    """
+    Lapított, tuple kulcsú lekérdező táblák összeállítása
+    
+    Args:
+        settings (dict): Exchange-enkénti beállítások
+        
+    Returns:
+        tuple: (díjak, min. megbízás méretek, pontosságok) dict-ek
+    """
+    fees = {}
+    min_order_size = {}
+    precision = {}
+    
+    # A kulcsok internálva, így a (szintén internált) lekérdezések azonosság alapján találnak
+    for exchange, exchange_settings in settings.items():
+        exchange = sys.intern(exchange)
+        
+        for fee_type, value in exchange_settings.get('fees', {}).items():
+            fees[(exchange, sys.intern(fee_type))] = value
+        
+        for symbol, value in exchange_settings.get('min_order_size', {}).items():
+            min_order_size[(exchange, sys.intern(symbol))] = value
+        
+        for precision_type, values in exchange_settings.get('precision', {}).items():
+            precision_type = sys.intern(precision_type)
+            for symbol, value in values.items():
+                precision[(exchange, precision_type, sys.intern(symbol))] = value
+    
+    return fees, min_order_size, precision
+
+def _get_lookup():
+    """
+    Lekérdező táblák lekérdezése
+    
+    A táblák csak akkor épülnek újra, ha a mögöttük lévő beállítások megváltoztak.
+    
+    Returns:
+        tuple: (beállítások, díjak, min. megbízás méretek, pontosságok)
+    """
+    global _LOOKUP
+    
+    settings = ExchangeConfig._get_all_settings()
+    
+    if _LOOKUP is None or _LOOKUP[0] is not settings:
+        _LOOKUP = (settings,) + _build_lookup(settings)
+    
+    return _LOOKUP
+
+def _check_exchange(exchange):
+    """
+    Exchange támogatottságának ellenőrzése
+    
+    Args:
+        exchange (str): Exchange neve
+    """
+    if exchange not in ExchangeConfig.SUPPORTED_EXCHANGES:
+        raise ValueError(f"Nem támogatott exchange: {exchange}")
+
+def _get_fee(exchange, fee_type='taker'):
+    """
+    Díj lekérdezése
+    
+    Args:
+        exchange (str): Exchange neve
+        fee_type (str): Díj típusa (maker, taker)
+        
+    Returns:
+        float: Díj százalékban
+    """
+    value = _get_lookup()[1].get((sys.intern(exchange), sys.intern(fee_type)))
+    if value is None:
+        _check_exchange(exchange)
+        return 0.1
+    
+    return value
+
+def _get_min_order_size(exchange, symbol):
+    """
+    Minimális megbízás méret lekérdezése
+    
+    Args:
+        exchange (str): Exchange neve
+        symbol (str): Szimbólum
+        
+    Returns:
+        float: Minimális megbízás méret
+    """
+    value = _get_lookup()[2].get((sys.intern(exchange), sys.intern(symbol)))
+    if value is None:
+        _check_exchange(exchange)
+        return 0.0001
+    
+    return value
+
+def _get_precision(exchange, symbol, precision_type='price'):
+    """
+    Pontosság lekérdezése
+    
+    Args:
+        exchange (str): Exchange neve
+        symbol (str): Szimbólum
+        precision_type (str): Pontosság típusa (price, amount)
+        
+    Returns:
+        int: Pontosság
+    """
+    value = _get_lookup()[3].get((sys.intern(exchange), sys.intern(precision_type), sys.intern(symbol)))
+    if value is None:
+        _check_exchange(exchange)
+        return 2
+    
+    return value
 
 class ExchangeConfig:
     """
     Exchange beállítások kezelése
     """
     
-    # Támogatott tőzsdék
-    SUPPORTED_EXCHANGES = ['binance', 'kraken', 'coinbase']
-    
     # Alapértelmezett beállítások
-    DEFAULT_SETTINGS = {
+    # (befagyasztva, így másolás nélkül kiadható)
+    DEFAULT_SETTINGS = freeze({
         'binance': {
             'base_url': 'https://api.binance.com',
             'websocket_url': 'wss://stream.binance.com:9443/ws',
@@ -137,7 +286,50 @@ class ExchangeConfig:
             'has_margin': False,
             'has_swap': False
         }
-    }
+    })
+    
+    # Támogatott tőzsdék (az alapértelmezett beállítások kulcsai)
+    SUPPORTED_EXCHANGES = frozenset(DEFAULT_SETTINGS)
+    
+    # Késleltetett, összevont fájlírás
+    _writer = DebouncedWriter(_SETTINGS_PATH)
+    
+    # Betöltött (nyers és összefésült) beállítások gyorsítótára, fájl módosítási ideje
+    # alapján érvénytelenítve; az összefésülés az osztály létrejötte után hívható
+    _file = CachedJsonFile(_SETTINGS_PATH, DEFAULT_SETTINGS, _writer,
+                           merge=lambda settings: ExchangeConfig._merge(settings), stat_ttl=_STAT_TTL)
+    
+    @classmethod
+    def _merge(cls, settings):
+        """
+        Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
+        
+        Egyszer, betöltéskor, mélyen összefésülve, így a lekérdezéseknek nem kell újra.
+        
+        Args:
+            settings (dict): A fájlban tárolt (nyers) beállítások
+            
+        Returns:
+            dict: Exchange-enként az alapértelmezettekkel kiegészített beállítások
+        """
+        merged = {}
+        for exchange in cls.SUPPORTED_EXCHANGES:
+            if exchange in settings:
+                merged[exchange] = _deep_merge(cls.DEFAULT_SETTINGS[exchange], settings[exchange])
+            else:
+                merged[exchange] = cls.DEFAULT_SETTINGS[exchange]
+        
+        return merged
+    
+    @classmethod
+    def _get_all_settings(cls):
+        """
+        Az összes exchange beállításainak lekérdezése
+        
+        Returns:
+            dict: Exchange-enként az alapértelmezettekkel kiegészített beállítások
+        """
+        return cls._file.get()
     
     @classmethod
     def get_exchange_settings(cls, exchange):
@@ -150,31 +342,12 @@ class ExchangeConfig:
         Returns:
             dict: Exchange beállítások
         """
-        if exchange not in cls.SUPPORTED_EXCHANGES:
+        # Egyetlen lookup: a beállítások csak a támogatott exchange-eket tartalmazzák
+        settings = cls._get_all_settings().get(exchange)
+        if settings is None:
             raise ValueError(f"Nem támogatott exchange: {exchange}")
         
-        # Beállítások fájl elérési útja
-        settings_file = os.path.join('config', 'exchange_settings.json')
-        
-        # Ha a fájl létezik, betöltjük
-        if os.path.exists(settings_file):
-            try:
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    
-                if exchange in settings:
-                    # Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
-                    merged_settings = cls.DEFAULT_SETTINGS[exchange].copy()
-                    merged_settings.update(settings[exchange])
-                    
-                    return merged_settings
-                else:
-                    return cls.DEFAULT_SETTINGS[exchange]
-            except Exception as e:
-                print(f"Hiba a beállítások betöltése során: {e}")
-                return cls.DEFAULT_SETTINGS[exchange]
-        else:
-            return cls.DEFAULT_SETTINGS[exchange]
+        return settings
     
     @classmethod
     def update_exchange_settings(cls, exchange, settings):
@@ -191,33 +364,23 @@ class ExchangeConfig:
         if exchange not in cls.SUPPORTED_EXCHANGES:
             raise ValueError(f"Nem támogatott exchange: {exchange}")
         
-        # Beállítások fájl elérési útja
-        settings_file = os.path.join('config', 'exchange_settings.json')
-        
-        # Aktuális beállítások lekérdezése
-        current_settings = {}
+        # Aktuális (nyers) beállítások a gyorsítótárból; a fájl csak változás esetén
+        # kerül újraolvasásra, függő írásnál a még ki nem írt állapot a mérvadó
+        try:
+            cls._file.load()
+        except Exception as e:
+            logger.warning("Hiba a beállítások betöltése során: %s", e)
         
-        # Ha a fájl létezik, betöltjük
-        if os.path.exists(settings_file):
-            try:
-                with open(settings_file, 'r') as f:
-                    current_settings = json.load(f)
-            except Exception as e:
-                print(f"Hiba a beállítások betöltése során: {e}")
+        current_settings = {key: dict(value) for key, value in (cls._file.raw or {}).items()}
         
         # Exchange beállítások frissítése
         if exchange not in current_settings:
-            current_settings[exchange] = cls.DEFAULT_SETTINGS[exchange].copy()
+            current_settings[exchange] = thaw(cls.DEFAULT_SETTINGS[exchange])
         
         current_settings[exchange].update(settings)
         
-        # Beállítások mentése
-        try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(current_settings, f, indent=4)
-        except Exception as e:
-            print(f"Hiba a beállítások mentése során: {e}")
+        # Beállítások mentése (a gyorsítótár azonnal frissül, a fájlba írás késleltetve)
+        cls._file.store(current_settings)
         
         return current_settings[exchange]
     
@@ -249,48 +412,7 @@ class ExchangeConfig:
         settings = cls.get_exchange_settings(exchange)
         return settings.get('default_timeframe', '1h')
     
-    @classmethod
-    def get_fee(cls, exchange, fee_type='taker'):
-        """
-        Díj lekérdezése
-        
-        Args:
-            exchange (str): Exchange neve
-            fee_type (str): Díj típusa (maker, taker)
-            
-        Returns:
-            float: Díj százalékban
-        """
-        settings = cls.get_exchange_settings(exchange)
-        return settings.get('fees', {}).get(fee_type, 0.1)
-    
-    @classmethod
-    def get_min_order_size(cls, exchange, symbol):
-        """
-        Minimális megbízás méret lekérdezése
-        
-        Args:
-            exchange (str): Exchange neve
-            symbol (str): Szimbólum
-            
-        Returns:
-            float: Minimális megbízás méret
-        """
-        settings = cls.get_exchange_settings(exchange)
-        return settings.get('min_order_size', {}).get(symbol, 0.0001)
-    
-    @classmethod
-    def get_precision(cls, exchange, symbol, precision_type='price'):
-        """
-        Pontosság lekérdezése
-        
-        Args:
-            exchange (str): Exchange neve
-            symbol (str): Szimbólum
-            precision_type (str): Pontosság típusa (price, amount)
-            
-        Returns:
-            int: Pontosság
-        """
-        settings = cls.get_exchange_settings(exchange)
-        return settings.get('precision', {}).get(precision_type, {}).get(symbol, 2)
+    # Gyakori lekérdezések modul szintű függvényként (classmethod kötés és cls feloldás nélkül)
+    get_fee = staticmethod(_get_fee)
+    get_min_order_size = staticmethod(_get_min_order_size)
+    get_precision = staticmethod(_get_precision)
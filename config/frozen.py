@@ -0,0 +1,44 @@
+"""
+Frozen - Megváltoztathatatlan beállítás struktúrák
+"""
+from collections.abc import Mapping
+from types import MappingProxyType
+
+def freeze(obj):
+    """
+    Beállítás struktúra rekurzív befagyasztása
+    
+    A dict-ek MappingProxyType-ba, a listák tuple-be kerülnek, így a
+    struktúra másolás nélkül, referenciaként is biztonságosan kiadható.
+    
+    Args:
+        obj: Befagyasztandó objektum
+        
+    Returns:
+        Megváltoztathatatlan objektum
+    """
+    if isinstance(obj, Mapping):
+        return MappingProxyType({key: freeze(value) for key, value in obj.items()})
+    
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(value) for value in obj)
+    
+    return obj
+
+def thaw(obj):
+    """
+    Befagyasztott struktúra rekurzív visszaalakítása módosítható formára
+    
+    Args:
+        obj: Befagyasztott objektum
+        
+    Returns:
+        Módosítható objektum (dict-ek és listák)
+    """
+    if isinstance(obj, Mapping):
+        return {key: thaw(value) for key, value in obj.items()}
+    
+    if isinstance(obj, (list, tuple)):
+        return [thaw(value) for value in obj]
+    
+    return obj
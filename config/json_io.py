@@ -0,0 +1,394 @@
+"""
+JSON I/O - Gyors JSON (de)szerializálás a beállítás fájlokhoz
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(obj):
+    """
+    Nem natív típusok szerializálása (pl. befagyasztott MappingProxyType beállítások)
+    
+    Args:
+        obj: Szerializálandó objektum
+        
+    Returns:
+        dict: JSON kompatibilis érték
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    
+    raise TypeError(f"Nem szerializálható típus: {type(obj).__name__}")
+
+def loads(data):
+    """
+    JSON adatok feldolgozása (orjson, ha elérhető)
+    
+    Args:
+        data (bytes): JSON adatok
+        
+    Returns:
+        Feldolgozott objektum
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    
+    return json.loads(data)
+
+def load_file(path):
+    """
+    JSON fájl betöltése egyetlen olvasással
+    
+    A fájl puffer nélkül (buffering=0) nyílik meg, így a read() egy fstat után
+    egyetlen rendszerhívással, köztes pufferelés nélkül olvassa be a teljes
+    tartalmat, amit a parser egy összefüggő bufferként kap meg.
+    
+    Args:
+        path (str): Fájl elérési útja
+        
+    Returns:
+        Feldolgozott objektum
+    """
+    with open(path, 'rb', buffering=0) as f:
+        return loads(f.read())
+
+def dumps(obj):
+    """
+    Objektum formázott JSON formátumra alakítása (orjson, ha elérhető)
+    
+    A kimenet 2 szóközzel tagolt, rendezett kulcsú, így a fájlok kézzel is
+    olvashatók maradnak és a változások diff-elhetők.
+    
+    Args:
+        obj: Szerializálandó objektum
+        
+    Returns:
+        bytes: JSON adatok
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    
+    return json.dumps(obj, indent=2, sort_keys=True, default=_default).encode('utf-8')
+
+def dumps_compact(obj):
+    """
+    Objektum tömör JSON formátumra alakítása (orjson, ha elérhető)
+    
+    API válaszokhoz: tagolás és kulcsrendezés nélkül.
+    
+    Args:
+        obj: Szerializálandó objektum
+        
+    Returns:
+        bytes: JSON adatok
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    
+    return json.dumps(obj, separators=(',', ':'), default=_default).encode('utf-8')
+
+def atomic_write(path, obj):
+    """
+    Objektum atomikus JSON fájlba írása
+    
+    Az adatok a cél könyvtárban létrehozott egyedi ideiglenes fájlba kerülnek
+    (lemezre szinkronizálva), majd os.replace cseréli le a cél fájlt, így az
+    olvasók soha nem látnak félig kiírt fájlt, és egy írás közbeni leállás sem
+    rontja el a meglévő beállításokat.
+    
+    Args:
+        path (str): Cél fájl elérési útja
+        obj: Kiírandó objektum
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    
+    data = dumps(obj)
+    
+    tmp = tempfile.NamedTemporaryFile('wb', dir=directory, delete=False,
+                                      prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+class DebouncedWriter:
+    """
+    Késleltetett, összevont JSON fájlírás
+    
+    A rövid időn belül érkező írási kérésekből csak az utolsó kerül a lemezre,
+    a késleltetés lejártakor egyetlen írással. Kilépéskor a függő írás
+    szinkron módon megtörténik.
+    """
+    
+    def __init__(self, path, delay=0.2, retry_delay=5.0):
+        """
+        Inicializálás
+        
+        Args:
+            path (str): Cél fájl elérési útja
+            delay (float): Írás késleltetése másodpercben
+            retry_delay (float): Sikertelen írás újrapróbálásának késleltetése másodpercben
+        """
+        self.path = path
+        self.delay = delay
+        self.retry_delay = retry_delay
+        
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        self._failed = False
+        
+        atexit.register(self.flush)
+    
+    def is_pending(self):
+        """
+        Van-e még lemezre nem írt adat
+        
+        Returns:
+            bool: Van-e függő írás
+        """
+        return self._pending is not None
+    
+    def schedule(self, obj):
+        """
+        Írás ütemezése (a korábbi, még függő írást felülírja)
+        
+        Args:
+            obj: Kiírandó objektum
+        
+        Returns:
+            bool: False, ha az előző írás sikertelen volt (az adat ekkor is
+                függőben marad, és az írás újrapróbálkozik)
+        """
+        with self._lock:
+            self._pending = obj
+            self._start_timer(self.delay)
+            return not self._failed
+    
+    def _start_timer(self, delay):
+        """
+        Az írás időzítőjének (újra)indítása; a hívó tartja a zárat
+        
+        Args:
+            delay (float): Késleltetés másodpercben
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def flush(self):
+        """
+        Függő írás azonnali végrehajtása
+        
+        Sikertelen írás esetén a függő adat megmarad, és retry_delay múlva
+        újabb írási kísérlet történik.
+        
+        Returns:
+            bool: Sikeres-e az írás (függő írás hiányában True)
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            
+            if self._pending is None:
+                return True
+            
+            try:
+                atomic_write(self.path, self._pending)
+            except Exception as e:
+                logger.error("Hiba a beállítások mentése során: %s", e)
+                self._failed = True
+                self._start_timer(self.retry_delay)
+                return False
+            
+            # Csak a kiírás után törlődik, így közben az olvasók a gyorsítótárat használják
+            self._pending = None
+            self._failed = False
+            return True
+
+class CachedJsonFile:
+    """
+    Gyorsítótárazott JSON beállítás fájl
+    
+    A fájl csak akkor kerül újraolvasásra, ha a módosítási ideje megváltozott;
+    a módosítási idő legfeljebb stat_ttl másodpercenként kerül ellenőrzésre
+    (külső módosítás legfeljebb ennyi késéssel látszik). Lemezre még nem írt
+    módosítás esetén a gyorsítótár a mérvadó.
+    """
+    
+    def __init__(self, path, defaults, writer, merge=None, create_missing=False, stat_ttl=1.0):
+        """
+        Inicializálás
+        
+        Args:
+            path (str): Beállítások fájl elérési útja
+            defaults (Mapping): Alapértelmezett beállítások
+            writer (DebouncedWriter): A fájl késleltetett írója
+            merge (callable): A nyers beállítások és az alapértelmezettek összefésülése
+                (alapértelmezés: felső szintű kiegészítés)
+            create_missing (bool): Hiányzó fájl létrehozása az alapértelmezett beállításokkal
+            stat_ttl (float): A módosítási idő ellenőrzési gyakorisága másodpercben
+        """
+        self.path = path
+        self.defaults = defaults
+        self.writer = writer
+        self.create_missing = create_missing
+        self.stat_ttl = stat_ttl
+        self._merge = merge or self._merge_defaults
+        
+        self.raw = None  # A fájlban tárolt (nyers) beállítások
+        self._merged = None
+        self._mtime = None
+        self._checked = 0.0
+    
+    def _merge_defaults(self, settings):
+        """
+        Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
+        
+        Args:
+            settings (dict): Nyers beállítások
+            
+        Returns:
+            dict: Az alapértelmezettekkel kiegészített beállítások
+        """
+        return {**self.defaults, **settings}
+    
+    def load(self):
+        """
+        Beállítások betöltése gyorsítótárazással
+        
+        Returns:
+            dict: Az alapértelmezettekkel kiegészített beállítások, vagy None,
+                ha a fájl nem létezik
+        """
+        # Lemezre még nem írt módosítások esetén a gyorsítótár a mérvadó
+        if self.writer.is_pending() and self._merged is not None:
+            return self._merged
+        
+        # A módosítási idő legfeljebb stat_ttl másodpercenként kerül ellenőrzésre,
+        # közben a lekérdezések rendszerhívás nélkül a gyorsítótárból szolgálódnak ki
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked < self.stat_ttl:
+            return self._merged
+        
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self.raw = None
+            return None
+        
+        self._checked = now
+        
+        if self._mtime == mtime:
+            return self._merged
+        
+        settings = load_file(self.path)
+        merged = self._merge(settings)
+        
+        self.raw = settings
+        self._merged = merged
+        self._mtime = mtime
+        
+        return merged
+    
+    def get(self):
+        """
+        Beállítások lekérdezése
+        
+        Betöltési hiba vagy hiányzó fájl esetén az alapértelmezett beállításokat adja.
+        
+        Returns:
+            dict: Az alapértelmezettekkel kiegészített beállítások
+        """
+        try:
+            settings = self.load()
+        except Exception as e:
+            logger.warning("Hiba a beállítások betöltése során: %s", e)
+            return self.defaults
+        
+        if settings is not None:
+            return settings
+        
+        # Ha a fájl nem létezik, létrehozzuk az alapértelmezett beállításokkal
+        if self.create_missing:
+            try:
+                atomic_write(self.path, self.defaults)
+            except Exception as e:
+                logger.error("Hiba a beállítások mentése során: %s", e)
+        
+        return self.defaults
+    
+    def store(self, settings):
+        """
+        Beállítások mentése
+        
+        A gyorsítótár azonnal frissül, a fájlba írás késleltetve, összevonva történik;
+        a következő betöltés a függő írás befejeztéig a gyorsítótárat használja.
+        
+        Args:
+            settings (dict): Mentendő (nyers) beállítások
+        
+        Returns:
+            bool: False, ha a beállítások fájlba írása jelenleg sikertelen
+                (a módosítás a gyorsítótárban megmarad, az írás újrapróbálkozik)
+        """
+        scheduled = self.writer.schedule(settings)
+        self.raw = settings
+        self._merged = self._merge(settings)
+        self._mtime = None
+        return scheduled
+    
+    def update(self, changes):
+        """
+        Beállítások frissítése
+        
+        Args:
+            changes (dict): Frissítendő beállítások
+            
+        Returns:
+            dict: Frissített beállítások
+        """
+        # Másolat, hogy a gyorsítótár ne módosuljon
+        settings = dict(self.get())
+        settings.update(changes)
+        self.store(settings)
+        return settings
+    
+    @contextmanager
+    def batch(self):
+        """
+        Több beállítás módosítása egyetlen olvasással és írással
+        
+        Yields:
+            dict: A beállítások módosítható másolata (kivétel esetén nem kerül mentésre)
+        """
+        settings = dict(self.get())
+        yield settings
+        self.store(settings)
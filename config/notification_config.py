@@ -1,16 +1,31 @@
 """
 Notification Config - Értesítési beállítások
 """
-import json
+import logging
 import os
 
+from config.frozen import freeze
+from config.json_io import CachedJsonFile, DebouncedWriter
+
+logger = logging.getLogger(__name__)
+
+# Ismeretlen értesítés típusok formátuma
+_DEFAULT_FORMAT = '{time} - {message}'
+
+# A fájl módosítási idejének ellenőrzési gyakorisága (másodperc)
+_STAT_TTL = 1.0
+
+# Beállítások fájl elérési útja
+_SETTINGS_PATH = os.path.join('config', 'notification_settings.json')
+
 class NotificationConfig:
     """
     Értesítési beállítások kezelése
     """
     
     # Alapértelmezett beállítások
-    DEFAULT_SETTINGS = {
+    # (befagyasztva, így másolás nélkül kiadható)
+    DEFAULT_SETTINGS = freeze({
         # Általános értesítési beállítások
         'notifications_enabled': True,
         'notification_types': {
@@ -83,7 +98,19 @@ class NotificationConfig:
             'balance_update': '{time} - Egyenleg frissítve: {balance}',
             'price_alert': '{time} - Árfolyam riasztás: {symbol} elérte a(z) {price} árat'
         }
-    }
+    })
+    
+    # Késleltetett, összevont fájlírás (set_setting / update hívás sorozatokhoz)
+    _writer = DebouncedWriter(_SETTINGS_PATH)
+    
+    # Betöltött beállítások gyorsítótára (fájl módosítási ideje alapján érvénytelenítve)
+    _file = CachedJsonFile(_SETTINGS_PATH, DEFAULT_SETTINGS, _writer, create_missing=True, stat_ttl=_STAT_TTL)
+    
+    # Előre kötött értesítési formázók: (beállítások, {típus: formázó})
+    _formatters = None
+    
+    # Előre kiszámolt engedélyezettség: (beállítások, engedélyezve, letiltott típusok)
+    _enabled_types = None
     
     @classmethod
     def get_notification_settings(cls):
@@ -93,33 +120,7 @@ class NotificationConfig:
         Returns:
             dict: Értesítési beállítások
         """
-        # Beállítások fájl elérési útja
-        settings_file = os.path.join('config', 'notification_settings.json')
-        
-        # Ha a fájl létezik, betöltjük
-        if os.path.exists(settings_file):
-            try:
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    
-                # Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
-                merged_settings = cls.DEFAULT_SETTINGS.copy()
-                merged_settings.update(settings)
-                
-                return merged_settings
-            except Exception as e:
-                print(f"Hiba a beállítások betöltése során: {e}")
-                return cls.DEFAULT_SETTINGS
-        else:
-            # Ha a fájl nem létezik, létrehozzuk az alapértelmezett beállításokkal
-            try:
-                os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-                with open(settings_file, 'w') as f:
-                    json.dump(cls.DEFAULT_SETTINGS, f, indent=4)
-            except Exception as e:
-                print(f"Hiba a beállítások mentése során: {e}")
-            
-            return cls.DEFAULT_SETTINGS
+        return cls._file.get()
     
     @classmethod
     def update_notification_settings(cls, settings):
@@ -132,22 +133,23 @@ class NotificationConfig:
         Returns:
             dict: Frissített értesítési beállítások
         """
-        # Aktuális beállítások lekérdezése
-        current_settings = cls.get_notification_settings()
+        return cls._file.update(settings)
+    
+    @classmethod
+    def batch(cls):
+        """
+        Több beállítás módosítása egyetlen olvasással és írással
         
-        # Beállítások frissítése
-        current_settings.update(settings)
+        Példa:
+            with NotificationConfig.batch() as settings:
+                settings['key1'] = value1
+                settings['key2'] = value2
         
-        # Beállítások mentése
-        settings_file = os.path.join('config', 'notification_settings.json')
-        try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(current_settings, f, indent=4)
-        except Exception as e:
-            print(f"Hiba a beállítások mentése során: {e}")
-        
-        return current_settings
+        Returns:
+            contextmanager: A beállítások módosítható másolatát adó környezetkezelő
+                (kivétel esetén a módosítás nem kerül mentésre)
+        """
+        return cls._file.batch()
     
     @classmethod
     def get_setting(cls, key, default=None):
@@ -176,25 +178,34 @@ class NotificationConfig:
         Returns:
             bool: Sikeres-e a beállítás
         """
-        settings = cls.get_notification_settings()
+        settings = dict(cls.get_notification_settings())
         settings[key] = value
         
         # Beállítások mentése
-        settings_file = os.path.join('config', 'notification_settings.json')
-        try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Hiba a beállítások mentése során: {e}")
-            return False
+        return cls._file.store(settings)
     
     @classmethod
     def is_notification_enabled(cls, notification_type):
         """
         Értesítés engedélyezettségének ellenőrzése
         
+        Args:
+            notification_type (str): Értesítés típusa
+            
+        Returns:
+            bool: Engedélyezett-e az értesítés
+        """
+        return cls.is_notification_enabled_fast(notification_type)
+    
+    @classmethod
+    def is_notification_enabled_fast(cls, notification_type):
+        """
+        Értesítés engedélyezettségének gyors ellenőrzése (eseményenként hívható)
+        
+        A letiltott típusok halmaza csak a beállítások változásakor épül újra,
+        így az ellenőrzés egyetlen halmaz keresés. Az ismeretlen típusok
+        engedélyezettnek számítanak.
+        
         Args:
             notification_type (str): Értesítés típusa
             
@@ -203,13 +214,17 @@ class NotificationConfig:
         """
         settings = cls.get_notification_settings()
         
-        # Ellenőrizzük, hogy az értesítések engedélyezve vannak-e
-        if not settings.get('notifications_enabled', True):
-            return False
+        enabled_types = cls._enabled_types
+        if enabled_types is None or enabled_types[0] is not settings:
+            notification_types = settings.get('notification_types', {})
+            enabled_types = (
+                settings,
+                bool(settings.get('notifications_enabled', True)),
+                frozenset(t for t, enabled in notification_types.items() if not enabled)
+            )
+            cls._enabled_types = enabled_types
         
-        # Ellenőrizzük, hogy az adott típusú értesítés engedélyezve van-e
-        notification_types = settings.get('notification_types', {})
-        return notification_types.get(notification_type, True)
+        return enabled_types[1] and notification_type not in enabled_types[2]
     
     @classmethod
     def get_notification_format(cls, notification_type):
@@ -224,4 +239,44 @@ class NotificationConfig:
         """
         settings = cls.get_notification_settings()
         notification_formats = settings.get('notification_formats', {})
-        return notification_formats.get(notification_type, '{time} - {message}')
+        return notification_formats.get(notification_type, _DEFAULT_FORMAT)
+    
+    @classmethod
+    def _get_formatters(cls):
+        """
+        Előre kötött értesítési formázók lekérdezése
+        
+        A formázók csak akkor épülnek újra, ha a beállítások megváltoztak.
+        
+        Returns:
+            dict: Értesítés típus -> formázó (a sablon kötött format_map metódusa)
+        """
+        settings = cls.get_notification_settings()
+        
+        if cls._formatters is None or cls._formatters[0] is not settings:
+            notification_formats = settings.get('notification_formats', {})
+            formatters = {
+                notification_type: template.format_map
+                for notification_type, template in notification_formats.items()
+            }
+            cls._formatters = (settings, formatters)
+        
+        return cls._formatters[1]
+    
+    @classmethod
+    def format_notification(cls, notification_type, **kwargs):
+        """
+        Értesítési üzenet formázása
+        
+        Args:
+            notification_type (str): Értesítés típusa
+            **kwargs: A formátum mezői (pl. time, strategy, symbol, price)
+            
+        Returns:
+            str: Formázott értesítési üzenet
+        """
+        formatter = cls._get_formatters().get(notification_type)
+        if formatter is None:
+            return _DEFAULT_FORMAT.format_map(kwargs)
+        
+        return formatter(kwargs)
@@ -1,16 +1,28 @@
 """
 Risk Config - Kockázatkezelési beállítások
 """
-import json
+import logging
 import os
 
+from config.frozen import freeze
+from config.json_io import CachedJsonFile, DebouncedWriter
+
+logger = logging.getLogger(__name__)
+
+# A fájl módosítási idejének ellenőrzési gyakorisága (másodperc)
+_STAT_TTL = 1.0
+
+# Beállítások fájl elérési útja
+_SETTINGS_PATH = os.path.join('config', 'risk_settings.json')
+
 class RiskConfig:
     """
     Kockázatkezelési beállítások kezelése
     """
     
     # Alapértelmezett beállítások
-    DEFAULT_SETTINGS = {
+    # (befagyasztva, így másolás nélkül kiadható)
+    DEFAULT_SETTINGS = freeze({
         # Általános kockázatkezelési beállítások
         'max_portfolio_risk_pct': 2.0,  # Maximális portfólió kockázat százalékban
         'max_position_size_pct': 5.0,   # Maximális pozíció méret százalékban
@@ -75,7 +87,13 @@ class RiskConfig:
         'market_trend_indicators': ['sma', 'ema', 'macd'], # Piaci trend indikátorok
         'market_volatility_indicators': ['atr', 'bollinger_bands'], # Piaci volatilitás indikátorok
         'market_volume_indicators': ['obv', 'volume_sma'], # Piaci volumen indikátorok
-    }
+    })
+    
+    # Késleltetett, összevont fájlírás (set_setting / update hívás sorozatokhoz)
+    _writer = DebouncedWriter(_SETTINGS_PATH)
+    
+    # Betöltött beállítások gyorsítótára (fájl módosítási ideje alapján érvénytelenítve)
+    _file = CachedJsonFile(_SETTINGS_PATH, DEFAULT_SETTINGS, _writer, create_missing=True, stat_ttl=_STAT_TTL)
     
     @classmethod
     def get_risk_settings(cls):
@@ -85,33 +103,7 @@ class RiskConfig:
         Returns:
             dict: Kockázatkezelési beállítások
         """
-        # Beállítások fájl elérési útja
-        settings_file = os.path.join('config', 'risk_settings.json')
-        
-        # Ha a fájl létezik, betöltjük
-        if os.path.exists(settings_file):
-            try:
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    
-                # Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
-                merged_settings = cls.DEFAULT_SETTINGS.copy()
-                merged_settings.update(settings)
-                
-                return merged_settings
-            except Exception as e:
-                print(f"Hiba a beállítások betöltése során: {e}")
-                return cls.DEFAULT_SETTINGS
-        else:
-            # Ha a fájl nem létezik, létrehozzuk az alapértelmezett beállításokkal
-            try:
-                os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-                with open(settings_file, 'w') as f:
-                    json.dump(cls.DEFAULT_SETTINGS, f, indent=4)
-            except Exception as e:
-                print(f"Hiba a beállítások mentése során: {e}")
-            
-            return cls.DEFAULT_SETTINGS
+        return cls._file.get()
     
     @classmethod
     def update_risk_settings(cls, settings):
@@ -124,22 +116,23 @@ class RiskConfig:
         Returns:
             dict: Frissített kockázatkezelési beállítások
         """
-        # Aktuális beállítások lekérdezése
-        current_settings = cls.get_risk_settings()
+        return cls._file.update(settings)
+    
+    @classmethod
+    def batch(cls):
+        """
+        Több beállítás módosítása egyetlen olvasással és írással
         
-        # Beállítások frissítése
-        current_settings.update(settings)
+        Példa:
+            with RiskConfig.batch() as settings:
+                settings['key1'] = value1
+                settings['key2'] = value2
         
-        # Beállítások mentése
-        settings_file = os.path.join('config', 'risk_settings.json')
-        try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(current_settings, f, indent=4)
-        except Exception as e:
-            print(f"Hiba a beállítások mentése során: {e}")
-        
-        return current_settings
+        Returns:
+            contextmanager: A beállítások módosítható másolatát adó környezetkezelő
+                (kivétel esetén a módosítás nem kerül mentésre)
+        """
+        return cls._file.batch()
     
     @classmethod
     def get_setting(cls, key, default=None):
@@ -168,16 +161,8 @@ class RiskConfig:
         Returns:
             bool: Sikeres-e a beállítás
         """
-        settings = cls.get_risk_settings()
+        settings = dict(cls.get_risk_settings())
         settings[key] = value
         
         # Beállítások mentése
-        settings_file = os.path.join('config', 'risk_settings.json')
-        try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Hiba a beállítások mentése során: {e}")
-            return False
+        return cls._file.store(settings)
@@ -2,8 +2,19 @@
 Settings - Alap konfigurációk
 """
 import os
-import json
+import threading
+import time
 from datetime import datetime
+from types import MappingProxyType
+
+from config.frozen import freeze
+from config.json_io import atomic_write, load_file
+
+# Beállítások fájl elérési útja
+_SETTINGS_PATH = os.path.join('config', 'system_settings.json')
+
+# A fájl módosítási idejének ellenőrzési gyakorisága (másodperc)
+_STAT_TTL = 1.0
 
 class Settings:
     """
@@ -11,7 +22,8 @@ class Settings:
     """
     
     # Alapértelmezett beállítások
-    DEFAULT_SETTINGS = {
+    # (befagyasztva, így másolás nélkül kiadható)
+    DEFAULT_SETTINGS = freeze({
         # Általános beállítások
         'app_name': 'Advanced Trading System',
         'app_version': '1.0.0',
@@ -92,43 +104,100 @@ class Settings:
         'max_backups': 7,
         'maintenance_mode': False,
         'maintenance_schedule': '0 3 * * 0',  # Vasárnap 3:00
-    }
+    })
+    
+    # Betöltött beállítások gyorsítótára (fájl módosítási ideje alapján érvénytelenítve)
+    _cache = None
+    _cache_mtime = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
     
     @classmethod
-    def get_system_settings(cls):
+    def _write(cls, settings):
         """
-        Rendszer beállítások lekérdezése
+        Beállítások atomikus fájlba írása és a gyorsítótár frissítése
+        
+        Az író a saját írása után frissíti a tárolt módosítási időt, így nem
+        érvényteleníti a saját gyorsítótárát.
+        
+        Args:
+            settings (dict): Mentendő beállítások
+        """
+        atomic_write(_SETTINGS_PATH, settings)
+        
+        # Csak olvasható nézet saját másolaton, így a hívó módosításai nem szivárognak a gyorsítótárba
+        cls._cache = MappingProxyType(dict(settings))
+        cls._cache_mtime = os.stat(_SETTINGS_PATH).st_mtime_ns
+        cls._checked_at = time.monotonic()
+    
+    @classmethod
+    def _get_cached(cls):
+        """
+        Gyorsítótárazott beállítások lekérdezése
+        
+        A fájl csak akkor kerül újraolvasásra, ha a módosítási ideje megváltozott
+        (külső módosítás legfeljebb _STAT_TTL másodperc késéssel látszik).
         
         Returns:
-            dict: Rendszer beállítások
+            MappingProxyType: Az alapértelmezettekkel kiegészített beállítások
+                (csak olvasható), vagy None, ha a fájl nem létezik
         """
-        # Beállítások fájl elérési útja
-        settings_file = os.path.join('config', 'system_settings.json')
+        # A módosítási idő legfeljebb _STAT_TTL másodpercenként kerül ellenőrzésre,
+        # közben a lekérdezések zár és rendszerhívás nélkül a gyorsítótárból szolgálódnak ki
+        now = time.monotonic()
+        if cls._cache_mtime is not None and now - cls._checked_at < _STAT_TTL:
+            return cls._cache
         
-        # Ha a fájl létezik, betöltjük
-        if os.path.exists(settings_file):
+        with cls._lock:
             try:
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    
-                # Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
-                merged_settings = cls.DEFAULT_SETTINGS.copy()
-                merged_settings.update(settings)
-                
-                return merged_settings
-            except Exception as e:
-                print(f"Hiba a beállítások betöltése során: {e}")
-                return cls.DEFAULT_SETTINGS
-        else:
-            # Ha a fájl nem létezik, létrehozzuk az alapértelmezett beállításokkal
-            try:
-                os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-                with open(settings_file, 'w') as f:
-                    json.dump(cls.DEFAULT_SETTINGS, f, indent=4)
-            except Exception as e:
-                print(f"Hiba a beállítások mentése során: {e}")
+                mtime = os.stat(_SETTINGS_PATH).st_mtime_ns
+            except FileNotFoundError:
+                cls._cache_mtime = None
+                return None
+            
+            cls._checked_at = now
+            
+            # Ha a fájl nem változott, a gyorsítótárazott beállítások a mérvadók
+            if mtime == cls._cache_mtime:
+                return cls._cache
+            
+            settings = load_file(_SETTINGS_PATH)
+            
+            # Alapértelmezett beállítások kiegészítése a betöltött beállításokkal
+            # (fájl változásonként egyszer, csak olvasható nézetként tárolva)
+            merged_settings = MappingProxyType({**cls.DEFAULT_SETTINGS, **settings})
             
+            cls._cache = merged_settings
+            cls._cache_mtime = mtime
+            
+            return merged_settings
+    
+    @classmethod
+    def get_system_settings(cls):
+        """
+        Rendszer beállítások lekérdezése
+        
+        Returns:
+            MappingProxyType: Rendszer beállítások (csak olvasható, módosításhoz
+                dict(...) másolat szükséges)
+        """
+        try:
+            settings = cls._get_cached()
+        except Exception as e:
+            print(f"Hiba a beállítások betöltése során: {e}")
             return cls.DEFAULT_SETTINGS
+        
+        if settings is not None:
+            return settings
+        
+        # Ha a fájl nem létezik, létrehozzuk az alapértelmezett beállításokkal
+        try:
+            with cls._lock:
+                cls._write(cls.DEFAULT_SETTINGS)
+        except Exception as e:
+            print(f"Hiba a beállítások mentése során: {e}")
+        
+        return cls.DEFAULT_SETTINGS
     
     @classmethod
     def update_system_settings(cls, settings):
@@ -141,18 +210,16 @@ class Settings:
         Returns:
             dict: Frissített rendszer beállítások
         """
-        # Aktuális beállítások lekérdezése
-        current_settings = cls.get_system_settings()
+        # Aktuális beállítások lekérdezése (módosítható másolat)
+        current_settings = dict(cls.get_system_settings())
         
         # Beállítások frissítése
         current_settings.update(settings)
         
         # Beállítások mentése
-        settings_file = os.path.join('config', 'system_settings.json')
         try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(current_settings, f, indent=4)
+            with cls._lock:
+                cls._write(current_settings)
         except Exception as e:
             print(f"Hiba a beállítások mentése során: {e}")
         
@@ -170,7 +237,15 @@ class Settings:
         Returns:
             Beállítás értéke vagy az alapértelmezett érték
         """
-        settings = cls.get_system_settings()
+        # Gyors út: egyetlen stat és dict lekérdezés, a betöltés a gyorsítótárból történik
+        try:
+            settings = cls._get_cached()
+        except Exception:
+            settings = None
+        
+        if settings is None:
+            settings = cls.get_system_settings()
+        
         return settings.get(key, default)
     
     @classmethod
@@ -185,15 +260,13 @@ class Settings:
         Returns:
             bool: Sikeres-e a beállítás
         """
-        settings = cls.get_system_settings()
+        settings = dict(cls.get_system_settings())
         settings[key] = value
         
         # Beállítások mentése
-        settings_file = os.path.join('config', 'system_settings.json')
         try:
-            os.makedirs(os.path.dirname(settings_file), exist_ok=True)
-            with open(settings_file, 'w') as f:
-                json.dump(settings, f, indent=4)
+            with cls._lock:
+                cls._write(settings)
             return True
         except Exception as e:
             print(f"Hiba a beállítások mentése során: {e}")
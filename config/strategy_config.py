@@ -1,9 +1,228 @@
 """
 Strategy Config - Stratégia beállítások
 """
-import json
 import os
 
+from config.frozen import freeze
+from config.json_io import atomic_write, load_file
+
+# Stratégia típusonkénti alapértelmezett konfigurációk
+_GRID_DEFAULTS = {
+    'grid_levels': 5,
+    'upper_price': 0,  # 0 = automatikus
+    'lower_price': 0,  # 0 = automatikus
+    'quantity_per_grid': 0.01,
+    'price_deviation_pct': 2.0,
+    'take_profit_pct': 1.0,
+    'stop_loss_pct': 5.0,
+    'trailing_stop': False,
+    'trailing_stop_pct': 1.0,
+    'rebalance_interval': 86400,  # 24 óra másodpercben
+    'max_open_positions': 10,
+    'use_indicators': True,
+    'indicators': ['rsi', 'bollinger_bands']
+}
+
+_DCA_DEFAULTS = {
+    'base_order_size': 10.0,  # USDT
+    'safety_order_size': 20.0,  # USDT
+    'max_safety_orders': 3,
+    'price_deviation_pct': 2.5,
+    'safety_order_step_scale': 1.5,
+    'safety_order_volume_scale': 1.5,
+    'take_profit_pct': 3.0,
+    'stop_loss_pct': 15.0,
+    'trailing_stop': True,
+    'trailing_stop_pct': 1.0,
+    'cooldown_period': 86400,  # 24 óra másodpercben
+    'max_active_deals': 5
+}
+
+_MOMENTUM_DEFAULTS = {
+    'lookback_period': 14,
+    'entry_threshold': 0.5,
+    'exit_threshold': -0.2,
+    'position_size_pct': 10.0,
+    'max_positions': 5,
+    'take_profit_pct': 5.0,
+    'stop_loss_pct': 3.0,
+    'trailing_stop': True,
+    'trailing_stop_pct': 1.0,
+    'indicators': ['rsi', 'macd', 'adx'],
+    'rsi_period': 14,
+    'rsi_overbought': 70,
+    'rsi_oversold': 30,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'adx_period': 14,
+    'adx_threshold': 25
+}
+
+_MEAN_REVERSION_DEFAULTS = {
+    'lookback_period': 20,
+    'entry_std_dev': 2.0,
+    'exit_std_dev': 0.5,
+    'position_size_pct': 10.0,
+    'max_positions': 5,
+    'take_profit_pct': 3.0,
+    'stop_loss_pct': 5.0,
+    'max_holding_period': 86400,  # 24 óra másodpercben
+    'indicators': ['bollinger_bands', 'rsi', 'stochastic'],
+    'bollinger_period': 20,
+    'bollinger_std_dev': 2.0,
+    'rsi_period': 14,
+    'rsi_overbought': 70,
+    'rsi_oversold': 30,
+    'stochastic_k_period': 14,
+    'stochastic_d_period': 3,
+    'stochastic_overbought': 80,
+    'stochastic_oversold': 20
+}
+
+_ARBITRAGE_DEFAULTS = {
+    'min_spread_pct': 0.5,
+    'max_spread_pct': 5.0,
+    'position_size_pct': 20.0,
+    'max_positions': 3,
+    'max_slippage_pct': 0.2,
+    'max_execution_time': 10,  # másodperc
+    'exchanges': ['binance', 'kraken', 'coinbase'],
+    'recheck_interval': 60,  # másodperc
+    'auto_withdraw': False,
+    'min_volume_usd': 10000.0
+}
+
+_EMPTY = freeze({})
+
+# Stratégia típus -> alapértelmezett konfiguráció (rekurzívan befagyasztva, egyszer létrehozva;
+# a beágyazott listák is tuple-ök, így a modul szintű alapértékek nem módosíthatók)
+_DEFAULTS = {
+    'grid_trading': freeze(_GRID_DEFAULTS),
+    'dca_strategy': freeze(_DCA_DEFAULTS),
+    'momentum_strategy': freeze(_MOMENTUM_DEFAULTS),
+    'mean_reversion': freeze(_MEAN_REVERSION_DEFAULTS),
+    'arbitrage_strategy': freeze(_ARBITRAGE_DEFAULTS)
+}
+
+def _check_grid_trading(config):
+    """
+    Grid trading specifikus validáció
+    
+    Args:
+        config (dict): Konfiguráció
+        
+    Returns:
+        str: Hibaüzenet, vagy None, ha a konfiguráció érvényes
+    """
+    if not 2 <= config['grid_levels'] <= 100:
+        return "A grid_levels értékének 2 és 100 között kell lennie"
+    
+    if config['price_deviation_pct'] <= 0:
+        return "A price_deviation_pct értékének nagyobbnak kell lennie, mint 0"
+    
+    return None
+
+def _check_dca_strategy(config):
+    """
+    DCA stratégia specifikus validáció
+    
+    Args:
+        config (dict): Konfiguráció
+        
+    Returns:
+        str: Hibaüzenet, vagy None, ha a konfiguráció érvényes
+    """
+    if config['base_order_size'] <= 0:
+        return "A base_order_size értékének nagyobbnak kell lennie, mint 0"
+    
+    if not 0 <= config['max_safety_orders'] <= 10:
+        return "A max_safety_orders értékének 0 és 10 között kell lennie"
+    
+    return None
+
+def _check_momentum_strategy(config):
+    """
+    Momentum stratégia specifikus validáció
+    
+    Args:
+        config (dict): Konfiguráció
+        
+    Returns:
+        str: Hibaüzenet, vagy None, ha a konfiguráció érvényes
+    """
+    if config['lookback_period'] < 1:
+        return "A lookback_period értékének legalább 1-nek kell lennie"
+    
+    if not 0 < config['position_size_pct'] <= 100:
+        return "A position_size_pct értékének 0 és 100 között kell lennie"
+    
+    return None
+
+def _check_mean_reversion(config):
+    """
+    Mean reversion stratégia specifikus validáció
+    
+    Args:
+        config (dict): Konfiguráció
+        
+    Returns:
+        str: Hibaüzenet, vagy None, ha a konfiguráció érvényes
+    """
+    if config['entry_std_dev'] <= 0:
+        return "Az entry_std_dev értékének nagyobbnak kell lennie, mint 0"
+    
+    if config['exit_std_dev'] < 0:
+        return "Az exit_std_dev értékének legalább 0-nak kell lennie"
+    
+    return None
+
+def _check_arbitrage_strategy(config):
+    """
+    Arbitrázs stratégia specifikus validáció
+    
+    Args:
+        config (dict): Konfiguráció
+        
+    Returns:
+        str: Hibaüzenet, vagy None, ha a konfiguráció érvényes
+    """
+    min_spread_pct = config['min_spread_pct']
+    
+    if min_spread_pct <= 0:
+        return "A min_spread_pct értékének nagyobbnak kell lennie, mint 0"
+    
+    if min_spread_pct >= config['max_spread_pct']:
+        return "A min_spread_pct értékének kisebbnek kell lennie, mint a max_spread_pct"
+    
+    return None
+
+def _build_validator(defaults, extra_checks):
+    """
+    Stratégia validátor összeállítása (importáláskor, egyszer)
+    
+    Args:
+        defaults (dict): Alapértelmezett konfiguráció
+        extra_checks (callable): Stratégia-specifikus ellenőrzés
+        
+    Returns:
+        tuple: (kötelező mezők, mező -> elvárt típus, stratégia-specifikus ellenőrzés)
+    """
+    required_keys = frozenset(defaults)
+    
+    # A lista mezők tuple-ként is elfogadottak (a befagyasztott alapértékekből készült konfigurációkhoz)
+    type_map = {key: (list, tuple) if isinstance(value, list) else type(value) for key, value in defaults.items()}
+    return required_keys, type_map, extra_checks
+
+# Stratégia típus -> előre összeállított validátor
+_VALIDATORS = {
+    'grid_trading': _build_validator(_GRID_DEFAULTS, _check_grid_trading),
+    'dca_strategy': _build_validator(_DCA_DEFAULTS, _check_dca_strategy),
+    'momentum_strategy': _build_validator(_MOMENTUM_DEFAULTS, _check_momentum_strategy),
+    'mean_reversion': _build_validator(_MEAN_REVERSION_DEFAULTS, _check_mean_reversion),
+    'arbitrage_strategy': _build_validator(_ARBITRAGE_DEFAULTS, _check_arbitrage_strategy)
+}
+
 class StrategyConfig:
     """
     Stratégia beállítások kezelése
@@ -18,96 +237,10 @@ class StrategyConfig:
             strategy_type (str): Stratégia típusa
             
         Returns:
-            dict: Alapértelmezett konfiguráció
+            MappingProxyType: Alapértelmezett konfiguráció (rekurzívan csak olvasható, módosításhoz
+                config.frozen.thaw(...) másolat szükséges)
         """
-        if strategy_type == 'grid_trading':
-            return {
-                'grid_levels': 5,
-                'upper_price': 0,  # 0 = automatikus
-                'lower_price': 0,  # 0 = automatikus
-                'quantity_per_grid': 0.01,
-                'price_deviation_pct': 2.0,
-                'take_profit_pct': 1.0,
-                'stop_loss_pct': 5.0,
-                'trailing_stop': False,
-                'trailing_stop_pct': 1.0,
-                'rebalance_interval': 86400,  # 24 óra másodpercben
-                'max_open_positions': 10,
-                'use_indicators': True,
-                'indicators': ['rsi', 'bollinger_bands']
-            }
-        elif strategy_type == 'dca_strategy':
-            return {
-                'base_order_size': 10.0,  # USDT
-                'safety_order_size': 20.0,  # USDT
-                'max_safety_orders': 3,
-                'price_deviation_pct': 2.5,
-                'safety_order_step_scale': 1.5,
-                'safety_order_volume_scale': 1.5,
-                'take_profit_pct': 3.0,
-                'stop_loss_pct': 15.0,
-                'trailing_stop': True,
-                'trailing_stop_pct': 1.0,
-                'cooldown_period': 86400,  # 24 óra másodpercben
-                'max_active_deals': 5
-            }
-        elif strategy_type == 'momentum_strategy':
-            return {
-                'lookback_period': 14,
-                'entry_threshold': 0.5,
-                'exit_threshold': -0.2,
-                'position_size_pct': 10.0,
-                'max_positions': 5,
-                'take_profit_pct': 5.0,
-                'stop_loss_pct': 3.0,
-                'trailing_stop': True,
-                'trailing_stop_pct': 1.0,
-                'indicators': ['rsi', 'macd', 'adx'],
-                'rsi_period': 14,
-                'rsi_overbought': 70,
-                'rsi_oversold': 30,
-                'macd_fast': 12,
-                'macd_slow': 26,
-                'macd_signal': 9,
-                'adx_period': 14,
-                'adx_threshold': 25
-            }
-        elif strategy_type == 'mean_reversion':
-            return {
-                'lookback_period': 20,
-                'entry_std_dev': 2.0,
-                'exit_std_dev': 0.5,
-                'position_size_pct': 10.0,
-                'max_positions': 5,
-                'take_profit_pct': 3.0,
-                'stop_loss_pct': 5.0,
-                'max_holding_period': 86400,  # 24 óra másodpercben
-                'indicators': ['bollinger_bands', 'rsi', 'stochastic'],
-                'bollinger_period': 20,
-                'bollinger_std_dev': 2.0,
-                'rsi_period': 14,
-                'rsi_overbought': 70,
-                'rsi_oversold': 30,
-                'stochastic_k_period': 14,
-                'stochastic_d_period': 3,
-                'stochastic_overbought': 80,
-                'stochastic_oversold': 20
-            }
-        elif strategy_type == 'arbitrage_strategy':
-            return {
-                'min_spread_pct': 0.5,
-                'max_spread_pct': 5.0,
-                'position_size_pct': 20.0,
-                'max_positions': 3,
-                'max_slippage_pct': 0.2,
-                'max_execution_time': 10,  # másodperc
-                'exchanges': ['binance', 'kraken', 'coinbase'],
-                'recheck_interval': 60,  # másodperc
-                'auto_withdraw': False,
-                'min_volume_usd': 10000.0
-            }
-        else:
-            return {}
+        return _DEFAULTS.get(strategy_type, _EMPTY)
     
     @staticmethod
     def load_config(strategy_id):
@@ -124,8 +257,7 @@ class StrategyConfig:
         
         if os.path.exists(config_file):
             try:
-                with open(config_file, 'r') as f:
-                    return json.load(f)
+                return load_file(config_file)
             except Exception as e:
                 print(f"Hiba a konfiguráció betöltése során: {e}")
                 return {}
@@ -144,14 +276,11 @@ class StrategyConfig:
         Returns:
             bool: Sikeres-e a mentés
         """
-        config_dir = os.path.join('data', 'strategies')
-        os.makedirs(config_dir, exist_ok=True)
-        
-        config_file = os.path.join(config_dir, f'strategy_{strategy_id}.json')
+        config_file = os.path.join('data', 'strategies', f'strategy_{strategy_id}.json')
         
         try:
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            # Atomikus írás: egy megszakított mentés nem rontja el a meglévő konfigurációt
+            atomic_write(config_file, config)
             return True
         except Exception as e:
             print(f"Hiba a konfiguráció mentése során: {e}")
@@ -169,54 +298,27 @@ class StrategyConfig:
         Returns:
             tuple: (bool, str) - Érvényes-e a konfiguráció, hibaüzenet
         """
-        # Alapértelmezett konfiguráció lekérdezése
-        default_config = StrategyConfig.get_default_config(strategy_type)
+        validator = _VALIDATORS.get(strategy_type)
+        if validator is None:
+            return True, ""
         
-        # Kötelező mezők ellenőrzése
-        for key in default_config:
-            if key not in config:
-                return False, f"Hiányzó mező: {key}"
+        required_keys, type_map, extra_checks = validator
+        
+        # Kötelező mezők ellenőrzése (halmaz különbség, hiba esetén az első hiányzó mező)
+        missing = required_keys - config.keys()
+        if missing:
+            key = next(key for key in type_map if key in missing)
+            return False, f"Hiányzó mező: {key}"
         
         # Típus ellenőrzés
-        for key, value in config.items():
-            if key in default_config:
-                if not isinstance(value, type(default_config[key])):
-                    return False, f"Érvénytelen típus: {key} - {type(value)} != {type(default_config[key])}"
+        for key, expected_type in type_map.items():
+            value = config[key]
+            if not isinstance(value, expected_type):
+                return False, f"Érvénytelen típus: {key} - {type(value)} != {expected_type}"
         
         # Stratégia-specifikus validáció
-        if strategy_type == 'grid_trading':
-            if config['grid_levels'] < 2 or config['grid_levels'] > 100:
-                return False, "A grid_levels értékének 2 és 100 között kell lennie"
-            
-            if config['price_deviation_pct'] <= 0:
-                return False, "A price_deviation_pct értékének nagyobbnak kell lennie, mint 0"
-        
-        elif strategy_type == 'dca_strategy':
-            if config['base_order_size'] <= 0:
-                return False, "A base_order_size értékének nagyobbnak kell lennie, mint 0"
-            
-            if config['max_safety_orders'] < 0 or config['max_safety_orders'] > 10:
-                return False, "A max_safety_orders értékének 0 és 10 között kell lennie"
-        
-        elif strategy_type == 'momentum_strategy':
-            if config['lookback_period'] < 1:
-                return False, "A lookback_period értékének legalább 1-nek kell lennie"
-            
-            if config['position_size_pct'] <= 0 or config['position_size_pct'] > 100:
-                return False, "A position_size_pct értékének 0 és 100 között kell lennie"
-        
-        elif strategy_type == 'mean_reversion':
-            if config['entry_std_dev'] <= 0:
-                return False, "Az entry_std_dev értékének nagyobbnak kell lennie, mint 0"
-            
-            if config['exit_std_dev'] < 0:
-                return False, "Az exit_std_dev értékének legalább 0-nak kell lennie"
-        
-        elif strategy_type == 'arbitrage_strategy':
-            if config['min_spread_pct'] <= 0:
-                return False, "A min_spread_pct értékének nagyobbnak kell lennie, mint 0"
-            
-            if config['min_spread_pct'] >= config['max_spread_pct']:
-                return False, "A min_spread_pct értékének kisebbnek kell lennie, mint a max_spread_pct"
+        error = extra_checks(config)
+        if error:
+            return False, error
         
         return True, ""
@@ -1,7 +1,12 @@
 """
 Execution Engine - Végrehajtja a kereskedési megbízásokat a különböző tőzsdéken.
 """
+import asyncio
 import logging
+import random
+import threading
+import time
+from collections import defaultdict
 from typing import Dict, List, Optional
 from datetime import datetime
 
@@ -10,6 +15,9 @@ from src.exchanges.exchange_factory import ExchangeFactory
 
 logger = setup_logger('execution_engine')
 
+# A "nem fut" figyelmeztetések legkisebb időköze (másodperc)
+_NOT_RUNNING_LOG_INTERVAL = 60.0
+
 class ExecutionEngine:
     """
     Végrehajtja a kereskedési megbízásokat a különböző tőzsdéken.
@@ -24,16 +32,48 @@ class ExecutionEngine:
             config: Az ExecutionEngine konfigurációja
         """
         self.config = config
-        self.is_running = False
+        self._running = threading.Event()
+        self._not_running_logged_at = None
         self.exchange_factory = ExchangeFactory()
-        self.exchanges = {}  # Exchange név -> Exchange objektum
+        
+        # Tőzsdék párhuzamos tömbökben (SoA), egész indexszel címezve
+        self._exchange_names = ()  # Exchange nevek
+        self._exchange_configs = ()  # Exchange konfigurációk
+        self._exchange_objs = []  # Exchange objektumok (első használatkor létrehozva, addig None)
+        self._exchange_last_used = []  # Utolsó használat (monotonic)
+        self._exchange_index = {}  # Exchange név -> index (csak a név alapú API-hoz)
+        self._default_exchange = -1  # Alapértelmezett tőzsde indexe (-1: nincs)
         
         # Konfigurációs beállítások
         self.max_retries = config.get('max_retries', 3)
         self.retry_delay = config.get('retry_delay', 1.0)  # másodperc
+        self.max_retry_delay = config.get('max_retry_delay', 30.0)  # másodperc
+        self._sleep = time.sleep
         
         logger.info("ExecutionEngine initialized")
     
+    @property
+    def is_running(self) -> bool:
+        """
+        Fut-e az ExecutionEngine (szálbiztos jelző).
+        
+        Returns:
+            bool: True, ha az ExecutionEngine fut
+        """
+        return self._running.is_set()
+    
+    def _warn_not_running(self, action: str) -> None:
+        """
+        Figyelmeztetés naplózása leállított motor esetén, időközönként legfeljebb egyszer.
+        
+        Args:
+            action: A meghiúsult művelet leírása
+        """
+        now = time.monotonic()
+        if self._not_running_logged_at is None or now - self._not_running_logged_at >= _NOT_RUNNING_LOG_INTERVAL:
+            self._not_running_logged_at = now
+            logger.warning("ExecutionEngine is not running, %s", action)
+    
     def start(self) -> bool:
         """
         Elindítja az ExecutionEngine-t.
@@ -41,19 +81,20 @@ class ExecutionEngine:
         Returns:
             bool: Sikeres indítás esetén True, egyébként False
         """
-        if self.is_running:
+        if self._running.is_set():
             logger.warning("ExecutionEngine is already running")
             return False
         
         try:
-            self.is_running = True
+            self._running.set()
+            self._not_running_logged_at = None
             self._initialize_exchanges()
             logger.info("ExecutionEngine started successfully")
             return True
         
         except Exception as e:
             logger.error(f"Failed to start ExecutionEngine: {str(e)}")
-            self.is_running = False
+            self._running.clear()
             return False
     
     def stop(self) -> bool:
@@ -63,12 +104,12 @@ class ExecutionEngine:
         Returns:
             bool: Sikeres leállítás esetén True, egyébként False
         """
-        if not self.is_running:
+        if not self._running.is_set():
             logger.warning("ExecutionEngine is not running")
             return False
         
         try:
-            self.is_running = False
+            self._running.clear()
             logger.info("ExecutionEngine stopped successfully")
             return True
         
@@ -78,7 +119,11 @@ class ExecutionEngine:
     
     def _initialize_exchanges(self) -> None:
         """
-        Inicializálja a konfigurált tőzsdéket.
+        Betölti a konfigurált tőzsdék beállításait.
+        
+        A tőzsde kapcsolatok csak az első használatkor jönnek létre (lásd
+        _get_exchange), így a nem használt tőzsdék nem foglalnak memóriát és
+        nem tartanak nyitva kapcsolatot.
         """
         try:
             # Valós implementációban itt betöltenénk a tőzsdéket az adatbázisból
@@ -90,21 +135,115 @@ class ExecutionEngine:
                 {"name": "coinbase", "api_key": "demo_key", "api_secret": "demo_secret"}
             ])
             
-            for exchange_config in exchange_configs:
-                exchange_name = exchange_config.get('name')
-                if not exchange_name:
-                    continue
-                
-                exchange = self.exchange_factory.create_exchange(exchange_name, exchange_config)
-                if exchange:
-                    self.exchanges[exchange_name] = exchange
-                    logger.info(f"Initialized exchange: {exchange_name}")
+            exchange_configs = tuple(
+                exchange_config for exchange_config in exchange_configs
+                if exchange_config.get('name')
+            )
             
-            logger.info(f"Initialized {len(self.exchanges)} exchanges")
+            self._set_exchanges(exchange_configs)
+            logger.info(f"Configured {len(self._exchange_names)} exchanges")
         
         except Exception as e:
             logger.error(f"Error initializing exchanges: {str(e)}")
-            self.exchanges = {}
+            self._set_exchanges(())
+    
+    def _set_exchanges(self, exchange_configs) -> None:
+        """
+        Felépíti a tőzsdék párhuzamos tömbjeit.
+        
+        Args:
+            exchange_configs: A tőzsdék konfigurációi
+        """
+        self._exchange_names = tuple(exchange_config['name'] for exchange_config in exchange_configs)
+        self._exchange_configs = tuple(exchange_configs)
+        self._exchange_objs = [None] * len(exchange_configs)
+        self._exchange_last_used = [0.0] * len(exchange_configs)
+        self._exchange_index = {name: index for index, name in enumerate(self._exchange_names)}
+        
+        # Valós implementációban itt lenne a tőzsde kiválasztási logika
+        # Most egyszerűen a Binance-t használjuk minden megbízáshoz
+        self._default_exchange = self._exchange_index.get("binance", -1)
+    
+    def _get_exchange(self, index: int):
+        """
+        Visszaadja a tőzsde objektumot, szükség esetén létrehozza.
+        
+        Args:
+            index: A tőzsde indexe
+            
+        Returns:
+            Optional: A tőzsde objektum, vagy None ha nem konfigurált vagy nem hozható létre
+        """
+        if index < 0:
+            return None
+        
+        exchange = self._exchange_objs[index]
+        
+        if exchange is None:
+            exchange_name = self._exchange_names[index]
+            exchange = self.exchange_factory.create_exchange(exchange_name, self._exchange_configs[index])
+            if not exchange:
+                return None
+            
+            # A kapcsolatok a megbízások között nyitva maradnak
+            session = getattr(exchange, 'session', None)
+            if session is not None:
+                session.headers.update({'Connection': 'keep-alive'})
+            
+            self._exchange_objs[index] = exchange
+            logger.info(f"Initialized exchange: {exchange_name}")
+        
+        self._exchange_last_used[index] = time.monotonic()
+        return exchange
+    
+    def _get_exchange_by_name(self, exchange_name: str):
+        """
+        Visszaadja a tőzsde objektumot név alapján, szükség esetén létrehozza.
+        
+        Args:
+            exchange_name: A tőzsde neve
+            
+        Returns:
+            Optional: A tőzsde objektum, vagy None ha nem konfigurált vagy nem hozható létre
+        """
+        return self._get_exchange(self._exchange_index.get(exchange_name, -1))
+    
+    @property
+    def exchanges(self) -> Dict:
+        """
+        A már létrehozott tőzsde objektumok.
+        
+        Returns:
+            Dict: Exchange név -> Exchange objektum
+        """
+        return {
+            name: exchange
+            for name, exchange in zip(self._exchange_names, self._exchange_objs)
+            if exchange is not None
+        }
+    
+    def unload_idle_exchanges(self, ttl: float) -> int:
+        """
+        Eldobja a megadott ideje nem használt tőzsde objektumokat.
+        
+        A konfiguráció megmarad, így a tőzsde a következő használatkor újra létrejön.
+        
+        Args:
+            ttl: Tétlenségi idő másodpercben
+            
+        Returns:
+            int: Az eldobott tőzsdék száma
+        """
+        now = time.monotonic()
+        unloaded = 0
+        
+        for index, exchange in enumerate(self._exchange_objs):
+            if exchange is not None and now - self._exchange_last_used[index] >= ttl:
+                self._exchange_objs[index] = None
+                unloaded += 1
+                logger.info(f"Unloaded idle exchange: {self._exchange_names[index]}")
+        
+        return unloaded
     
     def execute_orders(self, orders: List) -> List[Dict]:
         """
@@ -114,28 +253,81 @@ class ExecutionEngine:
             orders: A végrehajtandó megbízások listája
             
         Returns:
-            List[Dict]: A végrehajtási eredmények listája
+            List[Dict]: A végrehajtási eredmények listája (leállított motor esetén üres)
         """
-        if not self.is_running:
-            logger.warning("ExecutionEngine is not running, cannot execute orders")
+        if not self._running.is_set():
+            self._warn_not_running("cannot execute orders")
             return []
         
         execution_results = []
         
         try:
-            for order in orders:
-                # Meghatározza a megfelelő tőzsdét
-                exchange_name = self._determine_exchange_for_order(order)
-                if not exchange_name or exchange_name not in self.exchanges:
-                    logger.warning(f"No suitable exchange found for order: {order.to_dict()}")
+            orders_by_exchange = self._group_orders_by_exchange(orders)
+            
+            for index, exchange_orders in orders_by_exchange.items():
+                exchange = self._get_exchange(index)
+                if exchange is None:
+                    logger.warning(f"Exchange {self._exchange_names[index]} could not be initialized")
                     continue
                 
-                exchange = self.exchanges[exchange_name]
+                # Végrehajtja a megbízásokat
+                execution_results.extend(self._execute_group(exchange, exchange_orders))
+            
+            logger.info(f"Executed {len(execution_results)} orders")
+            return execution_results
+        
+        except Exception as e:
+            logger.error(f"Error executing orders: {str(e)}")
+            return execution_results
+    
+    async def execute_orders_async(self, orders: List) -> List[Dict]:
+        """
+        Végrehajtja a megbízásokat a megfelelő tőzsdéken, párhuzamosan.
+        
+        A tőzsdék csoportjai egyidejűleg futnak. Ha a tőzsde adapter
+        execute_order_async metódust biztosít, a csoporton belüli megbízások is
+        párhuzamosan kerülnek beküldésre, így N megbízás ideje a leglassabb
+        válaszidőhöz közelít. Szinkron adaptereknél a csoport egy munkaszálon
+        fut a _execute_group-pal, így a megbízások kötegelt beküldése (és a
+        köteg sikertelen bejegyzéseinek újraküldése) megmarad; a kérések
+        ütemezését a connectorok szálbiztos, megosztott rate limit vödrei végzik.
+        
+        Args:
+            orders: A végrehajtandó megbízások listája
+            
+        Returns:
+            List[Dict]: A végrehajtási eredmények listája (leállított motor esetén üres)
+        """
+        if not self._running.is_set():
+            self._warn_not_running("cannot execute orders")
+            return []
+        
+        execution_results = []
+        
+        try:
+            orders_by_exchange = self._group_orders_by_exchange(orders)
+            
+            tasks = []
+            for index, exchange_orders in orders_by_exchange.items():
+                exchange = self._get_exchange(index)
+                if exchange is None:
+                    logger.warning(f"Exchange {self._exchange_names[index]} could not be initialized")
+                    continue
                 
-                # Végrehajtja a megbízást
-                result = self._execute_order_with_retry(exchange, order)
-                if result:
-                    execution_results.append(result)
+                execute_async = getattr(exchange, 'execute_order_async', None)
+                if execute_async is not None:
+                    tasks.append(self._execute_group_async(execute_async, exchange_orders))
+                else:
+                    tasks.append(asyncio.to_thread(self._execute_group, exchange, exchange_orders))
+            
+            group_results = await asyncio.gather(*tasks, return_exceptions=True)
+            
+            for results in group_results:
+                if isinstance(results, BaseException):
+                    logger.error(f"Error executing orders: {str(results)}")
+                    continue
+                
+                execution_results.extend(results)
             
             logger.info(f"Executed {len(execution_results)} orders")
             return execution_results
@@ -144,7 +336,97 @@ class ExecutionEngine:
             logger.error(f"Error executing orders: {str(e)}")
             return execution_results
     
-    def _determine_exchange_for_order(self, order) -> Optional[str]:
+    def _group_orders_by_exchange(self, orders: List) -> Dict[int, List]:
+        """
+        Csoportosítja a megbízásokat tőzsdénként, így a tőzsde keresés és a
+        metódus kötés csoportonként egyszer történik meg.
+        
+        Args:
+            orders: A megbízások listája
+            
+        Returns:
+            Dict[int, List]: Tőzsde index -> megbízások
+        """
+        orders_by_exchange = defaultdict(list)
+        
+        for order in orders:
+            index = self._determine_exchange_for_order(order)
+            if index < 0:
+                logger.warning("No suitable exchange found for order: %s", order)
+                continue
+            
+            orders_by_exchange[index].append(order)
+        
+        return orders_by_exchange
+    
+    def _execute_group(self, exchange, orders: List) -> List[Dict]:
+        """
+        Végrehajtja egy tőzsde megbízásait.
+        
+        Ha a tőzsde adapter támogatja a kötegelt beküldést (execute_orders_batch),
+        a megbízások kötegekben, kevesebb hálózati kéréssel kerülnek beküldésre;
+        a köteg biztosan sikertelen (None eredményű) bejegyzései egyenként,
+        újrapróbálkozással futnak újra. Ha a köteg kivételt dob, vagy hiányoznak
+        eredmények, az érintett megbízások sorsa ismeretlen (részben már
+        beküldésre kerülhettek), ezért ezek sikertelennek számítanak, de nem
+        küldődnek újra.
+        
+        Args:
+            exchange: A tőzsde objektum
+            orders: A megbízások listája
+        
+        Returns:
+            List[Dict]: A sikeres végrehajtási eredmények listája
+        """
+        execution_results = []
+        
+        execute_batch = getattr(exchange, 'execute_orders_batch', None)
+        if execute_batch is not None and len(orders) > 1:
+            try:
+                batch_results = execute_batch(orders)
+            except Exception as e:
+                logger.error(f"Error executing order batch, {len(orders)} orders left unconfirmed: {str(e)}")
+                return execution_results
+            
+            if len(batch_results) != len(orders):
+                logger.error(f"Order batch returned {len(batch_results)} results for {len(orders)} orders, "
+                             f"{max(len(orders) - len(batch_results), 0)} orders left unconfirmed")
+            
+            # Részleges hiba esetén csak a sikertelen bejegyzések futnak újra
+            failed_orders = []
+            for order, result in zip(orders, batch_results):
+                if result:
+                    execution_results.append(result)
+                else:
+                    failed_orders.append(order)
+            
+            orders = failed_orders
+        
+        execute = exchange.execute_order
+        for order in orders:
+            result = self._execute_order_with_retry(execute, order)
+            if result:
+                execution_results.append(result)
+        
+        return execution_results
+    
+    async def _execute_group_async(self, execute_async, orders: List) -> List[Dict]:
+        """
+        Végrehajtja egy tőzsde megbízásait párhuzamosan.
+        
+        Args:
+            execute_async: A tőzsde execute_order_async metódusa (előre kötve)
+            orders: A megbízások listája
+            
+        Returns:
+            List[Dict]: A sikeres végrehajtási eredmények listája
+        """
+        results = await asyncio.gather(
+            *(self._execute_order_with_retry_async(execute_async, order) for order in orders)
+        )
+        return [result for result in results if result]
+    
+    def _determine_exchange_for_order(self, order) -> int:
         """
         Meghatározza a megfelelő tőzsdét egy adott megbízáshoz.
         
@@ -152,18 +434,17 @@ class ExecutionEngine:
             order: A megbízás
             
         Returns:
-            Optional[str]: A tőzsde neve, vagy None ha nem található megfelelő tőzsde
+            int: A tőzsde indexe, vagy -1 ha nem található megfelelő tőzsde
         """
-        # Valós implementációban itt lenne a tőzsde kiválasztási logika
-        # Most egyszerűen a Binance-t használjuk minden megbízáshoz
-        return "binance" if "binance" in self.exchanges else None
+        # Az alapértelmezett tőzsde indexe a konfiguráció betöltésekor számolódik ki
+        return self._default_exchange
     
-    def _execute_order_with_retry(self, exchange, order) -> Optional[Dict]:
+    def _execute_order_with_retry(self, execute, order) -> Optional[Dict]:
         """
         Végrehajtja a megbízást újrapróbálkozással hiba esetén.
         
         Args:
-            exchange: A tőzsde objektum
+            execute: A tőzsde execute_order metódusa (előre kötve)
             order: A megbízás
             
         Returns:
@@ -174,30 +455,98 @@ class ExecutionEngine:
         while retries < self.max_retries:
             try:
                 # Végrehajtja a megbízást
-                result = exchange.execute_order(order)
+                result = execute(order)
                 
                 if result:
-                    logger.info(f"Order executed successfully: {order.to_dict()}")
+                    logger.info("Order executed successfully: %s", order)
                     return result
                 
-                logger.warning(f"Failed to execute order, retrying: {order.to_dict()}")
+                logger.warning("Failed to execute order, retrying: %s", order)
                 retries += 1
                 
                 # Vár a következő próbálkozás előtt
-                import time
-                time.sleep(self.retry_delay)
+                self._backoff(retries)
             
             except Exception as e:
                 logger.error(f"Error executing order: {str(e)}")
                 retries += 1
                 
                 # Vár a következő próbálkozás előtt
-                import time
-                time.sleep(self.retry_delay)
+                self._backoff(retries)
+        
+        logger.error("Failed to execute order after %d retries: %s", self.max_retries, order)
+        return None
+    
+    async def _execute_order_with_retry_async(self, execute_async, order) -> Optional[Dict]:
+        """
+        Végrehajtja a megbízást újrapróbálkozással hiba esetén, az eseményhurok
+        blokkolása nélkül.
+        
+        Args:
+            execute_async: A tőzsde execute_order_async metódusa (előre kötve)
+            order: A megbízás
+            
+        Returns:
+            Optional[Dict]: A végrehajtási eredmény, vagy None hiba esetén
+        """
+        retries = 0
+        
+        while retries < self.max_retries:
+            try:
+                # Végrehajtja a megbízást
+                result = await execute_async(order)
+                
+                if result:
+                    logger.info("Order executed successfully: %s", order)
+                    return result
+                
+                logger.warning("Failed to execute order, retrying: %s", order)
+                retries += 1
+            
+            except Exception as e:
+                logger.error(f"Error executing order: {str(e)}")
+                retries += 1
+            
+            # Vár a következő próbálkozás előtt
+            delay = self._backoff_delay(retries)
+            if delay:
+                await asyncio.sleep(delay)
         
-        logger.error(f"Failed to execute order after {self.max_retries} retries: {order.to_dict()}")
+        logger.error("Failed to execute order after %d retries: %s", self.max_retries, order)
         return None
     
+    def _backoff_delay(self, retries: int) -> float:
+        """
+        Kiszámolja a várakozási időt két próbálkozás között.
+        
+        Exponenciálisan növekvő, véletlenszerűsített várakozás: a véletlen
+        tényező (jitter) szétteríti az egyszerre hibázó megbízások
+        újrapróbálkozásait, így tőzsde kiesés esetén sem érkeznek egyszerre.
+        Az utolsó sikertelen próbálkozás után nincs várakozás.
+        
+        Args:
+            retries: Az eddigi sikertelen próbálkozások száma
+            
+        Returns:
+            float: Várakozási idő másodpercben
+        """
+        if retries >= self.max_retries:
+            return 0.0
+        
+        delay = min(self.retry_delay * (2 ** (retries - 1)), self.max_retry_delay)
+        return delay * random.uniform(0.5, 1.0)
+    
+    def _backoff(self, retries: int) -> None:
+        """
+        Várakozás két próbálkozás között.
+        
+        Args:
+            retries: Az eddigi sikertelen próbálkozások száma
+        """
+        delay = self._backoff_delay(retries)
+        if delay:
+            self._sleep(delay)
+    
     def cancel_order(self, order_id: str, exchange_name: str) -> bool:
         """
         Visszavon egy megbízást.
@@ -209,16 +558,15 @@ class ExecutionEngine:
         Returns:
             bool: Sikeres visszavonás esetén True, egyébként False
         """
-        if not self.is_running:
-            logger.warning("ExecutionEngine is not running, cannot cancel order")
+        if not self._running.is_set():
+            self._warn_not_running("cannot cancel order")
             return False
         
         try:
-            if exchange_name not in self.exchanges:
+            exchange = self._get_exchange_by_name(exchange_name)
+            if exchange is None:
                 logger.warning(f"Exchange {exchange_name} not found")
                 return False
-            
-            exchange = self.exchanges[exchange_name]
             result = exchange.cancel_order(order_id)
             
             if result:
@@ -243,16 +591,15 @@ class ExecutionEngine:
         Returns:
             Optional[Dict]: A megbízás állapota, vagy None hiba esetén
         """
-        if not self.is_running:
-            logger.warning("ExecutionEngine is not running, cannot get order status")
+        if not self._running.is_set():
+            self._warn_not_running("cannot get order status")
             return None
         
         try:
-            if exchange_name not in self.exchanges:
+            exchange = self._get_exchange_by_name(exchange_name)
+            if exchange is None:
                 logger.warning(f"Exchange {exchange_name} not found")
                 return None
-            
-            exchange = self.exchanges[exchange_name]
             return exchange.get_order_status(order_id)
         
         except Exception as e:
@@ -267,7 +614,7 @@ class ExecutionEngine:
             Dict: Az ExecutionEngine állapota
         """
         return {
-            "is_running": self.is_running,
-            "exchanges": list(self.exchanges.keys()),
+            "is_running": self._running.is_set(),
+            "exchanges": list(self._exchange_names),
             "max_retries": self.max_retries
         }
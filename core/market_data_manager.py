@@ -1,16 +1,324 @@
 """
 Market Data Manager - Kezeli a piaci adatok lekérdezését és tárolását.
 """
+import asyncio
+import json
 import logging
+import os
+import tempfile
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
 from src.utils.logger import setup_logger
+from src.config.json_io import loads
+from src.core.tick_ring import TickRing, TickReader
+from src.database.ohlcv_store import OHLCVStore
+from src.exchanges.exchange_factory import ExchangeFactory
 
 logger = setup_logger('market_data_manager')
 
+# OHLCV oszlopok sorrendje a gyűrűpufferben
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Egy gyertya rekord típusa: időbélyeg (epoch ns) és az OHLCV értékek
+OHLCV_DTYPE = np.dtype([('timestamp', np.int64)] + [(field, np.float64) for field in OHLCV_FIELDS])
+
+# Példa ármodell: szimbólum -> (alapár, percenkénti ingadozás)
+_PRICE_MODEL = {
+    'BTC/USDT': (40000.0, 1000.0),
+    'ETH/USDT': (2000.0, 50.0),
+}
+_DEFAULT_PRICE_MODEL = (0.5, 0.05)  # ADA/USDT
+
+# Orderbook szintek: ár szorzók és mennyiségek
+_BID_MULTS = np.array([0.999, 0.998, 0.997, 0.996, 0.995])
+_ASK_MULTS = np.array([1.001, 1.002, 1.003, 1.004, 1.005])
+_BOOK_SIZES = np.array([2.0, 5.0, 10.0, 15.0, 20.0])
+
+_NS_PER_MINUTE = 60_000_000_000
+
+def _apply_tick(timestamps, values, head, count, capacity, minute, price, volume_add, open_volume):
+    """
+    Egy ár tick beírása a gyűrűpufferbe (numba elérhetősége esetén natívan fordítva).
+    
+    Ha a tick a legutóbbi gyertya percébe esik, azt frissíti; egyébként új
+    gyertyát nyit az előző záróárral nyitva.
+    
+    Args:
+        timestamps, values: A gyűrűpuffer tömbjei
+        head, count, capacity: A gyűrűpuffer állapota
+        minute: A tick perce (epoch perc)
+        price: Aktuális ár
+        volume_add: Meglévő gyertya forgalmához adandó mennyiség
+        open_volume: Új gyertya kezdő forgalma
+        
+    Returns:
+        tuple: Az új (head, count) érték
+    """
+    last = head - 1 + capacity
+    
+    if count > 0 and timestamps[last] // _NS_PER_MINUTE == minute:
+        if price > values[last, 1]:
+            values[last, 1] = price
+        if price < values[last, 2]:
+            values[last, 2] = price
+        values[last, 3] = price
+        values[last, 4] += volume_add
+        
+        for k in range(5):
+            values[last - capacity, k] = values[last, k]
+        return head, count
+    
+    open_ = values[last, 3] if count > 0 else price
+    
+    i = head
+    j = i + capacity
+    timestamps[i] = timestamps[j] = minute * _NS_PER_MINUTE
+    values[i, 0] = values[j, 0] = open_
+    values[i, 1] = values[j, 1] = max(open_, price)
+    values[i, 2] = values[j, 2] = min(open_, price)
+    values[i, 3] = values[j, 3] = price
+    values[i, 4] = values[j, 4] = open_volume
+    
+    return (i + 1) % capacity, min(count + 1, capacity)
+
+if njit is not None:
+    _apply_tick = njit(cache=True, nogil=True)(_apply_tick)
+
+class OHLCVRing:
+    """
+    Fix méretű OHLCV gyűrűpuffer előre lefoglalt NumPy tömbökkel.
+    
+    A gyertyák egyetlen OHLCV_DTYPE rekord tömbben vannak; a timestamps
+    (int64 epoch ns) és values (float64, n x 5) attribútumok ugyanerre a
+    memóriára mutató nézetek. Minden sor kétszer kerül tárolásra (i és
+    i + capacity pozíción), így a legutóbbi n gyertya mindig egyetlen
+    összefüggő szeletként, másolás nélkül kiadható.
+    """
+    __slots__ = ('capacity', 'head', 'count', 'records', 'timestamps', 'values')
+    
+    def __init__(self, capacity: int):
+        """
+        Inicializálja a gyűrűpuffert.
+        
+        Args:
+            capacity: A tárolható gyertyák maximális száma
+        """
+        self.capacity = capacity
+        self.head = 0  # A következő írási pozíció
+        self.count = 0  # A tárolt gyertyák száma
+        self.records = np.zeros(2 * capacity, dtype=OHLCV_DTYPE)
+        self.timestamps = self.records['timestamp']
+        self.values = self.records.view(np.float64).reshape(2 * capacity, len(OHLCV_DTYPE))[:, 1:]
+    
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: A tárolt gyertyák száma
+        """
+        return self.count
+    
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """
+        Új gyertya hozzáadása O(1) időben; megtelt puffer esetén a legrégebbi felülíródik.
+        
+        Args:
+            timestamp: Időbélyeg (epoch ns)
+            open_, high, low, close, volume: A gyertya értékei
+        """
+        i = self.head
+        j = i + self.capacity
+        row = (open_, high, low, close, volume)
+        
+        self.timestamps[i] = self.timestamps[j] = timestamp
+        self.values[i] = row
+        self.values[j] = row
+        
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+    
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Több gyertya hozzáadása egyetlen vektorizált írással.
+        
+        Args:
+            timestamps: Időbélyegek (epoch ns)
+            values: OHLCV értékek (n x 5)
+        """
+        n = len(timestamps)
+        if n > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            values = values[-self.capacity:]
+            n = self.capacity
+        
+        index = (self.head + np.arange(n)) % self.capacity
+        self.timestamps[index] = timestamps
+        self.timestamps[index + self.capacity] = timestamps
+        self.values[index] = values
+        self.values[index + self.capacity] = values
+        
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+    
+    def last_timestamp(self) -> Optional[int]:
+        """
+        A legutóbbi gyertya időbélyege.
+        
+        Returns:
+            Optional[int]: Időbélyeg (epoch ns), vagy None üres puffer esetén
+        """
+        if self.count == 0:
+            return None
+        return int(self.timestamps[self.head - 1 + self.capacity])
+    
+    def last_close(self) -> float:
+        """
+        A legutóbbi gyertya záróára.
+        
+        Returns:
+            float: Záróár
+        """
+        return float(self.values[self.head - 1 + self.capacity, 3])
+    
+    def update_last(self, price: float, volume_add: float) -> None:
+        """
+        A legutóbbi (még nyitott) gyertya frissítése helyben.
+        
+        Args:
+            price: Aktuális ár
+            volume_add: A gyertya forgalmához adandó mennyiség
+        """
+        j = self.head - 1 + self.capacity
+        row = self.values[j]
+        
+        if price > row[1]:
+            row[1] = price
+        if price < row[2]:
+            row[2] = price
+        row[3] = price
+        row[4] += volume_add
+        
+        self.values[j - self.capacity] = row
+    
+    def apply_tick(self, minute: int, price: float, volume_add: float, open_volume: float) -> None:
+        """
+        Ár tick alkalmazása: a perc gyertyájának frissítése, vagy új gyertya nyitása.
+        
+        Args:
+            minute: A tick perce (epoch perc)
+            price: Aktuális ár
+            volume_add: Meglévő gyertya forgalmához adandó mennyiség
+            open_volume: Új gyertya kezdő forgalma
+        """
+        self.head, self.count = _apply_tick(self.timestamps, self.values, self.head, self.count,
+                                            self.capacity, minute, price, volume_add, open_volume)
+    
+    def view(self, n: int) -> np.recarray:
+        """
+        A legutóbbi n gyertya másolás nélküli rekord nézete.
+        
+        Args:
+            n: A gyertyák száma (0 vagy túl nagy érték esetén az összes)
+            
+        Returns:
+            np.recarray: OHLCV_DTYPE rekordok időrendben (pl. candles.close, candles['close'])
+        """
+        if n <= 0 or n > self.count:
+            n = self.count
+        
+        end = self.head + self.capacity
+        return self.records[end - n:end].view(np.recarray)
+    
+    def latest(self, n: int):
+        """
+        A legutóbbi n gyertya másolás nélküli nézete.
+        
+        Args:
+            n: A gyertyák száma (0 vagy túl nagy érték esetén az összes)
+            
+        Returns:
+            tuple: (időbélyegek [n], OHLCV értékek [n x 5]) nézetek, időrendben
+        """
+        if n <= 0 or n > self.count:
+            n = self.count
+        
+        end = self.head + self.capacity
+        return self.timestamps[end - n:end], self.values[end - n:end]
+
+class SymbolState:
+    """
+    Egy szimbólum piaci adatai (shard) saját író zárral.
+    
+    Az írók csak a saját szimbólumuk zárját fogják, így a különböző
+    szimbólumok frissítései nem várnak egymásra. A ticker és az orderbook
+    szótárak frissítéskor újként, egyetlen értékadással cserélődnek, ezért
+    az olvasók zár nélkül olvashatják őket; az OHLCV pufferek helyben frissülnek.
+    """
+    __slots__ = ('ticker', 'ohlcv', 'orderbook', 'lock')
+    
+    def __init__(self, timeframes: List[str], max_candles: int):
+        """
+        Inicializálja a szimbólum adatait.
+        
+        Args:
+            timeframes: Az időkeretek (pl. 1m, 5m)
+            max_candles: Maximális gyertyák száma időkeretenként
+        """
+        self.ticker = {
+            'last': 0.0,
+            'bid': 0.0,
+            'ask': 0.0,
+            'volume': 0.0,
+            'timestamp': None
+        }
+        self.ohlcv = {timeframe: OHLCVRing(max_candles) for timeframe in timeframes}
+        self.orderbook = {
+            'bids': np.empty((0, 2)),
+            'asks': np.empty((0, 2)),
+            'timestamp': None
+        }
+        self.lock = threading.Lock()
+    
+    def to_dict(self, include_ohlcv: bool = False) -> Dict:
+        """
+        A gyertyák csak kérésre kerülnek bele: ilyenkor a zár alatt másolt
+        OHLCV_DTYPE rekord tömbök, így a hívó stabil adatot kap, és a belső
+        gyűrűpuffer típusa nem kerül ki.
+        
+        Args:
+            include_ohlcv: Tartalmazza-e a gyertyák másolatát
+            
+        Returns:
+            Dict: A szimbólum adatai ('ticker', 'orderbook', kérésre 'ohlcv')
+        """
+        data = {
+            'ticker': self.ticker,
+            'orderbook': self.orderbook
+        }
+        
+        if include_ohlcv:
+            with self.lock:
+                data['ohlcv'] = {timeframe: ring.view(0).copy() for timeframe, ring in self.ohlcv.items()}
+        
+        return data
+
 class MarketDataManager:
     """
     Kezeli a piaci adatok lekérdezését, tárolását és hozzáférését.
@@ -27,7 +335,10 @@ class MarketDataManager:
         self.config = config
         self.is_running = False
         self.data_thread = None
-        self.market_data = {}  # Szimbólum -> adatok
+        self._stop_event = threading.Event()  # Megszakítja a frissítési szál várakozását
+        # Szimbólum -> SymbolState; a szótár az inicializálás után nem változik,
+        # így az olvasók zár nélkül érik el a szimbólumok adatait
+        self._shards: Dict[str, SymbolState] = {}
         
         # Konfigurációs beállítások
         self.update_interval = config.get('update_interval', 10)  # másodperc
@@ -36,8 +347,60 @@ class MarketDataManager:
         self.max_candles = config.get('max_candles', 1000)  # Maximális gyertyák száma timeframe-enként
         self.exchanges = config.get('exchanges', ['binance'])
         
+        # Ármodell paraméterek a szimbólumok sorrendjében, vektoros frissítéshez
+        price_model = np.array([_PRICE_MODEL.get(symbol, _DEFAULT_PRICE_MODEL) for symbol in self.symbols],
+                               dtype=np.float64).reshape(-1, 2)
+        self._base_prices = price_model[:, 0]
+        self._price_scales = price_model[:, 1]
+        self._symbol_indices = np.arange(len(self.symbols))
+        
+        # Előre lefoglalt orderbook tömbök: [puffer, bids/asks, szimbólum, szint, (ár, mennyiség)].
+        # A két puffer frissítésenként váltakozik, így az előző pillanatkép orderbook
+        # nézetei a következő frissítésig változatlanok maradnak.
+        self._book_buffers = np.empty((2, 2, len(self.symbols), len(_BOOK_SIZES), 2))
+        self._book_buffers[..., 1] = _BOOK_SIZES
+        self._book_slot = 0
+        
+        # Tick folyam a feliratkozott olvasóknak (szimbólum index = self.symbols pozíció)
+        self._ticks = TickRing(max(config.get('tick_buffer_size', 4096), len(self.symbols)))
+        self._ticks_lock = threading.Lock()  # A tick folyam íróit sorosítja
+        
+        # WebSocket tick folyam (Binance ticker formátum); enélkül periodikus lekérdezés
+        self.websocket_url = config.get('websocket_url')
+        self.use_polling = config.get('use_polling', False) or not self.websocket_url
+        if not self.use_polling and websockets is None:
+            logger.warning("websockets package not installed, falling back to polling")
+            self.use_polling = True
+        self._stream_symbols = {symbol.replace('/', ''): index for index, symbol in enumerate(self.symbols)}
+        self._loop = None
+        self._ws_task = None
+        
+        # OHLCV gyertyák megőrzése leállítás és újraindítás között (None: kikapcsolva)
+        self.ohlcv_cache_dir = config.get('ohlcv_cache_dir', os.path.join('data', 'ohlcv_cache'))
+        
+        # Historikus gyertya archívum a backtesthez (oszlopos Parquet tároló; None: kikapcsolva)
+        ohlcv_store_dir = config.get('ohlcv_store_dir', os.path.join('data', 'ohlcv_store'))
+        self._ohlcv_store = OHLCVStore(ohlcv_store_dir) if ohlcv_store_dir else None
+        
+        # Lekérdezéses módban az adatforrás tőzsde (None: példa adatok); a szimbólumok
+        # lekérdezése párhuzamosan, korlátos szálkészleten fut
+        self.data_exchange = config.get('data_exchange')
+        self.fetch_workers = config.get('fetch_workers', 8)
+        self._exchange = None
+        self._fetch_pool = None
+        
         logger.info("MarketDataManager initialized")
     
+    @property
+    def market_data(self) -> Dict:
+        """
+        Az aktuális piaci adatok a gyertyákkal együtt (visszafelé kompatibilis hozzáférés).
+        
+        Returns:
+            Dict: Szimbólum -> adatok
+        """
+        return self.get_latest_data(include_ohlcv=True)
+    
     def start(self) -> bool:
         """
         Elindítja a MarketDataManager-t és a piaci adatok frissítését.
@@ -51,12 +414,20 @@ class MarketDataManager:
         
         try:
             self.is_running = True
+            self._stop_event.clear()
+            
+            if self.use_polling and self.data_exchange:
+                self._exchange = ExchangeFactory().create_exchange(self.data_exchange,
+                                                                   self.config.get('exchange_config', {}))
+                self._fetch_pool = ThreadPoolExecutor(max_workers=max(1, min(self.fetch_workers, len(self.symbols))),
+                                                      thread_name_prefix='mdm-fetch')
             
             # Inicializálja a piaci adatokat
             self._initialize_market_data()
             
             # Elindítja az adatfrissítési szálat
-            self.data_thread = threading.Thread(target=self._data_update_loop)
+            target = self._data_update_loop if self.use_polling else self._stream_loop
+            self.data_thread = threading.Thread(target=target)
             self.data_thread.daemon = True
             self.data_thread.start()
             
@@ -81,10 +452,27 @@ class MarketDataManager:
         
         try:
             self.is_running = False
+            self._stop_event.set()
+            
+            # A WebSocket olvasó megszakítása a saját event loop-jában
+            loop = self._loop
+            if loop is not None:
+                try:
+                    loop.call_soon_threadsafe(self._cancel_stream)
+                except RuntimeError:
+                    pass  # A loop közben már leállt
             
             if self.data_thread and self.data_thread.is_alive():
                 self.data_thread.join(timeout=10)
             
+            if self._fetch_pool is not None:
+                self._fetch_pool.shutdown(wait=True)
+                self._fetch_pool = None
+            self._exchange = None
+            
+            self._save_ohlcv_cache()
+            self._archive_ohlcv()
+            
             logger.info("MarketDataManager stopped successfully")
             return True
         
@@ -97,158 +485,462 @@ class MarketDataManager:
         Inicializálja a piaci adatokat minden szimbólumra és időkeretre.
         """
         try:
-            for symbol in self.symbols:
-                self.market_data[symbol] = {
-                    'ticker': {
-                        'last': 0.0,
-                        'bid': 0.0,
-                        'ask': 0.0,
-                        'volume': 0.0,
-                        'timestamp': None
-                    },
-                    'ohlcv': {timeframe: [] for timeframe in self.timeframes},
-                    'orderbook': {
-                        'bids': [],
-                        'asks': [],
-                        'timestamp': None
-                    }
-                }
+            self._shards = {symbol: SymbolState(self.timeframes, self.max_candles) for symbol in self.symbols}
             
-            # Kezdeti adatok lekérdezése
-            self._update_market_data()
+            # Korábban mentett gyertyák visszatöltése
+            self._load_ohlcv_cache()
+            
+            # Kezdeti adatok lekérdezése (tick folyam esetén az adatok a folyamból érkeznek)
+            if self.use_polling:
+                self._update_market_data()
             
             logger.info("Market data initialized")
         
         except Exception as e:
             logger.error(f"Error initializing market data: {str(e)}")
     
+    def _ohlcv_cache_path(self, symbol: str, timeframe: str) -> str:
+        """
+        Visszaadja egy szimbólum és időkeret OHLCV gyorsítótár fájljának útvonalát.
+        
+        Args:
+            symbol: A szimbólum (pl. BTC/USDT)
+            timeframe: Az időkeret (pl. 1m)
+            
+        Returns:
+            str: A fájl elérési útja
+        """
+        return os.path.join(self.ohlcv_cache_dir, f"{symbol.replace('/', '_')}_{timeframe}.npz")
+    
+    def _load_ohlcv_cache(self) -> None:
+        """
+        Betölti a korábban mentett gyertyákat az OHLCV gyűrűpufferekbe.
+        """
+        if not self.ohlcv_cache_dir:
+            return
+        
+        loaded = 0
+        for symbol, shard in self._shards.items():
+            for timeframe, ring in shard.ohlcv.items():
+                path = self._ohlcv_cache_path(symbol, timeframe)
+                
+                try:
+                    with np.load(path) as cached, shard.lock:
+                        ring.extend(cached['timestamps'], cached['values'])
+                    loaded += 1
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.warning(f"Error loading OHLCV cache {path}: {str(e)}")
+        
+        if loaded:
+            logger.info(f"Loaded {loaded} OHLCV series from cache")
+    
+    def _save_ohlcv_cache(self) -> None:
+        """
+        Atomikusan elmenti a nem üres OHLCV gyűrűpuffereket a gyorsítótár könyvtárba.
+        """
+        if not self.ohlcv_cache_dir:
+            return
+        
+        try:
+            os.makedirs(self.ohlcv_cache_dir, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Error creating OHLCV cache directory: {str(e)}")
+            return
+        
+        for symbol, shard in self._shards.items():
+            for timeframe, ring in shard.ohlcv.items():
+                with shard.lock:
+                    if len(ring) == 0:
+                        continue
+                    timestamps, values = (array.copy() for array in ring.latest(0))
+                path = self._ohlcv_cache_path(symbol, timeframe)
+                
+                tmp = tempfile.NamedTemporaryFile('wb', dir=self.ohlcv_cache_dir, delete=False,
+                                                  prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+                try:
+                    with tmp:
+                        np.savez(tmp, timestamps=timestamps, values=values)
+                    os.replace(tmp.name, path)
+                except Exception as e:
+                    logger.error(f"Error saving OHLCV cache {path}: {str(e)}")
+                    try:
+                        os.unlink(tmp.name)
+                    except OSError:
+                        pass
+    
+    def _archive_ohlcv(self) -> None:
+        """
+        A gyűrűpufferek gyertyáit a historikus OHLCV tárolóba írja.
+        
+        A tároló napi partíciókban, időbélyeg szerint összefésülve ír, így az
+        ismételt archiválás nem duplikál gyertyákat. Csak valós adatforrás
+        (lekérdezett tőzsde vagy WebSocket folyam) gyertyái archiválódnak, a
+        példa adatok nem kerülhetnek a backtestek historikus adatai közé.
+        """
+        if self._ohlcv_store is None:
+            return
+        
+        if self.use_polling and not self.data_exchange:
+            logger.debug("OHLCV archive skipped, market data is generated example data")
+            return
+        
+        written = 0
+        for symbol, shard in self._shards.items():
+            for timeframe, ring in shard.ohlcv.items():
+                with shard.lock:
+                    if len(ring) == 0:
+                        continue
+                    timestamps, values = (array.copy() for array in ring.latest(0))
+                
+                candles = pd.DataFrame(values, columns=OHLCV_FIELDS)
+                candles.insert(0, 'timestamp', pd.to_datetime(timestamps, unit='ns'))
+                
+                try:
+                    self._ohlcv_store.write(symbol, timeframe, candles)
+                    written += 1
+                except ImportError as e:
+                    logger.warning(f"OHLCV archive disabled, Parquet support not available: {str(e)}")
+                    self._ohlcv_store = None
+                    return
+                except Exception as e:
+                    logger.error(f"Error archiving OHLCV {symbol} {timeframe}: {str(e)}")
+        
+        if written:
+            logger.info(f"Archived {written} OHLCV series")
+    
     def _data_update_loop(self) -> None:
         """
         Periodikusan frissíti a piaci adatokat.
         """
         logger.info("Market data update loop started")
         
-        while self.is_running:
+        # Monoton órához kötött határidők: az óraállítás nem zavarja, és a
+        # frissítések nem csúsznak el a feldolgozási idővel
+        next_wake = time.monotonic()
+        
+        while not self._stop_event.is_set():
             try:
-                start_time = time.time()
+                next_wake += self.update_interval
                 
                 # Frissíti a piaci adatokat
                 self._update_market_data()
                 
-                # Kiszámítja a várakozási időt
-                elapsed = time.time() - start_time
-                sleep_time = max(0, self.update_interval - elapsed)
+                # Kiszámítja a várakozási időt a következő határidőig
+                sleep_time = next_wake - time.monotonic()
                 
                 if sleep_time > 0:
-                    time.sleep(sleep_time)
+                    if self._stop_event.wait(sleep_time):
+                        break
+                elif sleep_time < -self.update_interval:
+                    # Túl nagy lemaradás esetén nem pótolja a kimaradt frissítéseket
+                    next_wake = time.monotonic()
             
             except Exception as e:
                 logger.error(f"Error in market data update loop: {str(e)}")
-                time.sleep(self.update_interval)
+                self._stop_event.wait(self.update_interval)
         
         logger.info("Market data update loop stopped")
     
+    def _stream_loop(self) -> None:
+        """
+        A WebSocket tick folyamot dolgozza fel a frissítési szál saját asyncio event loop-jában.
+        """
+        logger.info("Market data stream started")
+        
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        
+        try:
+            self._ws_task = loop.create_task(self._ws_consumer())
+            loop.run_until_complete(self._ws_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop = None
+            self._ws_task = None
+            loop.close()
+        
+        logger.info("Market data stream stopped")
+    
+    def _cancel_stream(self) -> None:
+        """
+        Megszakítja a WebSocket olvasót (az event loop szálán hívódik).
+        """
+        if self._ws_task is not None:
+            self._ws_task.cancel()
+    
+    async def _ws_consumer(self) -> None:
+        """
+        Feliratkozik a szimbólumok ticker folyamára, és a beérkező üzeneteket
+        azonnal feldolgozza; hiba esetén update_interval után újracsatlakozik.
+        """
+        streams = [f"{symbol.replace('/', '').lower()}@ticker" for symbol in self.symbols]
+        subscribe = json.dumps({'method': 'SUBSCRIBE', 'params': streams, 'id': 1})
+        
+        while not self._stop_event.is_set():
+            try:
+                async with websockets.connect(self.websocket_url) as ws:
+                    await ws.send(subscribe)
+                    
+                    async for message in ws:
+                        self._handle_stream_message(loads(message))
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in market data stream: {str(e)}")
+                await asyncio.sleep(self.update_interval)
+    
+    def _handle_stream_message(self, message) -> None:
+        """
+        Egy ticker folyam üzenet feldolgozása.
+        
+        Args:
+            message: A dekódolt üzenet (közvetlen vagy {'stream', 'data'} burkolt ticker esemény)
+        """
+        if not isinstance(message, dict):
+            return
+        
+        data = message.get('data', message)
+        if data.get('e') != '24hrTicker':
+            return
+        
+        index = self._stream_symbols.get(data.get('s'))
+        if index is None:
+            return
+        
+        self._apply_ticker(index, time.time_ns(), float(data['c']), float(data['b']),
+                           float(data['a']), float(data['v']))
+    
+    def _apply_ticker(self, index: int, now_ns: int, last_price: float, bid: float, ask: float,
+                      volume: float, orderbook: Optional[Dict] = None) -> None:
+        """
+        Egy szimbólum ticker frissítésének közzététele a szimbólum adataiban, az
+        OHLCV pufferben és a tick folyamban (csak a szimbólum zárját fogja).
+        
+        Args:
+            index: A szimbólum indexe a self.symbols listában
+            now_ns: Időbélyeg (epoch ns)
+            last_price, bid, ask: Árak
+            volume: 24 órás forgalom
+            orderbook: Új orderbook (None esetén a korábbi marad)
+        """
+        shard = self._shards[self.symbols[index]]
+        ticker = {
+            'last': last_price,
+            'bid': bid,
+            'ask': ask,
+            'volume': volume,
+            'timestamp': datetime.fromtimestamp(now_ns / 1e9)
+        }
+        
+        with shard.lock:
+            # A 24 órás forgalom változása adódik a perc gyertyájához
+            prev_volume = shard.ticker['volume']
+            volume_add = max(volume - prev_volume, 0.0) if prev_volume else 0.0
+            shard.ohlcv['1m'].apply_tick(now_ns // _NS_PER_MINUTE, last_price, volume_add, volume_add)
+            
+            if orderbook is not None:
+                shard.orderbook = orderbook
+            shard.ticker = ticker
+        
+        with self._ticks_lock:
+            self._ticks.publish(now_ns, self._symbol_indices[index:index + 1], bid, ask, last_price, volume)
+    
+    def _fetch_symbol(self, index: int):
+        """
+        Lekérdezi egy szimbólum ticker és orderbook adatait a tőzsdéről (a lekérdező szálkészleten fut).
+        
+        Args:
+            index: A szimbólum indexe a self.symbols listában
+            
+        Returns:
+            tuple: (index, ticker, orderbook); hiba esetén a hiányzó adat None
+        """
+        symbol = self.symbols[index]
+        return index, self._exchange.get_ticker(symbol), self._exchange.get_orderbook(symbol, 5)
+    
+    def _fetch_orderbook(self, index: int, ticker: Dict):
+        """
+        Lekérdezi egy szimbólum orderbook adatait egy kötegben már lekérdezett tickerhez (a lekérdező szálkészleten fut).
+        
+        Args:
+            index: A szimbólum indexe a self.symbols listában
+            ticker: A szimbólum ticker adatai
+            
+        Returns:
+            tuple: (index, ticker, orderbook); hiba esetén a hiányzó adat None
+        """
+        return index, ticker, self._exchange.get_orderbook(self.symbols[index], 5)
+    
+    def _update_from_exchange(self) -> None:
+        """
+        Párhuzamosan lekérdezi az összes szimbólumot, és a válaszokat beérkezési
+        sorrendben teszi közzé, így a lassú válaszok nem tartják fel a többit.
+        
+        Ha a tőzsde adapter támogatja a kötegelt ticker lekérdezést (get_tickers),
+        az összes ticker egyetlen kéréssel érkezik, és csak az orderbookok
+        kérdeződnek le szimbólumonként.
+        """
+        get_tickers = getattr(self._exchange, 'get_tickers', None)
+        
+        if get_tickers is not None:
+            tickers = get_tickers(self.symbols)
+            futures = [
+                self._fetch_pool.submit(self._fetch_orderbook, index, tickers[symbol])
+                for index, symbol in enumerate(self.symbols) if tickers.get(symbol)
+            ]
+        else:
+            futures = [self._fetch_pool.submit(self._fetch_symbol, index) for index in range(len(self.symbols))]
+        
+        for future in as_completed(futures):
+            try:
+                index, ticker, orderbook = future.result()
+            except Exception as e:
+                logger.error("Error fetching market data: %s", e)
+                continue
+            
+            if not ticker:
+                continue
+            
+            now_ns = time.time_ns()
+            last_price = float(ticker['price'])
+            bid = orderbook['bids'][0][0] if orderbook and orderbook['bids'] else last_price
+            ask = orderbook['asks'][0][0] if orderbook and orderbook['asks'] else last_price
+            
+            book = None
+            if orderbook:
+                book = {
+                    'bids': np.asarray(orderbook['bids'], dtype=np.float64).reshape(-1, 2),
+                    'asks': np.asarray(orderbook['asks'], dtype=np.float64).reshape(-1, 2),
+                    'timestamp': datetime.fromtimestamp(now_ns / 1e9)
+                }
+            
+            self._apply_ticker(index, now_ns, last_price, bid, ask, float(ticker.get('volume', 0.0)), book)
+    
     def _update_market_data(self) -> None:
         """
         Frissíti a piaci adatokat minden szimbólumra és időkeretre.
         """
+        if self._exchange is not None:
+            try:
+                self._update_from_exchange()
+                logger.debug("Market data updated")
+            except Exception as e:
+                logger.error(f"Error updating market data: {str(e)}")
+            return
+        
         try:
             # Valós implementációban itt lekérdeznénk az adatokat az exchange API-ból
             # Most csak példa adatokat generálunk
             
-            current_time = datetime.now()
+            # Időbélyegek epoch nanoszekundumban; a datetime csak a ticker/orderbook kimenethez kell
+            now_ns = time.time_ns()
+            now_minute = now_ns // _NS_PER_MINUTE
+            current_time = datetime.fromtimestamp(now_ns / 1e9)
             
-            for symbol in self.symbols:
-                # Ticker adatok frissítése
-                if symbol == 'BTC/USDT':
-                    last_price = 40000.0 + (current_time.second / 60.0) * 1000.0  # Példa áringadozás
-                elif symbol == 'ETH/USDT':
-                    last_price = 2000.0 + (current_time.second / 60.0) * 50.0
-                else:  # ADA/USDT
-                    last_price = 0.5 + (current_time.second / 60.0) * 0.05
+            shards = self._shards
+            
+            # Árak és orderbook szintek minden szimbólumra egyszerre (példa áringadozás)
+            last_prices = self._base_prices + (current_time.second / 60.0) * self._price_scales
+            
+            # Csak az árak íródnak a soron következő pufferbe, a mennyiségek állandók
+            slot = self._book_slot = 1 - self._book_slot
+            bids, asks = self._book_buffers[slot]
+            np.multiply(last_prices[:, None], _BID_MULTS, out=bids[:, :, 0])
+            np.multiply(last_prices[:, None], _ASK_MULTS, out=asks[:, :, 0])
+            
+            volume = 1000000.0 + (current_time.minute * 10000.0)
+            
+            with self._ticks_lock:
+                self._ticks.publish(now_ns, self._symbol_indices, bids[:, 0, 0], asks[:, 0, 0], last_prices, volume)
+            
+            # Ciklus-invariáns értékek és hivatkozások helyi nevekbe kötve
+            open_volume = 10000.0 + (current_time.second * 100.0)
+            
+            for symbol, last_price, bid, ask, symbol_bids, symbol_asks in zip(
+                    self.symbols, last_prices.tolist(), bids[:, 0, 0].tolist(), asks[:, 0, 0].tolist(),
+                    bids, asks):
+                shard = shards[symbol]
                 
-                self.market_data[symbol]['ticker'] = {
+                # Ticker adatok frissítése
+                ticker = {
                     'last': last_price,
-                    'bid': last_price * 0.999,
-                    'ask': last_price * 1.001,
-                    'volume': 1000000.0 + (current_time.minute * 10000.0),
+                    'bid': bid,
+                    'ask': ask,
+                    'volume': volume,
                     'timestamp': current_time
                 }
                 
-                # OHLCV adatok frissítése (csak az 1m időkeretre, a többit ebből számolnánk)
-                if len(self.market_data[symbol]['ohlcv']['1m']) == 0:
-                    # Inicializálás, ha még nincs adat
-                    for i in range(100):
-                        candle_time = current_time - timedelta(minutes=100-i)
-                        base_price = last_price * (0.9 + 0.2 * (i / 100.0))
-                        
-                        candle = {
-                            'timestamp': candle_time,
-                            'open': base_price * 0.99,
-                            'high': base_price * 1.02,
-                            'low': base_price * 0.98,
-                            'close': base_price,
-                            'volume': 100000.0 + (i * 1000.0)
-                        }
-                        self.market_data[symbol]['ohlcv']['1m'].append(candle)
-                else:
-                    # Új gyertya hozzáadása
-                    last_candle = self.market_data[symbol]['ohlcv']['1m'][-1]
-                    
-                    # Ha új perc kezdődött, új gyertyát adunk hozzá
-                    if current_time.minute != last_candle['timestamp'].minute:
-                        new_candle = {
-                            'timestamp': current_time.replace(second=0, microsecond=0),
-                            'open': last_candle['close'],
-                            'high': max(last_candle['close'], last_price),
-                            'low': min(last_candle['close'], last_price),
-                            'close': last_price,
-                            'volume': 10000.0 + (current_time.second * 100.0)
-                        }
-                        self.market_data[symbol]['ohlcv']['1m'].append(new_candle)
-                        
-                        # Korlátozza a gyertyák számát
-                        if len(self.market_data[symbol]['ohlcv']['1m']) > self.max_candles:
-                            self.market_data[symbol]['ohlcv']['1m'] = self.market_data[symbol]['ohlcv']['1m'][-self.max_candles:]
-                    else:
-                        # Frissíti az aktuális gyertyát
-                        last_candle['high'] = max(last_candle['high'], last_price)
-                        last_candle['low'] = min(last_candle['low'], last_price)
-                        last_candle['close'] = last_price
-                        last_candle['volume'] += 100.0
-                
                 # Orderbook adatok frissítése
-                self.market_data[symbol]['orderbook'] = {
-                    'bids': [
-                        [last_price * 0.999, 2.0],
-                        [last_price * 0.998, 5.0],
-                        [last_price * 0.997, 10.0],
-                        [last_price * 0.996, 15.0],
-                        [last_price * 0.995, 20.0]
-                    ],
-                    'asks': [
-                        [last_price * 1.001, 2.0],
-                        [last_price * 1.002, 5.0],
-                        [last_price * 1.003, 10.0],
-                        [last_price * 1.004, 15.0],
-                        [last_price * 1.005, 20.0]
-                    ],
+                orderbook = {
+                    'bids': symbol_bids,
+                    'asks': symbol_asks,
                     'timestamp': current_time
                 }
+                
+                with shard.lock:
+                    # OHLCV adatok frissítése (csak az 1m időkeretre, a többit ebből számolnánk)
+                    ohlcv_1m = shard.ohlcv['1m']
+                    
+                    if len(ohlcv_1m) == 0:
+                        # Inicializálás, ha még nincs adat
+                        i = np.arange(100)
+                        timestamps = (now_minute - (100 - i)) * _NS_PER_MINUTE  # Percekre igazított gyertyák
+                        base_prices = last_price * (0.9 + 0.2 * (i / 100.0))
+                        
+                        ohlcv_1m.extend(timestamps, np.column_stack((
+                            base_prices * 0.99,
+                            base_prices * 1.02,
+                            base_prices * 0.98,
+                            base_prices,
+                            100000.0 + (i * 1000.0)
+                        )))
+                    else:
+                        # Frissíti az aktuális gyertyát, vagy új perc esetén újat nyit
+                        # (megtelt puffer esetén a legrégebbi gyertya íródik felül)
+                        ohlcv_1m.apply_tick(now_minute, last_price, 100.0, open_volume)
+                    
+                    shard.orderbook = orderbook
+                    shard.ticker = ticker
             
             logger.debug("Market data updated")
         
         except Exception as e:
             logger.error(f"Error updating market data: {str(e)}")
     
-    def get_latest_data(self) -> Dict:
+    def subscribe(self, from_start: bool = False) -> TickReader:
+        """
+        Feliratkozás a tick folyamra.
+        
+        Az olvasó saját pozícióval, zár nélkül követi az újonnan közzétett
+        tickeket; a sorokban a szimbólum index a self.symbols lista pozíciója.
+        
+        Args:
+            from_start: A pufferben még meglévő legrégebbi ticktől olvasson-e
+            
+        Returns:
+            TickReader: A tick olvasó
+        """
+        return self._ticks.reader(from_start)
+    
+    def get_latest_data(self, include_ohlcv: bool = False) -> Dict:
         """
         Visszaadja a legfrissebb piaci adatokat minden szimbólumra.
         
+        A kereskedési ciklus csak a tickereket használja, ezért a gyertyák
+        (minden gyűrűpuffer másolata) csak kérésre kerülnek bele; egy idősor
+        másolás nélkül a get_ohlcv-vel kérhető le.
+        
+        Args:
+            include_ohlcv: Tartalmazza-e a gyertyák másolatát
+            
         Returns:
             Dict: A legfrissebb piaci adatok
         """
-        return self.market_data
+        return {symbol: shard.to_dict(include_ohlcv) for symbol, shard in self._shards.items()}
     
     def get_ticker(self, symbol: str) -> Optional[Dict]:
         """
@@ -260,11 +952,12 @@ class MarketDataManager:
         Returns:
             Optional[Dict]: A ticker adatok, vagy None ha a szimbólum nem található
         """
-        if symbol in self.market_data:
-            return self.market_data[symbol]['ticker']
+        shard = self._shards.get(symbol)
+        if shard is not None:
+            return shard.ticker
         return None
     
-    def get_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[List]:
+    def get_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[np.recarray]:
         """
         Visszaadja egy adott szimbólum OHLCV adatait.
         
@@ -274,24 +967,30 @@ class MarketDataManager:
             limit: A visszaadandó gyertyák maximális száma
             
         Returns:
-            Optional[List]: Az OHLCV adatok, vagy None ha a szimbólum vagy időkeret nem található
+            Optional[np.recarray]: Másolás nélküli OHLCV_DTYPE rekord nézet (oszlopai
+                timestamp [epoch ns] és OHLCV_FIELDS), vagy None ha a szimbólum vagy
+                időkeret nem található
         """
-        if symbol in self.market_data and timeframe in self.market_data[symbol]['ohlcv']:
-            return self.market_data[symbol]['ohlcv'][timeframe][-limit:]
+        shard = self._shards.get(symbol)
+        if shard is not None and timeframe in shard.ohlcv:
+            return shard.ohlcv[timeframe].view(limit)
         return None
     
     def get_orderbook(self, symbol: str) -> Optional[Dict]:
         """
         Visszaadja egy adott szimbólum orderbook adatait.
         
+        A 'bids' és 'asks' (szintek x [ár, mennyiség]) NumPy nézetek; listához .tolist().
+        
         Args:
             symbol: A szimbólum (pl. BTC/USDT)
             
         Returns:
             Optional[Dict]: Az orderbook adatok, vagy None ha a szimbólum nem található
         """
-        if symbol in self.market_data:
-            return self.market_data[symbol]['orderbook']
+        shard = self._shards.get(symbol)
+        if shard is not None:
+            return shard.orderbook
         return None
     
     def get_status(self) -> Dict:
@@ -2,17 +2,79 @@
 Order Manager - Kezeli a kereskedési megbízásokat és azok életciklusát.
 """
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 
 from src.utils.logger import setup_logger
+from src.core.symbols import base_asset
 
 logger = setup_logger('order_manager')
 
+# A jelzések kötelező mezői
+_REQUIRED_SIGNAL_FIELDS = frozenset(('symbol', 'side', 'amount', 'type'))
+
+# Lezárt megbízás állapotok
+_TERMINAL_STATUSES = frozenset(('filled', 'canceled', 'rejected', 'expired'))
+
+def _ns_to_datetime(timestamp_ns: Optional[int]) -> Optional[datetime]:
+    """
+    Epoch nanoszekundumos időbélyeget helyi datetime-má alakít.
+    
+    Args:
+        timestamp_ns: Időbélyeg epoch nanoszekundumban, vagy None
+        
+    Returns:
+        Optional[datetime]: Az időpont, vagy None
+    """
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ns / 1e9)
+
+def _datetime_to_ns(value: Optional[datetime]) -> Optional[int]:
+    """
+    datetime-ot epoch nanoszekundumos időbélyeggé alakít.
+    
+    Args:
+        value: Az időpont, vagy None
+        
+    Returns:
+        Optional[int]: Időbélyeg epoch nanoszekundumban, vagy None
+    """
+    if value is None:
+        return None
+    return int(value.timestamp() * 1e9)
+
+def _index_assets(portfolio: Dict) -> Dict[str, Dict]:
+    """
+    Szimbólum szerinti indexet készít a portfólió eszközeiről.
+    
+    Ha a portfólió már tartalmaz 'assets_by_symbol' indexet, azt használja.
+    Ismétlődő szimbólum esetén az első előfordulás marad meg.
+    
+    Args:
+        portfolio: A portfólió állapota
+        
+    Returns:
+        Dict[str, Dict]: Szimbólum -> eszköz adatok
+    """
+    assets_by_symbol = portfolio.get('assets_by_symbol')
+    if assets_by_symbol is not None:
+        return assets_by_symbol
+    
+    return {asset.get('symbol'): asset for asset in reversed(portfolio.get('assets', []))}
+
 class Order:
     """
     Egy kereskedési megbízást reprezentáló osztály.
     """
+    # Rögzített attribútumok: nincs példányonkénti __dict__, kisebb memória és gyorsabb elérés
+    __slots__ = ('_dict_cache', '_created_at_iso', '_executed_at_iso', 'id', 'symbol', 'order_type', 'side', 'amount', 'price',
+                 'strategy_id', 'status', 'created_at_ns', 'executed_at_ns', 'filled_amount',
+                 'average_price', 'exchange_id')
+    
     def __init__(self, 
                  symbol: str, 
                  order_type: str, 
@@ -31,6 +93,9 @@ class Order:
             price: Az ár (limit megbízásoknál)
             strategy_id: A stratégia azonosítója, amely létrehozta a megbízást
         """
+        self._dict_cache = None  # A to_dict() eredménye, bármely mező módosításakor törlődik
+        self._created_at_iso = None  # Az időbélyegek ISO formátuma, az időbélyeg módosításáig
+        self._executed_at_iso = None
         self.id = None  # Az exchange által adott ID
         self.symbol = symbol
         self.order_type = order_type
@@ -39,20 +104,101 @@ class Order:
         self.price = price
         self.strategy_id = strategy_id
         self.status = "created"
-        self.created_at = datetime.now()
-        self.executed_at = None
+        # Időbélyegek epoch nanoszekundumban; datetime csak kérésre készül
+        self.created_at_ns = time.time_ns()
+        self.executed_at_ns = None
         self.filled_amount = 0.0
         self.average_price = None
         self.exchange_id = None
     
+    def __setattr__(self, name: str, value) -> None:
+        """
+        Attribútum beállítása; a nyilvános mezők módosítása érvényteleníti a to_dict() gyorsítótárat.
+        
+        A megbízásokat az exchange connectorok is közvetlenül módosítják, ezért az
+        érvénytelenítés itt történik, nem az egyes módosító helyeken.
+        """
+        object.__setattr__(self, name, value)
+        if name[0] != '_':
+            object.__setattr__(self, '_dict_cache', None)
+            
+            if name == 'created_at_ns':
+                object.__setattr__(self, '_created_at_iso', None)
+            elif name == 'executed_at_ns':
+                object.__setattr__(self, '_executed_at_iso', None)
+    
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """
+        A létrehozás időpontja.
+        
+        Returns:
+            Optional[datetime]: A létrehozás időpontja
+        """
+        return _ns_to_datetime(self.created_at_ns)
+    
+    @created_at.setter
+    def created_at(self, value: Optional[datetime]) -> None:
+        self.created_at_ns = _datetime_to_ns(value)
+    
+    @property
+    def executed_at(self) -> Optional[datetime]:
+        """
+        A teljesítés időpontja.
+        
+        Returns:
+            Optional[datetime]: A teljesítés időpontja, vagy None
+        """
+        return _ns_to_datetime(self.executed_at_ns)
+    
+    @executed_at.setter
+    def executed_at(self, value: Optional[datetime]) -> None:
+        self.executed_at_ns = _datetime_to_ns(value)
+    
+    @property
+    def created_at_iso(self) -> Optional[str]:
+        """
+        A létrehozás időpontja ISO formátumban (egyszer formázva).
+        
+        Returns:
+            Optional[str]: A létrehozás időpontja, vagy None
+        """
+        iso = self._created_at_iso
+        if iso is None and self.created_at_ns is not None:
+            iso = _ns_to_datetime(self.created_at_ns).isoformat()
+            object.__setattr__(self, '_created_at_iso', iso)
+        return iso
+    
+    @property
+    def executed_at_iso(self) -> Optional[str]:
+        """
+        A teljesítés időpontja ISO formátumban (egyszer formázva).
+        
+        Returns:
+            Optional[str]: A teljesítés időpontja, vagy None
+        """
+        iso = self._executed_at_iso
+        if iso is None and self.executed_at_ns is not None:
+            iso = _ns_to_datetime(self.executed_at_ns).isoformat()
+            object.__setattr__(self, '_executed_at_iso', iso)
+        return iso
+    
     def to_dict(self) -> Dict:
         """
         A megbízás adatait szótár formájában adja vissza.
         
+        Az eredmény a következő módosításig gyorsítótárban marad, így a lezárt
+        megbízások szótára csak egyszer készül el. A visszaadott szótárat nem
+        szabad módosítani.
+        
         Returns:
             Dict: A megbízás adatai
         """
-        return {
+        cached = self._dict_cache
+        if cached is not None:
+            return cached
+        
+        cached = {
             "id": self.id,
             "symbol": self.symbol,
             "order_type": self.order_type,
@@ -61,12 +207,26 @@ class Order:
             "price": self.price,
             "strategy_id": self.strategy_id,
             "status": self.status,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "executed_at": self.executed_at.isoformat() if self.executed_at else None,
+            "created_at": self.created_at_iso,
+            "executed_at": self.executed_at_iso,
             "filled_amount": self.filled_amount,
             "average_price": self.average_price,
             "exchange_id": self.exchange_id
         }
+        object.__setattr__(self, '_dict_cache', cached)
+        return cached
+    
+    def __str__(self) -> str:
+        """
+        A megbízás szöveges alakja (naplózáshoz).
+        
+        A naplózás %s argumentumaként átadva a szótár csak akkor készül el,
+        ha az üzenet ténylegesen kiírásra kerül.
+        
+        Returns:
+            str: A megbízás adatai szótár formátumban
+        """
+        return str(self.to_dict())
 
 class OrderManager:
     """
@@ -82,13 +242,17 @@ class OrderManager:
         """
         self.config = config
         self.is_running = False
-        self.orders = []  # Aktív megbízások
-        self.order_history = []  # Lezárt megbízások
+        self.orders = {}  # Aktív megbízások (rendezett halmazként: megbízás -> None)
+        self._orders_by_id: Dict[str, Order] = {}  # Exchange ID -> aktív megbízás
+        self._unindexed_orders: List[Order] = []  # Még exchange ID nélküli aktív megbízások
         
         # Konfigurációs beállítások
         self.max_active_orders = config.get('max_active_orders', 100)
         self.max_order_history = config.get('max_order_history', 1000)
         
+        # Lezárt megbízások; a megtelt történetből a legrégebbi automatikusan kiesik
+        self.order_history = deque(maxlen=self.max_order_history)
+        
         logger.info("OrderManager initialized")
     
     def start(self) -> bool:
@@ -149,17 +313,20 @@ class OrderManager:
         created_orders = []
         
         try:
+            # Az eszközök indexe egyszer készül el a teljes jelzés kötegre
+            assets_by_symbol = _index_assets(portfolio)
+            
             for signal in signals:
                 # Ellenőrzi, hogy a jelzés érvényes-e
-                if not self._validate_signal(signal, portfolio):
+                if not self._validate_signal(signal, portfolio, assets_by_symbol):
                     continue
                 
                 # Létrehozza a megbízást a jelzés alapján
                 order = self._create_order_from_signal(signal)
                 if order:
-                    self.orders.append(order)
+                    self._add_order(order)
                     created_orders.append(order)
-                    logger.info(f"Created {order.side} order for {order.symbol}: {order.amount} @ {order.price}")
+                    logger.info("Created %s order for %s: %s @ %s", order.side, order.symbol, order.amount, order.price)
             
             return created_orders
         
@@ -167,23 +334,24 @@ class OrderManager:
             logger.error(f"Error processing signals: {str(e)}")
             return []
     
-    def _validate_signal(self, signal: Dict, portfolio: Dict) -> bool:
+    def _validate_signal(self, signal: Dict, portfolio: Dict,
+                         assets_by_symbol: Optional[Dict[str, Dict]] = None) -> bool:
         """
         Ellenőrzi, hogy a jelzés érvényes-e a jelenlegi portfólió állapota alapján.
         
         Args:
             signal: A stratégia által generált jelzés
             portfolio: A jelenlegi portfólió állapota
+            assets_by_symbol: A portfólió eszközei szimbólum szerint (ha nincs megadva, elkészül)
             
         Returns:
             bool: Érvényes jelzés esetén True, egyébként False
         """
         # Ellenőrzi a kötelező mezőket
-        required_fields = ['symbol', 'side', 'amount', 'type']
-        for field in required_fields:
-            if field not in signal:
-                logger.warning(f"Signal missing required field: {field}")
-                return False
+        missing = _REQUIRED_SIGNAL_FIELDS.difference(signal)
+        if missing:
+            logger.warning("Signal missing required fields: %s", ', '.join(sorted(missing)))
+            return False
         
         # Ellenőrzi, hogy a limit megbízásoknak van-e ára
         if signal['type'] == 'limit' and 'price' not in signal:
@@ -200,15 +368,15 @@ class OrderManager:
         # Ellenőrzi, hogy van-e elég eszköz az eladáshoz
         if signal['side'] == 'sell':
             # Itt egyszerűsített ellenőrzés, a valós implementációban figyelembe kell venni a pontos eszköz mennyiséget
-            symbol_base = signal['symbol'].split('/')[0]
-            asset_balance = 0
-            for asset in portfolio.get('assets', []):
-                if asset.get('symbol') == symbol_base:
-                    asset_balance = asset.get('amount', 0)
-                    break
+            if assets_by_symbol is None:
+                assets_by_symbol = _index_assets(portfolio)
+            
+            symbol_base = base_asset(signal['symbol'])
+            asset = assets_by_symbol.get(symbol_base)
+            asset_balance = asset.get('amount', 0) if asset is not None else 0
             
             if asset_balance < signal['amount']:
-                logger.warning(f"Insufficient {symbol_base} balance for sell order")
+                logger.warning("Insufficient %s balance for sell order", symbol_base)
                 return False
         
         return True
@@ -238,6 +406,48 @@ class OrderManager:
             logger.error(f"Error creating order from signal: {str(e)}")
             return None
     
+    def _add_order(self, order: Order) -> None:
+        """
+        Felveszi a megbízást az aktív megbízások közé és az ID indexbe.
+        
+        Args:
+            order: A megbízás
+        """
+        self.orders[order] = None
+        
+        if order.id is not None:
+            self._orders_by_id[order.id] = order
+        else:
+            # Az ID-t az exchange a végrehajtáskor adja, addig függőben marad
+            self._unindexed_orders.append(order)
+    
+    def _find_order(self, order_id: str) -> Optional[Order]:
+        """
+        Megkeresi az aktív megbízást az exchange ID alapján.
+        
+        Az indexben nem található ID esetén a függő megbízások közül a közben
+        ID-t kapottak bekerülnek az indexbe, így a keresés csak ezeken fut végig.
+        
+        Args:
+            order_id: A megbízás azonosítója
+            
+        Returns:
+            Optional[Order]: A megbízás, vagy None ha nem található
+        """
+        order = self._orders_by_id.get(order_id)
+        if order is not None or not self._unindexed_orders:
+            return order
+        
+        pending = []
+        for unindexed in self._unindexed_orders:
+            if unindexed.id is None:
+                pending.append(unindexed)
+            else:
+                self._orders_by_id[unindexed.id] = unindexed
+        self._unindexed_orders = pending
+        
+        return self._orders_by_id.get(order_id)
+    
     def update_order_status(self, order_id: str, status: str, filled_amount: float = None, 
                            average_price: float = None, executed_at: datetime = None) -> bool:
         """
@@ -255,33 +465,30 @@ class OrderManager:
         """
         try:
             # Megkeresi a megbízást az aktív megbízások között
-            for order in self.orders:
-                if order.id == order_id:
-                    order.status = status
-                    
-                    if filled_amount is not None:
-                        order.filled_amount = filled_amount
-                    
-                    if average_price is not None:
-                        order.average_price = average_price
-                    
-                    if executed_at is not None:
-                        order.executed_at = executed_at
-                    
-                    # Ha a megbízás lezárult, áthelyezi a történetbe
-                    if status in ['filled', 'canceled', 'rejected', 'expired']:
-                        self.orders.remove(order)
-                        self.order_history.append(order)
-                        
-                        # Korlátozza a történet méretét
-                        if len(self.order_history) > self.max_order_history:
-                            self.order_history = self.order_history[-self.max_order_history:]
-                    
-                    logger.info(f"Updated order {order_id} status to {status}")
-                    return True
+            order = self._find_order(order_id)
+            if order is None:
+                logger.warning("Order %s not found", order_id)
+                return False
             
-            logger.warning(f"Order {order_id} not found")
-            return False
+            order.status = status
+            
+            if filled_amount is not None:
+                order.filled_amount = filled_amount
+            
+            if average_price is not None:
+                order.average_price = average_price
+            
+            if executed_at is not None:
+                order.executed_at = executed_at
+            
+            # Ha a megbízás lezárult, áthelyezi a történetbe
+            if status in _TERMINAL_STATUSES:
+                del self._orders_by_id[order_id]
+                del self.orders[order]
+                self.order_history.append(order)
+            
+            logger.info("Updated order %s status to %s", order_id, status)
+            return True
         
         except Exception as e:
             logger.error(f"Error updating order status: {str(e)}")
@@ -296,6 +503,15 @@ class OrderManager:
         """
         return [order.to_dict() for order in self.orders]
     
+    def iter_active_orders(self) -> Iterator[Dict]:
+        """
+        Lustán, egyenként adja vissza az aktív megbízásokat, lista felépítése nélkül.
+        
+        Returns:
+            Iterator[Dict]: Az aktív megbízások adatai
+        """
+        return (order.to_dict() for order in tuple(self.orders))
+    
     def get_order_history(self, limit: int = 100) -> List[Dict]:
         """
         Visszaadja a lezárt megbízások történetét.
@@ -306,7 +522,12 @@ class OrderManager:
         Returns:
             List[Dict]: A lezárt megbízások listája
         """
-        return [order.to_dict() for order in self.order_history[-limit:]]
+        if limit <= 0:
+            return [order.to_dict() for order in self.order_history]
+        
+        # A legutóbbi megbízások a végéről olvasva, a teljes történet másolása nélkül
+        recent = list(islice(reversed(self.order_history), limit))
+        return [order.to_dict() for order in reversed(recent)]
     
     def get_status(self) -> Dict:
         """
@@ -2,12 +2,46 @@
 Portfolio Manager - Kezeli a felhasználó portfólióját és annak állapotát.
 """
 import logging
-from typing import Dict, List, Optional
+import math
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from src.utils.logger import setup_logger
+from src.config.json_io import dumps_compact
+from src.core.symbols import base_asset
 
-logger = setup_logger('portfolio_manager')
+logger = logging.getLogger(__name__)
+
+class Asset:
+    """
+    A portfólió egy eszköze (kompakt, __slots__ alapú rekord).
+    """
+    __slots__ = ('symbol', 'amount', 'value_usd')
+    
+    def __init__(self, symbol: str, amount: float, value_usd: float):
+        """
+        Inicializálja az eszközt.
+        
+        Args:
+            symbol: Az eszköz szimbóluma (pl. BTC)
+            amount: Az eszköz mennyisége
+            value_usd: Az eszköz értéke USD-ben
+        """
+        self.symbol = symbol
+        self.amount = amount
+        self.value_usd = value_usd
+    
+    def to_dict(self) -> Dict:
+        """
+        Az eszköz adatait szótár formájában adja vissza.
+        
+        Returns:
+            Dict: Az eszköz adatai
+        """
+        return {
+            "symbol": self.symbol,
+            "amount": self.amount,
+            "value_usd": self.value_usd
+        }
 
 class PortfolioManager:
     """
@@ -35,6 +69,12 @@ class PortfolioManager:
             },
             "last_updated": None
         }
+        self._assets: List[Asset] = []  # Az eszközök (a portfolio["assets"] ezekből készül)
+        self._assets_by_symbol: Dict[str, Asset] = {}  # Szimbólum -> eszköz
+        self._last_updated_iso: Optional[str] = None  # A last_updated ISO formátumban (a frissítéskor képezve)
+        self._total_value_usd = 0.0  # Az eszközök összértéke (a teljesítésekkel növekményesen frissítve)
+        self._version = 0  # Frissítés számláló (minden _touch() növeli)
+        self._portfolio_json_cache: Optional[Tuple[int, bytes]] = None  # (verzió, a portfólió JSON formában)
         
         # Konfigurációs beállítások
         self.update_interval = config.get('update_interval', 60)  # másodperc
@@ -101,18 +141,20 @@ class PortfolioManager:
             
             # Példa adatok (valós implementációban ez az exchange API-ból jönne)
             assets = [
-                {"symbol": "BTC", "amount": 0.5, "value_usd": 20000.0},
-                {"symbol": "ETH", "amount": 5.0, "value_usd": 10000.0},
-                {"symbol": "ADA", "amount": 1000.0, "value_usd": 500.0}
+                Asset("BTC", 0.5, 20000.0),
+                Asset("ETH", 5.0, 10000.0),
+                Asset("ADA", 1000.0, 500.0)
             ]
             
             # Kiszámítja a teljes értéket
-            total_value = sum(asset["value_usd"] for asset in assets)
+            total_value = math.fsum(asset.value_usd for asset in assets)
+            self._total_value_usd = total_value
             
             # Frissíti a portfóliót
-            self.portfolio["assets"] = assets
+            self._assets = assets
+            self._assets_by_symbol = {asset.symbol: asset for asset in assets}
+            self._publish_assets()
             self.portfolio["total_value_usd"] = total_value
-            self.portfolio["last_updated"] = datetime.now()
             
             # Példa teljesítmény adatok (valós implementációban ez historikus adatokból számolódna)
             self.portfolio["performance"] = {
@@ -122,7 +164,10 @@ class PortfolioManager:
                 "all_time": 15.3
             }
             
-            logger.info(f"Portfolio updated, total value: ${total_value:.2f}")
+            # Minden mező megírása után, így a JSON gyorsítótár nem rögzíthet félkész állapotot
+            self._touch()
+            
+            logger.info("Portfolio updated, total value: $%.2f", total_value)
             return self.portfolio
         
         except Exception as e:
@@ -147,55 +192,96 @@ class PortfolioManager:
             # Valós implementációban itt frissítenénk a portfóliót a végrehajtott megbízások alapján
             # Most csak egy példa implementációt adunk
             
+            # A teljesítések mennyiség és érték változásai szimbólumonként összevonva,
+            # így minden érintett eszköz csak egyszer frissül
+            deltas: Dict[str, Tuple[float, float]] = {}
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
             for result in execution_results:
-                logger.info(f"Processing execution result: {result}")
+                if debug:
+                    logger.debug("Processing execution result: %s", result)
                 
-                # Példa logika a portfólió frissítésére
-                symbol = result.get("symbol", "").split("/")[0]  # Pl. BTC/USDT -> BTC
                 side = result.get("side", "")
+                if side == "buy":
+                    sign = 1.0
+                elif side == "sell":
+                    sign = -1.0
+                else:
+                    continue
+                
+                symbol = base_asset(result.get("symbol") or "")  # Pl. BTC/USDT -> BTC
                 amount = result.get("filled_amount", 0.0)
                 price = result.get("average_price", 0.0)
                 
-                if side == "buy":
-                    # Hozzáadja az eszközt a portfólióhoz vagy növeli a meglévő mennyiséget
-                    asset_found = False
-                    for asset in self.portfolio["assets"]:
-                        if asset["symbol"] == symbol:
-                            asset["amount"] += amount
-                            asset["value_usd"] += amount * price
-                            asset_found = True
-                            break
+                delta_amount, delta_value = deltas.get(symbol, (0.0, 0.0))
+                deltas[symbol] = (delta_amount + sign * amount, delta_value + sign * amount * price)
+            
+            emptied = False
+            total_value = self._total_value_usd
+            
+            for symbol, (delta_amount, delta_value) in deltas.items():
+                asset = self._assets_by_symbol.get(symbol)
+                
+                if asset is not None:
+                    previous_value = asset.value_usd
+                    asset.amount += delta_amount
+                    asset.value_usd += delta_value
+                    
+                    # Ha a mennyiség 0 vagy kevesebb, kiürítettnek jelöli az eszközt
+                    # (az eltávolítás a köteg végén, egyetlen lépésben történik)
+                    if asset.amount <= 0:
+                        asset.amount = 0.0
+                        asset.value_usd = 0.0
+                        emptied = True
                     
-                    if not asset_found:
-                        self.portfolio["assets"].append({
-                            "symbol": symbol,
-                            "amount": amount,
-                            "value_usd": amount * price
-                        })
+                    total_value += asset.value_usd - previous_value
                 
-                elif side == "sell":
-                    # Csökkenti az eszköz mennyiségét a portfólióban
-                    for asset in self.portfolio["assets"]:
-                        if asset["symbol"] == symbol:
-                            asset["amount"] -= amount
-                            asset["value_usd"] -= amount * price
-                            
-                            # Ha a mennyiség 0 vagy kevesebb, eltávolítja az eszközt
-                            if asset["amount"] <= 0:
-                                self.portfolio["assets"].remove(asset)
-                            break
-            
-            # Újraszámítja a teljes értéket
-            self.portfolio["total_value_usd"] = sum(asset["value_usd"] for asset in self.portfolio["assets"])
-            self.portfolio["last_updated"] = datetime.now()
-            
-            logger.info(f"Portfolio updated after execution, total value: ${self.portfolio['total_value_usd']:.2f}")
+                elif delta_amount > 0:
+                    # Új eszköz felvétele a portfólióba
+                    asset = Asset(symbol, delta_amount, delta_value)
+                    self._assets.append(asset)
+                    self._assets_by_symbol[symbol] = asset
+                    total_value += delta_value
+            
+            # A kiürült eszközök eltávolítása egyetlen szűréssel, az index újraépítésével együtt
+            if emptied:
+                assets = [asset for asset in self._assets if asset.amount > 0]
+                self._assets = assets
+                self._assets_by_symbol = {asset.symbol: asset for asset in assets}
+            
+            if deltas:
+                self._publish_assets()
+            
+            # A teljes érték a változásokkal frissül, az eszközök újraösszegzése nélkül
+            self._total_value_usd = total_value
+            self.portfolio["total_value_usd"] = total_value
+            self._touch()
+            
+            logger.info("Portfolio updated after execution, total value: $%.2f", self.portfolio["total_value_usd"])
             return self.portfolio
         
         except Exception as e:
             logger.error(f"Error updating portfolio after execution: {str(e)}")
             return self.portfolio
     
+    def _publish_assets(self) -> None:
+        """
+        Elkészíti a portfolio["assets"] szótár listáját a külső hívók számára.
+        """
+        self.portfolio["assets"] = [asset.to_dict() for asset in self._assets]
+    
+    def _touch(self) -> None:
+        """
+        Beállítja a frissítés idejét és annak ISO formátumát; a frissítés
+        végén, minden mező megírása után hívandó.
+        """
+        last_updated = datetime.now()
+        self.portfolio["last_updated"] = last_updated
+        self._last_updated_iso = last_updated.isoformat()
+        
+        # Minden frissítés érvényteleníti a szerializált portfóliót
+        self._version += 1
+    
     def get_asset_balance(self, symbol: str) -> float:
         """
         Visszaadja egy adott eszköz egyenlegét.
@@ -206,10 +292,8 @@ class PortfolioManager:
         Returns:
             float: Az eszköz egyenlege
         """
-        for asset in self.portfolio["assets"]:
-            if asset["symbol"] == symbol:
-                return asset["amount"]
-        return 0.0
+        asset = self._assets_by_symbol.get(symbol)
+        return asset.amount if asset is not None else 0.0
     
     def get_asset_value(self, symbol: str) -> float:
         """
@@ -221,10 +305,8 @@ class PortfolioManager:
         Returns:
             float: Az eszköz értéke USD-ben
         """
-        for asset in self.portfolio["assets"]:
-            if asset["symbol"] == symbol:
-                return asset["value_usd"]
-        return 0.0
+        asset = self._assets_by_symbol.get(symbol)
+        return asset.value_usd if asset is not None else 0.0
     
     def get_portfolio(self) -> Dict:
         """
@@ -235,6 +317,27 @@ class PortfolioManager:
         """
         return self.portfolio
     
+    def get_portfolio_json(self) -> bytes:
+        """
+        Visszaadja a teljes portfólió állapotát JSON formában.
+        
+        A szerializálás frissítésenként legfeljebb egyszer történik meg, a
+        frissítések közötti lekérdezések a gyorsítótárazott adatot kapják. A
+        gyorsítótár a szerializálás előtti verzióval kerül tárolásra, így egy
+        közben befejeződő frissítés után a következő lekérdezés újraszerializál.
+        
+        Returns:
+            bytes: A portfólió állapota JSON formában
+        """
+        version = self._version
+        cached = self._portfolio_json_cache
+        if cached is None or cached[0] != version:
+            payload = dict(self.portfolio)
+            payload["last_updated"] = self._last_updated_iso
+            cached = (version, dumps_compact(payload))
+            self._portfolio_json_cache = cached
+        return cached[1]
+    
     def get_status(self) -> Dict:
         """
         Visszaadja a PortfolioManager állapotát.
@@ -245,6 +348,6 @@ class PortfolioManager:
         return {
             "is_running": self.is_running,
             "total_value_usd": self.portfolio["total_value_usd"],
-            "assets_count": len(self.portfolio["assets"]),
-            "last_updated": self.portfolio["last_updated"].isoformat() if self.portfolio["last_updated"] else None
+            "assets_count": len(self._assets),
+            "last_updated": self._last_updated_iso
         }
@@ -2,12 +2,36 @@
 Strategy Manager - Kezeli a kereskedési stratégiákat és azok végrehajtását.
 """
 import logging
-from typing import Dict, List, Optional
+import math
+import random
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from src.utils.logger import setup_logger
+import numpy as np
 
-logger = setup_logger('strategy_manager')
+logger = logging.getLogger(__name__)
+
+class GridParams:
+    """
+    Egy grid stratégia konfigurációjából előre kiszámított, tickenként változatlan paraméterek.
+    """
+    __slots__ = ('symbol', 'lower', 'upper', 'levels', 'price_step')
+    
+    def __init__(self, symbol: str, lower: float, upper: float, levels: int):
+        """
+        Inicializálja a grid paramétereket.
+        
+        Args:
+            symbol: A kereskedési pár
+            lower: Az alsó ár
+            upper: A felső ár
+            levels: A grid szintek száma
+        """
+        self.symbol = symbol
+        self.lower = lower
+        self.upper = upper
+        self.levels = levels
+        self.price_step = (upper - lower) / levels
 
 class StrategyManager:
     """
@@ -25,10 +49,30 @@ class StrategyManager:
         self.config = config
         self.is_running = False
         self.strategies = []
+        self._active_strategies = []  # Az aktív stratégiák (a strategies sorrendjében)
+        self._strategies_by_id = {}  # Stratégia azonosító -> stratégia
+        self._strategy_index = {}  # Stratégia azonosító -> pozíció a strategies listában
+        self._grid_params = {}  # Stratégia azonosító -> előre kiszámított grid paraméterek
+        self._grid_batch = None  # Az aktív grid stratégiák oszlopos paraméterei (None: újraépítendő)
         
         # Konfigurációs beállítások
         self.max_active_strategies = config.get('max_active_strategies', 10)
         
+        # Saját véletlenszám-generátor (megadott seed esetén reprodukálható futás)
+        self._rng = random.Random(config.get('random_seed'))
+        
+        # Stratégia típus -> végrehajtó metódus
+        self._dispatch = {
+            "grid_trading": self._execute_grid_strategy,
+            "dca_strategy": self._execute_dca_strategy,
+            "momentum_strategy": self._execute_momentum_strategy,
+            "mean_reversion": self._execute_mean_reversion_strategy,
+            "arbitrage_strategy": self._execute_arbitrage_strategy,
+            "ml_strategy": self._execute_ml_strategy,
+            "scalping_strategy": self._execute_scalping_strategy,
+            "portfolio_rebalance": self._execute_portfolio_rebalance_strategy
+        }
+        
         logger.info("StrategyManager initialized")
     
     def start(self) -> bool:
@@ -111,12 +155,140 @@ class StrategyManager:
                 }
             }
             
-            self.strategies = [grid_strategy, dca_strategy]
+            # Az érvénytelen stratégiák már betöltéskor kimaradnak, így a végrehajtásnak nem kell ellenőriznie őket
+            self._grid_params = {}
+            self.strategies = [strategy for strategy in (grid_strategy, dca_strategy) if self._compile_strategy(strategy)]
+            self._rebuild_strategy_index()
+            self._rebuild_active_strategies()
             logger.info(f"Loaded {len(self.strategies)} strategies")
         
         except Exception as e:
             logger.error(f"Error loading strategies: {str(e)}")
             self.strategies = []
+            self._strategies_by_id = {}
+            self._strategy_index = {}
+            self._grid_params = {}
+            self._active_strategies = []
+    
+    def _rebuild_strategy_index(self, start: int = 0) -> None:
+        """
+        Újraépíti az azonosító szerinti indexeket a stratégiák listájából.
+        
+        Args:
+            start: Az első újraindexelendő pozíció (az előtte lévők nem változtak)
+        """
+        if start == 0:
+            self._strategies_by_id = {}
+            self._strategy_index = {}
+        
+        for i in range(start, len(self.strategies)):
+            strategy = self.strategies[i]
+            self._strategies_by_id[strategy.get("id")] = strategy
+            self._strategy_index[strategy.get("id")] = i
+    
+    def _rebuild_active_strategies(self) -> None:
+        """
+        Újraépíti az aktív stratégiák listáját a stratégiák alapján.
+        """
+        self._active_strategies = [strategy for strategy in self.strategies if strategy.get("is_active", False)]
+        self._grid_batch = None
+    
+    def _build_grid_batch(self) -> Tuple:
+        """
+        Összegyűjti az aktív grid stratégiák paramétereit oszlopos NumPy tömbökbe.
+        
+        Returns:
+            Tuple: (stratégiák, egyedi szimbólumok, szimbólum indexek, alsó árak, szintközök, szintek száma)
+        """
+        strategies = []
+        symbols = {}  # Szimbólum -> index (az azonos szimbólumú stratégiák egy árat használnak)
+        symbol_idx = []
+        lowers = []
+        steps = []
+        levels = []
+        
+        for strategy in self._active_strategies:
+            if strategy["type"] != "grid_trading":
+                continue
+            
+            params = self._grid_params[strategy["id"]]
+            strategies.append(strategy)
+            symbol_idx.append(symbols.setdefault(params.symbol, len(symbols)))
+            lowers.append(params.lower)
+            steps.append(params.price_step)
+            levels.append(params.levels)
+        
+        return (
+            strategies,
+            list(symbols),
+            np.array(symbol_idx, dtype=np.intp),
+            np.array(lowers, dtype=np.float64),
+            np.array(steps, dtype=np.float64),
+            np.array(levels, dtype=np.int64)
+        )
+    
+    def _evaluate_grid_batch(self, market_data: Dict) -> Dict[int, List[Dict]]:
+        """
+        Az összes aktív grid stratégia kiértékelése egyetlen vektorizált lépésben.
+        
+        Args:
+            market_data: Az aktuális piaci adatok
+            
+        Returns:
+            Dict[int, List[Dict]]: A stratégia objektum id()-je -> a generált jelzések
+            (csak a kötegben kiértékelt stratégiákra)
+        """
+        if self._grid_batch is None:
+            self._grid_batch = self._build_grid_batch()
+        
+        strategies, symbols, symbol_idx, lowers, steps, levels = self._grid_batch
+        if not strategies:
+            return {}
+        
+        results = {id(strategy): [] for strategy in strategies}
+        
+        try:
+            # Szimbólumonként egyetlen piaci adat lekérés, majd szétosztás a stratégiákra
+            symbol_prices = np.empty(len(symbols), dtype=np.float64)
+            for i, symbol in enumerate(symbols):
+                symbol_data = market_data.get(symbol)
+                if symbol_data is None:
+                    logger.warning(f"Symbol {symbol} not found in market data")
+                    symbol_prices[i] = np.nan  # A NaN összehasonlítások hamisak, így nem keletkezik jelzés
+                else:
+                    symbol_prices[i] = symbol_data["ticker"]["last"]
+            
+            prices = symbol_prices[symbol_idx]
+            
+            # Legközelebbi grid szint (egyenlő távolságnál az alsó), a tartományra szorítva
+            closest_level = np.clip(np.ceil((prices - lowers) / steps - 0.5), 0, levels)
+            grid_prices = lowers + closest_level * steps
+            
+            buy_mask = prices < grid_prices * 0.99
+            sell_mask = prices > grid_prices * 1.01
+            
+            for i in np.flatnonzero(buy_mask | sell_mask):
+                current_price = float(prices[i])
+                
+                if buy_mask[i]:
+                    side, price = "buy", current_price * 1.001
+                else:
+                    side, price = "sell", current_price * 0.999
+                
+                results[id(strategies[i])].append({
+                    "symbol": symbols[symbol_idx[i]],
+                    "type": "limit",
+                    "side": side,
+                    "amount": 0.01,  # Példa mennyiség
+                    "price": price
+                })
+            
+            return results
+        
+        except Exception as e:
+            # Hiba esetén a stratégiák egyenként kerülnek végrehajtásra
+            logger.error(f"Error evaluating grid strategies: {str(e)}")
+            return {}
     
     def execute_strategies(self, market_data: Dict, portfolio: Dict) -> List[Dict]:
         """
@@ -136,42 +308,28 @@ class StrategyManager:
         signals = []
         
         try:
-            for strategy in self.strategies:
-                if not strategy.get("is_active", False):
-                    continue
-                
-                logger.debug(f"Executing strategy: {strategy['name']}")
+            # A grid stratégiák előre, egyetlen vektorizált lépésben értékelődnek ki
+            grid_signals = self._evaluate_grid_batch(market_data)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
+            for strategy in self._active_strategies:
+                if debug:
+                    logger.debug("Executing strategy: %s", strategy['name'])
                 
                 # A stratégia típusa alapján végrehajtja a megfelelő stratégiát
-                strategy_type = strategy.get("type", "")
-                
-                if strategy_type == "grid_trading":
-                    strategy_signals = self._execute_grid_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "dca_strategy":
-                    strategy_signals = self._execute_dca_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "momentum_strategy":
-                    strategy_signals = self._execute_momentum_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "mean_reversion":
-                    strategy_signals = self._execute_mean_reversion_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "arbitrage_strategy":
-                    strategy_signals = self._execute_arbitrage_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "ml_strategy":
-                    strategy_signals = self._execute_ml_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "scalping_strategy":
-                    strategy_signals = self._execute_scalping_strategy(strategy, market_data, portfolio)
-                elif strategy_type == "portfolio_rebalance":
-                    strategy_signals = self._execute_portfolio_rebalance_strategy(strategy, market_data, portfolio)
-                else:
-                    logger.warning(f"Unknown strategy type: {strategy_type}")
-                    strategy_signals = []
+                # (a típus a betöltéskor/hozzáadáskor ellenőrzött)
+                strategy_signals = grid_signals.get(id(strategy))
+                if strategy_signals is None:
+                    strategy_signals = self._dispatch[strategy["type"]](strategy, market_data, portfolio)
                 
                 # Hozzáadja a stratégia azonosítóját a jelzésekhez
+                strategy_id = strategy["id"]
                 for signal in strategy_signals:
-                    signal["strategy_id"] = strategy["id"]
+                    signal["strategy_id"] = strategy_id
                 
                 signals.extend(strategy_signals)
             
-            logger.info(f"Generated {len(signals)} trading signals")
+            logger.info("Generated %d trading signals", len(signals))
             return signals
         
         except Exception as e:
@@ -193,34 +351,28 @@ class StrategyManager:
         signals = []
         
         try:
-            symbol = strategy.get("symbol", "")
-            config = strategy.get("config", {})
+            # Az előre kiszámított, betöltéskor ellenőrzött grid paraméterek
+            params = self._grid_params[strategy["id"]]
+            symbol = params.symbol
             
-            if symbol not in market_data:
+            symbol_data = market_data.get(symbol)
+            if symbol_data is None:
                 logger.warning(f"Symbol {symbol} not found in market data")
                 return []
             
-            # Kinyeri a szükséges konfigurációs paramétereket
-            upper_price = config.get("upper_price", 0.0)
-            lower_price = config.get("lower_price", 0.0)
-            grid_levels = config.get("grid_levels", 0)
-            
-            if grid_levels <= 0 or upper_price <= lower_price:
-                logger.warning(f"Invalid grid configuration for {symbol}")
-                return []
-            
-            # Kiszámítja a grid szinteket
-            price_step = (upper_price - lower_price) / grid_levels
-            grid_prices = [lower_price + i * price_step for i in range(grid_levels + 1)]
+            lower_price = params.lower
+            price_step = params.price_step
             
             # Lekéri az aktuális árat
-            current_price = market_data[symbol]["ticker"]["last"]
+            current_price = symbol_data["ticker"]["last"]
             
-            # Meghatározza a legközelebbi grid szintet
-            closest_level = min(range(len(grid_prices)), key=lambda i: abs(grid_prices[i] - current_price))
+            # Meghatározza a legközelebbi grid szintet (egyenlő távolságnál az alsót)
+            closest_level = math.ceil((current_price - lower_price) / price_step - 0.5)
+            closest_level = max(0, min(params.levels, closest_level))
+            grid_price = lower_price + closest_level * price_step
             
             # Ha az ár a grid szint alatt van, vásárlási jelzést generál
-            if current_price < grid_prices[closest_level] * 0.99:
+            if current_price < grid_price * 0.99:
                 signals.append({
                     "symbol": symbol,
                     "type": "limit",
@@ -230,7 +382,7 @@ class StrategyManager:
                 })
             
             # Ha az ár a grid szint felett van, eladási jelzést generál
-            elif current_price > grid_prices[closest_level] * 1.01:
+            elif current_price > grid_price * 1.01:
                 signals.append({
                     "symbol": symbol,
                     "type": "limit",
@@ -245,6 +397,40 @@ class StrategyManager:
             logger.error(f"Error executing grid strategy: {str(e)}")
             return []
     
+    def _compile_strategy(self, strategy: Dict) -> bool:
+        """
+        Ellenőrzi a stratégiát, és az azonosítója alatt eltárolja a konfigurációból
+        származtatott, tickenként változatlan paramétereket (a stratégia dict nem változik).
+        Érvénytelen stratégia esetén a korábban eltárolt paraméterek megmaradnak.
+        
+        Args:
+            strategy: A stratégia
+            
+        Returns:
+            bool: Érvényes stratégia esetén True, egyébként False
+        """
+        strategy_type = strategy.get("type", "")
+        if strategy_type not in self._dispatch:
+            logger.warning(f"Unknown strategy type: {strategy_type}")
+            return False
+        
+        if strategy_type != "grid_trading":
+            self._grid_params.pop(strategy.get("id"), None)
+            return True
+        
+        symbol = strategy.get("symbol", "")
+        config = strategy.get("config", {})
+        upper_price = config.get("upper_price", 0.0)
+        lower_price = config.get("lower_price", 0.0)
+        grid_levels = config.get("grid_levels", 0)
+        
+        if grid_levels <= 0 or upper_price <= lower_price:
+            logger.warning(f"Invalid grid configuration for {symbol}")
+            return False
+        
+        self._grid_params[strategy.get("id")] = GridParams(symbol, lower_price, upper_price, grid_levels)
+        return True
+    
     def _execute_dca_strategy(self, strategy: Dict, market_data: Dict, portfolio: Dict) -> List[Dict]:
         """
         Végrehajtja a Dollar Cost Averaging stratégiát.
@@ -272,8 +458,7 @@ class StrategyManager:
             
             # Példa: minden futtatáskor 5% eséllyel generál vásárlási jelzést
             # Valós implementációban ez időzítés alapján történne
-            import random
-            if random.random() < 0.05:
+            if self._rng.random() < 0.05:
                 signals.append({
                     "symbol": symbol,
                     "type": "market",
@@ -393,12 +578,21 @@ class StrategyManager:
                 return False
             
             # Ellenőrzi, hogy a stratégia azonosítója egyedi-e
-            for existing_strategy in self.strategies:
-                if existing_strategy.get("id") == strategy.get("id"):
-                    logger.warning(f"Strategy with ID {strategy.get('id')} already exists")
-                    return False
+            strategy_id = strategy.get("id")
+            if strategy_id in self._strategies_by_id:
+                logger.warning(f"Strategy with ID {strategy_id} already exists")
+                return False
+            
+            if not self._compile_strategy(strategy):
+                logger.warning(f"Rejected invalid strategy: {strategy.get('name')}")
+                return False
             
+            self._strategy_index[strategy_id] = len(self.strategies)
             self.strategies.append(strategy)
+            self._strategies_by_id[strategy_id] = strategy
+            if strategy.get("is_active", False):
+                self._active_strategies.append(strategy)
+                self._grid_batch = None
             logger.info(f"Added new strategy: {strategy.get('name')}")
             return True
         
@@ -418,18 +612,42 @@ class StrategyManager:
             bool: Sikeres frissítés esetén True, egyébként False
         """
         try:
-            for i, strategy in enumerate(self.strategies):
-                if strategy.get("id") == strategy_id:
-                    # Frissíti a stratégiát
-                    for key, value in updates.items():
-                        strategy[key] = value
-                    
-                    self.strategies[i] = strategy
-                    logger.info(f"Updated strategy: {strategy.get('name')}")
-                    return True
-            
-            logger.warning(f"Strategy with ID {strategy_id} not found")
-            return False
+            strategy = self._strategies_by_id.get(strategy_id)
+            if strategy is None:
+                logger.warning(f"Strategy with ID {strategy_id} not found")
+                return False
+            
+            # Frissíti a stratégiát (helyben, így a lista és az indexek ugyanarra az objektumra mutatnak)
+            recompiled = "config" in updates or "symbol" in updates or "type" in updates
+            if recompiled:
+                # A frissített stratégiát előbb ellenőrzi, érvénytelen frissítés nem kerül alkalmazásra
+                candidate = dict(strategy)
+                candidate.update(updates)
+                if not self._compile_strategy(candidate):
+                    logger.warning(f"Rejected invalid update for strategy: {strategy.get('name')}")
+                    return False
+                
+                strategy.clear()
+                strategy.update(candidate)
+            else:
+                for key, value in updates.items():
+                    strategy[key] = value
+            self._grid_batch = None
+            
+            # Az azonosító változása esetén átírja az indexeket; a grid paraméterek az új
+            # azonosító alá kerülnek (újrafordításkor már ott vannak)
+            if "id" in updates and strategy.get("id") != strategy_id:
+                params = self._grid_params.pop(strategy_id, None)
+                if params is not None and not recompiled:
+                    self._grid_params[strategy.get("id")] = params
+                self._rebuild_strategy_index()
+            
+            # Az aktiválás változása esetén újraszámolja az aktív listát
+            if "is_active" in updates:
+                self._rebuild_active_strategies()
+            
+            logger.info(f"Updated strategy: {strategy.get('name')}")
+            return True
         
         except Exception as e:
             logger.error(f"Error updating strategy: {str(e)}")
@@ -446,14 +664,22 @@ class StrategyManager:
             bool: Sikeres eltávolítás esetén True, egyébként False
         """
         try:
-            for i, strategy in enumerate(self.strategies):
-                if strategy.get("id") == strategy_id:
-                    removed_strategy = self.strategies.pop(i)
-                    logger.info(f"Removed strategy: {removed_strategy.get('name')}")
-                    return True
+            index = self._strategy_index.pop(strategy_id, None)
+            if index is None:
+                logger.warning(f"Strategy with ID {strategy_id} not found")
+                return False
             
-            logger.warning(f"Strategy with ID {strategy_id} not found")
-            return False
+            removed_strategy = self.strategies.pop(index)
+            del self._strategies_by_id[strategy_id]
+            self._grid_params.pop(strategy_id, None)
+            
+            # Csak az eltávolított utáni pozíciók tolódtak el
+            self._rebuild_strategy_index(index)
+            
+            if removed_strategy.get("is_active", False):
+                self._rebuild_active_strategies()
+            logger.info(f"Removed strategy: {removed_strategy.get('name')}")
+            return True
         
         except Exception as e:
             logger.error(f"Error removing strategy: {str(e)}")
@@ -475,7 +701,7 @@ class StrategyManager:
         Returns:
             List[Dict]: Az aktív stratégiák listája
         """
-        return [strategy for strategy in self.strategies if strategy.get("is_active", False)]
+        return list(self._active_strategies)
     
     def get_strategy(self, strategy_id: int) -> Optional[Dict]:
         """
@@ -487,10 +713,7 @@ class StrategyManager:
         Returns:
             Optional[Dict]: A stratégia, vagy None ha nem található
         """
-        for strategy in self.strategies:
-            if strategy.get("id") == strategy_id:
-                return strategy
-        return None
+        return self._strategies_by_id.get(strategy_id)
     
     def get_status(self) -> Dict:
         """
@@ -502,5 +725,5 @@ class StrategyManager:
         return {
             "is_running": self.is_running,
             "total_strategies": len(self.strategies),
-            "active_strategies": len(self.get_active_strategies())
+            "active_strategies": len(self._active_strategies)
         }
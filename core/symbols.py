@@ -0,0 +1,19 @@
+"""
+Symbols - Kereskedési pár szimbólumok kezelése.
+"""
+import functools
+
+@functools.lru_cache(maxsize=256)
+def base_asset(pair: str) -> str:
+    """
+    Visszaadja a kereskedési pár alap eszközét (pl. BTC/USDT -> BTC).
+    
+    A párok száma kicsi és ismétlődő, ezért az eredmény gyorsítótárazott.
+    
+    Args:
+        pair: A kereskedési pár
+        
+    Returns:
+        str: Az alap eszköz szimbóluma
+    """
+    return pair.partition('/')[0]
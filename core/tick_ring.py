@@ -0,0 +1,136 @@
+"""
+Tick Ring - Egy termelős, zárolásmentes tick gyűrűpuffer a piaci adatok továbbításához.
+"""
+from typing import Optional
+
+import numpy as np
+
+# A tick sorok oszlopai
+TICK_FIELDS = ('symbol_idx', 'bid', 'ask', 'last', 'volume')
+
+class TickRing:
+    """
+    Fix méretű tick gyűrűpuffer előre lefoglalt NumPy tömbökkel.
+    
+    Egyetlen író (a piaci adat frissítő szál) teszi közzé a tickeket, az
+    olvasók saját pozícióval, zár nélkül követik. A sorok először a pufferbe
+    íródnak, a head számláló csak ezután nő (a GIL alatt egyetlen attribútum
+    értékadás), így az olvasók soha nem látnak félig kiírt tickeket.
+    
+    Minden sor kétszer kerül tárolásra (i és i + capacity pozíción), így az
+    utolsó legfeljebb capacity tick mindig egyetlen összefüggő, másolás
+    nélküli szeletként olvasható.
+    """
+    __slots__ = ('capacity', 'head', 'timestamps', 'values')
+    
+    def __init__(self, capacity: int):
+        """
+        Inicializálja a gyűrűpuffert.
+        
+        Args:
+            capacity: A tárolható tickek maximális száma
+        """
+        self.capacity = capacity
+        self.head = 0  # Az eddig közzétett tickek száma (csak nő)
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.values = np.zeros((2 * capacity, len(TICK_FIELDS)), dtype=np.float64)
+    
+    def publish(self, timestamp: int, symbol_idx: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+                last: np.ndarray, volume) -> None:
+        """
+        Egy frissítés tickjeinek közzététele (szimbólumonként egy sor) egyetlen vektorizált írással.
+        
+        Args:
+            timestamp: Időbélyeg (epoch ns)
+            symbol_idx: A szimbólumok indexei
+            bid, ask, last: Árak szimbólumonként
+            volume: Forgalom (szimbólumonként vagy közös érték)
+        """
+        n = len(symbol_idx)
+        if n > self.capacity:
+            raise ValueError(f"Tick batch of {n} exceeds ring capacity {self.capacity}")
+        
+        head = self.head
+        index = (head + np.arange(n)) % self.capacity
+        shadow = index + self.capacity
+        
+        self.timestamps[index] = timestamp
+        self.timestamps[shadow] = timestamp
+        
+        for column, data in enumerate((symbol_idx, bid, ask, last, volume)):
+            self.values[index, column] = data
+            self.values[shadow, column] = data
+        
+        # Közzététel: az olvasók csak a head növelése után látják az új sorokat
+        self.head = head + n
+    
+    def reader(self, from_start: bool = False) -> 'TickReader':
+        """
+        Új olvasó létrehozása saját pozícióval.
+        
+        Args:
+            from_start: A pufferben még meglévő legrégebbi ticktől olvasson-e
+            (alapértelmezés szerint csak az ezután közzétett tickeket kapja)
+        
+        Returns:
+            TickReader: Az olvasó
+        """
+        tail = max(self.head - self.capacity, 0) if from_start else self.head
+        return TickReader(self, tail)
+
+class TickReader:
+    """
+    Egy TickRing olvasója saját pozícióval.
+    
+    Az olvasók nem fékezik az írót: ha egy olvasó egy teljes körnél többet
+    lemarad, a felülírt tickek kimaradnak, számuk a dropped attribútumban gyűlik.
+    """
+    __slots__ = ('ring', 'tail', 'dropped')
+    
+    def __init__(self, ring: TickRing, tail: int):
+        """
+        Inicializálja az olvasót.
+        
+        Args:
+            ring: Az olvasott gyűrűpuffer
+            tail: A következő olvasandó tick sorszáma
+        """
+        self.ring = ring
+        self.tail = tail
+        self.dropped = 0
+    
+    def pending(self) -> int:
+        """
+        Returns:
+            int: A még nem olvasott tickek száma (legfeljebb a kapacitás)
+        """
+        return min(self.ring.head - self.tail, self.ring.capacity)
+    
+    def poll(self, max_ticks: Optional[int] = None):
+        """
+        Az új tickek kiolvasása másolás nélküli nézetként.
+        
+        A nézetek a puffer részei: a következő teljes írói kör felülírja őket,
+        ezért a feldolgozásnak addig meg kell történnie (vagy másolatot kell készíteni).
+        
+        Args:
+            max_ticks: A kiolvasandó tickek maximális száma (None esetén az összes)
+        
+        Returns:
+            tuple: (időbélyegek [n], tick értékek [n x 5, TICK_FIELDS sorrendben]) nézetek
+        """
+        ring = self.ring
+        head = ring.head
+        capacity = ring.capacity
+        
+        if head - self.tail > capacity:
+            self.dropped += head - capacity - self.tail
+            self.tail = head - capacity
+        
+        n = head - self.tail
+        if max_ticks is not None and n > max_ticks:
+            n = max_ticks
+        
+        start = self.tail % capacity
+        self.tail += n
+        return ring.timestamps[start:start + n], ring.values[start:start + n]
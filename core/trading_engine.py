@@ -1,6 +1,7 @@
 """
 Trading Engine - A fő kereskedési motor, amely koordinálja a kereskedési folyamatokat.
 """
+import asyncio
 import time
 import logging
 import threading
@@ -43,6 +44,8 @@ class TradingEngine:
         # Trading loop beállítások
         self.trading_interval = config.get('trading_interval', 5)  # másodperc
         self.trading_thread = None
+        self._loop = None  # A kereskedési szál asyncio event loop-ja
+        self._wakeup = None  # A ciklusok közötti várakozást megszakító esemény
         
         logger.info("Trading Engine initialized")
     
@@ -67,7 +70,7 @@ class TradingEngine:
             
             # Elindítja a fő kereskedési ciklust
             self.is_running = True
-            self.trading_thread = threading.Thread(target=self._trading_loop)
+            self.trading_thread = threading.Thread(target=self._run_trading_loop)
             self.trading_thread.daemon = True
             self.trading_thread.start()
             
@@ -94,6 +97,14 @@ class TradingEngine:
             # Leállítja a komponenseket
             self.is_running = False
             
+            # Felébreszti a ciklusok között várakozó kereskedési ciklust (a futó ciklus még befejeződik)
+            loop = self._loop
+            if loop is not None:
+                try:
+                    loop.call_soon_threadsafe(self._wakeup.set)
+                except RuntimeError:
+                    pass  # A loop közben már leállt
+            
             if self.trading_thread and self.trading_thread.is_alive():
                 self.trading_thread.join(timeout=10)
             
@@ -110,47 +121,75 @@ class TradingEngine:
             logger.error(f"Error stopping Trading Engine: {str(e)}")
             return False
     
-    def _trading_loop(self) -> None:
+    def _run_trading_loop(self) -> None:
+        """
+        A kereskedési ciklust futtatja a kereskedési szál saját asyncio event loop-jában.
+        """
+        asyncio.run(self._trading_loop())
+    
+    async def _wait_next_cycle(self, delay: float) -> None:
+        """
+        Vár a következő ciklusig, vagy amíg a motor le nem áll.
+        
+        Args:
+            delay: A várakozás ideje másodpercben
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _trading_loop(self) -> None:
         """
         A fő kereskedési ciklus, amely periodikusan végrehajtja a kereskedési logikát.
+        
+        A piaci adatok és a portfólió frissítése párhuzamosan, munkaszálakon fut,
+        a megbízások végrehajtása aszinkron, így a hálózati várakozások átfedik egymást.
         """
         logger.info("Trading loop started")
         
-        while self.is_running:
-            try:
-                cycle_start_time = time.time()
-                self.last_run_time = datetime.now()
-                
-                # 1. Frissíti a piaci adatokat
-                market_data = self.market_data_manager.get_latest_data()
-                
-                # 2. Frissíti a portfólió állapotát
-                portfolio = self.portfolio_manager.update_portfolio()
-                
-                # 3. Futtatja a stratégiákat az aktuális piaci adatokon
-                signals = self.strategy_manager.execute_strategies(market_data, portfolio)
-                
-                # 4. Létrehozza és kezeli a megbízásokat a jelzések alapján
-                orders = self.order_manager.process_signals(signals, portfolio)
-                
-                # 5. Végrehajtja a megbízásokat
-                execution_results = self.execution_engine.execute_orders(orders)
-                
-                # 6. Frissíti a portfóliót a végrehajtott megbízások alapján
-                self.portfolio_manager.update_after_execution(execution_results)
-                
-                # Naplózza a ciklus teljesítményét
-                cycle_duration = time.time() - cycle_start_time
-                logger.debug(f"Trading cycle completed in {cycle_duration:.4f} seconds")
-                
-                # Vár a következő ciklusig, figyelembe véve a feldolgozási időt
-                sleep_time = max(0, self.trading_interval - cycle_duration)
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                
-            except Exception as e:
-                logger.error(f"Error in trading loop: {str(e)}")
-                time.sleep(self.trading_interval)  # Hiba esetén is vár a következő ciklusig
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        
+        try:
+            while self.is_running:
+                try:
+                    cycle_start_time = time.monotonic()
+                    self.last_run_time = datetime.now()
+                    
+                    # 1-2. Frissíti a piaci adatokat és a portfólió állapotát (párhuzamosan)
+                    market_data, portfolio = await asyncio.gather(
+                        asyncio.to_thread(self.market_data_manager.get_latest_data),
+                        asyncio.to_thread(self.portfolio_manager.update_portfolio)
+                    )
+                    
+                    # 3. Futtatja a stratégiákat az aktuális piaci adatokon
+                    signals = self.strategy_manager.execute_strategies(market_data, portfolio)
+                    
+                    # 4. Létrehozza és kezeli a megbízásokat a jelzések alapján
+                    orders = self.order_manager.process_signals(signals, portfolio)
+                    
+                    # 5. Végrehajtja a megbízásokat
+                    execution_results = await self.execution_engine.execute_orders_async(orders)
+                    
+                    # 6. Frissíti a portfóliót a végrehajtott megbízások alapján
+                    self.portfolio_manager.update_after_execution(execution_results)
+                    
+                    # Naplózza a ciklus teljesítményét
+                    cycle_duration = time.monotonic() - cycle_start_time
+                    logger.debug(f"Trading cycle completed in {cycle_duration:.4f} seconds")
+                    
+                    # Vár a következő ciklusig, figyelembe véve a feldolgozási időt
+                    sleep_time = max(0, self.trading_interval - cycle_duration)
+                    if sleep_time > 0:
+                        await self._wait_next_cycle(sleep_time)
+                    
+                except Exception as e:
+                    logger.error(f"Error in trading loop: {str(e)}")
+                    await self._wait_next_cycle(self.trading_interval)  # Hiba esetén is vár a következő ciklusig
+        
+        finally:
+            self._loop = None
         
         logger.info("Trading loop stopped")
     
@@ -91,6 +91,8 @@ class Trade(db.Model):
     def __repr__(self):
         return f'<Trade {self.symbol} {self.side}>'
 
+# Tömeges / historikus gyertya adatokhoz a database.ohlcv_store oszlopos tárolója használandó;
+# ez a tábla csak a kompatibilitás miatt marad meg
 class MarketData(db.Model):
     __tablename__ = 'market_data'
     id = Column(Integer, primary_key=True)
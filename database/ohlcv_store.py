@@ -0,0 +1,169 @@
+"""
+OHLCV Store - Oszlopos (Parquet) tároló a historikus gyertya adatokhoz
+"""
+import logging
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A tárolt oszlopok (időbélyeg epoch ns int64, értékek float32)
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+VALUE_COLUMNS = OHLCV_COLUMNS[1:]
+
+_NS_PER_DAY = 86_400 * 10**9
+
+class OHLCVStore:
+    """
+    Oszlopos OHLCV tároló szimbólum / időkeret / nap szerint particionált Parquet fájlokban
+    
+    A market_data tábla soronként egy ORM objektumot hoz létre; itt a gyertyák
+    oszloponként, tömörítve tárolódnak, és egy időszak lekérdezése csak az
+    érintett napok fájljait olvassa be.
+    """
+    
+    def __init__(self, root=os.path.join('data', 'ohlcv_store')):
+        """
+        Inicializálás
+        
+        Args:
+            root (str): A tároló gyökérkönyvtára
+        """
+        self.root = root
+    
+    def _partition_dir(self, symbol, timeframe):
+        """
+        Egy szimbólum és időkeret partícióinak könyvtára
+        
+        Args:
+            symbol (str): Szimbólum (pl. BTC/USDT)
+            timeframe (str): Időkeret (pl. 1h)
+        
+        Returns:
+            str: A könyvtár elérési útja
+        """
+        return os.path.join(self.root, f"symbol={symbol.replace('/', '_')}", f"timeframe={timeframe}")
+    
+    def write(self, symbol, timeframe, data):
+        """
+        Gyertyák írása napi partíciókba
+        
+        A már meglévő napi fájlokkal összefésül (azonos időbélyeg esetén az új
+        sor marad meg), a fájlok cseréje atomikus.
+        
+        Args:
+            symbol (str): Szimbólum
+            timeframe (str): Időkeret
+            data (pd.DataFrame): Gyertyák OHLCV_COLUMNS oszlopokkal (datetime jellegű timestamp)
+        
+        Returns:
+            int: Az írt napi partíciók száma
+        """
+        frame = _to_columnar(data)
+        if len(frame) == 0:
+            return 0
+        
+        directory = self._partition_dir(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        
+        written = 0
+        for day, part in frame.groupby(frame['timestamp'].to_numpy() // _NS_PER_DAY, sort=False):
+            path = os.path.join(directory, f"date={np.datetime64(int(day), 'D')}.parquet")
+            
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            
+            part = part.drop_duplicates('timestamp', keep='last').sort_values('timestamp', ignore_index=True)
+            _atomic_to_parquet(part, path)
+            written += 1
+        
+        logger.debug("OHLCV írva: %s %s, %d nap", symbol, timeframe, written)
+        return written
+    
+    def read(self, symbol, timeframe, start, end):
+        """
+        Gyertyák olvasása egy időszakra
+        
+        Args:
+            symbol (str): Szimbólum
+            timeframe (str): Időkeret
+            start (datetime): Kezdő időpont (zárt)
+            end (datetime): Végső időpont (zárt)
+        
+        Returns:
+            pd.DataFrame: Időbélyeg szerint rendezett gyertyák (datetime timestamp,
+                float64 értékek), vagy None, ha az időszakra nincs tárolt adat
+        """
+        directory = self._partition_dir(symbol, timeframe)
+        
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return None
+        
+        # A fájlnevek ISO dátumok, így a napok szűrése szöveges összehasonlítás
+        first = f"date={pd.Timestamp(start).date()}.parquet"
+        last = f"date={pd.Timestamp(end).date()}.parquet"
+        paths = [os.path.join(directory, name) for name in sorted(names)
+                 if name.startswith('date=') and first <= name <= last]
+        
+        if not paths:
+            return None
+        
+        frame = pd.concat([pd.read_parquet(path, columns=OHLCV_COLUMNS) for path in paths], ignore_index=True)
+        
+        timestamps = frame['timestamp'].to_numpy()
+        mask = (timestamps >= pd.Timestamp(start).value) & (timestamps <= pd.Timestamp(end).value)
+        frame = frame.loc[mask].reset_index(drop=True)
+        
+        if len(frame) == 0:
+            return None
+        
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], unit='ns')
+        frame[VALUE_COLUMNS] = frame[VALUE_COLUMNS].astype(np.float64)
+        return frame
+
+def _to_columnar(data):
+    """
+    Gyertyák tárolási formára alakítása (epoch ns int64 időbélyeg, float32 értékek)
+    
+    Args:
+        data (pd.DataFrame): Gyertyák OHLCV_COLUMNS oszlopokkal
+    
+    Returns:
+        pd.DataFrame: A tárolandó oszlopok
+    """
+    timestamps = pd.to_datetime(data['timestamp'])
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+    
+    frame = pd.DataFrame({'timestamp': timestamps.astype('datetime64[ns]').astype(np.int64)})
+    for column in VALUE_COLUMNS:
+        frame[column] = data[column].to_numpy(dtype=np.float32)
+    
+    return frame
+
+def _atomic_to_parquet(frame, path):
+    """
+    DataFrame atomikus Parquet fájlba írása (ideiglenes fájl, majd os.replace)
+    
+    Args:
+        frame (pd.DataFrame): Kiírandó adatok
+        path (str): Cél fájl elérési útja
+    """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    os.close(fd)
+    
+    try:
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
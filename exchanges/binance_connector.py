@@ -2,14 +2,59 @@
 Binance Connector - Kezeli a Binance tőzsdével való kommunikációt.
 """
 import logging
+import threading
 import time
+import uuid
 from typing import Dict, List, Optional
 from datetime import datetime
 
+import numpy as np
+
+from src.exchanges.rate_limiter import TokenBucket
 from src.utils.logger import setup_logger
 
 logger = setup_logger('binance_connector')
 
+# Az egyes végpontok kérés súlya a Binance percenkénti súly limitjében
+REQUEST_WEIGHTS = {
+    'ticker': 2,  # GET /api/v3/ticker/price (egy szimbólum)
+    'tickers': 4,  # GET /api/v3/ticker/price (összes szimbólum)
+    'depth': 5,  # GET /api/v3/depth (limit <= 100)
+    'klines': 2,  # GET /api/v3/klines
+    'account': 20,  # GET /api/v3/account
+    'order': 1,  # POST /api/v3/order
+    'batch_orders': 5,  # POST /fapi/v1/batchOrders
+    'cancel_order': 1,  # DELETE /api/v3/order
+    'order_status': 4  # GET /api/v3/order
+}
+
+# A legnagyobb kérés súly (a súly vödör kapacitásának alsó korlátja)
+_MAX_REQUEST_WEIGHT = max(REQUEST_WEIGHTS.values())
+
+# Folyamaton belül megosztott rate limit vödrök: a Binance limitjei IP / fiók
+# szintűek, ezért az azonos limitekkel létrehozott kapcsolatok közösen fogyasztják őket
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+def _shared_bucket(kind: str, rate: float, capacity: float) -> TokenBucket:
+    """
+    Visszaadja a megadott limithez tartozó megosztott vödröt (első híváskor létrehozza).
+    
+    Args:
+        kind: A limit fajtája (pl. requests, weight)
+        rate: Visszatöltési ráta (token / másodperc)
+        capacity: A vödör kapacitása
+    
+    Returns:
+        TokenBucket: A megosztott vödör
+    """
+    key = (kind, rate, capacity)
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(key)
+        if bucket is None:
+            bucket = _BUCKETS[key] = TokenBucket(rate, capacity)
+        return bucket
+
 class BinanceConnector:
     """
     Kezeli a Binance tőzsdével való kommunikációt.
@@ -27,26 +72,39 @@ class BinanceConnector:
         self.api_secret = config.get('api_secret', '')
         self.is_testnet = config.get('testnet', False)
         self.rate_limit_per_second = config.get('rate_limit_per_second', 10)
-        self.last_request_time = 0
+        self.rate_limit_burst = config.get('rate_limit_burst')  # Legnagyobb kéréslöket (alapértelmezés: egy másodpercnyi)
+        self.weight_limit_per_minute = config.get('weight_limit_per_minute', 1200)
+        
+        # Megosztott, kapcsolat-újrahasznosító HTTP session (az ExchangeFactory állítja be)
+        self.session = None
+        
+        # Egy kötegelt kérésben beküldhető megbízások száma (POST /fapi/v1/batchOrders)
+        self.max_batch_size = config.get('max_batch_size', 5)
         
         # Raspberry Pi optimalizáció: csökkentett rate limit
         if config.get('rpi_optimization', True):
             self.rate_limit_per_second = min(self.rate_limit_per_second, 5)
         
+        # Kérésszám és kérés súly limit; csak kiürült vödör esetén kell várni. A vödrök
+        # megosztottak, így több kapcsolat (pl. piaci adat és végrehajtás) együtt tartja be a limitet.
+        # A kapacitás legalább egy kérés, illetve a legnagyobb kérés súly, különben
+        # az ilyen kérés soha nem férne bele a vödörbe
+        self._request_bucket = _shared_bucket('requests', self.rate_limit_per_second,
+                                              max(1, self.rate_limit_burst or self.rate_limit_per_second))
+        self._weight_bucket = _shared_bucket('weight', self.weight_limit_per_minute / 60.0,
+                                             max(_MAX_REQUEST_WEIGHT, self.weight_limit_per_minute))
+        
         logger.info("BinanceConnector initialized")
     
-    def _respect_rate_limit(self) -> None:
+    def _respect_rate_limit(self, weight: int = 1) -> None:
         """
-        Betartja a rate limitet a kérések között.
-        """
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        min_interval = 1.0 / self.rate_limit_per_second
-        
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
+        Betartja a rate limitet: a limiten belüli kérések várakozás nélkül indulnak.
         
-        self.last_request_time = time.time()
+        Args:
+            weight: A kérés súlya (REQUEST_WEIGHTS)
+        """
+        self._request_bucket.acquire()
+        self._weight_bucket.acquire(weight)
     
     def get_ticker(self, symbol: str) -> Optional[Dict]:
         """
@@ -59,7 +117,7 @@ class BinanceConnector:
             Optional[Dict]: A ticker adatok, vagy None hiba esetén
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['ticker'])
             
             # Valós implementációban itt lenne a Binance API hívás
             # Most csak példa adatokat adunk vissza
@@ -82,6 +140,41 @@ class BinanceConnector:
             logger.error(f"Error getting ticker for {symbol}: {str(e)}")
             return None
     
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Lekérdezi több szimbólum ticker adatait egyetlen kéréssel (GET /api/v3/ticker/price).
+        
+        Args:
+            symbols: A szimbólumok (pl. BTC/USDT)
+            
+        Returns:
+            Dict[str, Dict]: Szimbólum -> ticker adatok (hiba esetén üres)
+        """
+        try:
+            self._respect_rate_limit(REQUEST_WEIGHTS['tickers'])
+            
+            # Valós implementációban itt lenne egyetlen Binance API hívás,
+            # amely az összes szimbólum árát visszaadja
+            # Most csak példa adatokat adunk vissza
+            
+            timestamp = datetime.now().timestamp() * 1000
+            tickers = {}
+            
+            for symbol in symbols:
+                tickers[symbol] = {
+                    'symbol': symbol.replace('/', ''),
+                    'price': 40000.0 if 'BTC' in symbol else (2000.0 if 'ETH' in symbol else 0.5),
+                    'volume': 1000000.0,
+                    'timestamp': timestamp
+                }
+            
+            logger.debug("Got tickers for %d symbols", len(tickers))
+            return tickers
+        
+        except Exception as e:
+            logger.error(f"Error getting tickers: {str(e)}")
+            return {}
+    
     def get_orderbook(self, symbol: str, limit: int = 20) -> Optional[Dict]:
         """
         Lekérdezi egy adott szimbólum orderbook adatait.
@@ -94,7 +187,7 @@ class BinanceConnector:
             Optional[Dict]: Az orderbook adatok, vagy None hiba esetén
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['depth'])
             
             # Valós implementációban itt lenne a Binance API hívás
             # Most csak példa adatokat adunk vissza
@@ -120,7 +213,7 @@ class BinanceConnector:
             logger.error(f"Error getting orderbook for {symbol}: {str(e)}")
             return None
     
-    def get_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[List]:
+    def get_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[np.ndarray]:
         """
         Lekérdezi egy adott szimbólum OHLCV adatait.
         
@@ -130,10 +223,11 @@ class BinanceConnector:
             limit: A visszaadandó gyertyák maximális száma
             
         Returns:
-            Optional[List]: Az OHLCV adatok, vagy None hiba esetén
+            Optional[np.ndarray]: Az OHLCV adatok [limit x 6] tömbként (timestamp, open, high,
+            low, close, volume oszlopok), vagy None hiba esetén
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['klines'])
             
             # Valós implementációban itt lenne a Binance API hívás
             # Most csak példa adatokat adunk vissza
@@ -156,21 +250,18 @@ class BinanceConnector:
             
             # Példa OHLCV adatok
             current_time = int(datetime.now().timestamp() * 1000)
-            ohlcv = []
-            
-            for i in range(limit):
-                timestamp = current_time - (limit - i) * timeframe_ms
-                price_factor = 1 + 0.1 * (i / limit) * (1 if i % 2 == 0 else -1)
-                
-                candle = [
-                    timestamp,  # timestamp
-                    base_price * price_factor * 0.99,  # open
-                    base_price * price_factor * 1.02,  # high
-                    base_price * price_factor * 0.98,  # low
-                    base_price * price_factor,  # close
-                    1000.0 + i * 10  # volume
-                ]
-                ohlcv.append(candle)
+            i = np.arange(limit)
+            close = base_price * (1 + 0.1 * (i / limit) * np.where(i % 2 == 0, 1.0, -1.0))
+            
+            # Oszloponként, egyetlen vektorizált lépésben
+            ohlcv = np.column_stack((
+                current_time - (limit - i) * timeframe_ms,  # timestamp
+                close * 0.99,  # open
+                close * 1.02,  # high
+                close * 0.98,  # low
+                close,  # close
+                1000.0 + i * 10  # volume
+            ))
             
             logger.debug(f"Got OHLCV for {symbol}, timeframe {timeframe}")
             return ohlcv
@@ -187,7 +278,7 @@ class BinanceConnector:
             Optional[Dict]: Az egyenleg adatok, vagy None hiba esetén
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['account'])
             
             # Valós implementációban itt lenne a Binance API hívás
             # Most csak példa adatokat adunk vissza
@@ -218,44 +309,99 @@ class BinanceConnector:
             Optional[Dict]: A végrehajtási eredmény, vagy None hiba esetén
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['order'])
             
-            # Valós implementációban itt lenne a Binance API hívás
-            # Most csak példa adatokat adunk vissza
-            
-            # Szimbólum formátum konvertálása Binance formátumra
-            binance_symbol = order.symbol.replace('/', '')
-            
-            # Példa végrehajtási eredmény
-            execution_result = {
-                'symbol': order.symbol,
-                'order_id': f"binance_{int(time.time() * 1000)}",
-                'client_order_id': f"client_{int(time.time() * 1000)}",
-                'side': order.side,
-                'type': order.order_type,
-                'price': order.price if order.price else (40000.0 if 'BTC' in order.symbol else (2000.0 if 'ETH' in order.symbol else 0.5)),
-                'amount': order.amount,
-                'filled_amount': order.amount,
-                'average_price': order.price if order.price else (40000.0 if 'BTC' in order.symbol else (2000.0 if 'ETH' in order.symbol else 0.5)),
-                'status': 'filled',
-                'timestamp': datetime.now().timestamp() * 1000
-            }
-            
-            # Beállítja az exchange ID-t az order objektumban
-            order.id = execution_result['order_id']
-            order.exchange_id = 'binance'
-            order.status = 'filled'
-            order.executed_at = datetime.now()
-            order.filled_amount = order.amount
-            order.average_price = execution_result['average_price']
+            execution_result = self._submit_order(order)
             
-            logger.info(f"Executed order: {order.to_dict()}")
+            logger.info("Executed order: %s", order)
             return execution_result
         
         except Exception as e:
             logger.error(f"Error executing order: {str(e)}")
             return None
     
+    def execute_orders_batch(self, orders: List) -> List[Optional[Dict]]:
+        """
+        Végrehajtja a megbízásokat kötegelve, legfeljebb max_batch_size megbízást
+        küldve egy kérésben.
+        
+        Az eredmények bejegyzésenként érkeznek, így egy köteg részben is
+        sikertelen lehet: a sikertelen (be nem küldött) bejegyzések helyén None
+        áll. A metódus nem dob kivételt, az eredménylista mindig a megbízások
+        számával egyező hosszú.
+        
+        Args:
+            orders: A megbízások listája
+        
+        Returns:
+            List[Optional[Dict]]: A végrehajtási eredmények a megbízások sorrendjében
+        """
+        execution_results = []
+        
+        for start in range(0, len(orders), self.max_batch_size):
+            batch = orders[start:start + self.max_batch_size]
+            
+            # Kötegenként egyetlen kérés (és rate limit várakozás)
+            try:
+                self._respect_rate_limit(REQUEST_WEIGHTS['batch_orders'])
+            except Exception as e:
+                logger.error(f"Error submitting order batch: {str(e)}")
+                execution_results.extend([None] * len(batch))
+                continue
+            
+            # Valós implementációban itt lenne a Binance batchOrders API hívás,
+            # a válasz bejegyzésenkénti eredménykódokkal
+            for order in batch:
+                try:
+                    execution_results.append(self._submit_order(order))
+                except Exception as e:
+                    logger.error(f"Error executing order in batch: {str(e)}")
+                    execution_results.append(None)
+        
+        logger.info(f"Executed batch of {len(orders)} orders")
+        return execution_results
+    
+    def _submit_order(self, order) -> Dict:
+        """
+        Beküld egy megbízást és frissíti az order objektumot az eredménnyel.
+        
+        Args:
+            order: A megbízás
+            
+        Returns:
+            Dict: A végrehajtási eredmény
+        """
+        # Valós implementációban itt lenne a Binance API hívás
+        # Most csak példa adatokat adunk vissza
+        
+        # Szimbólum formátum konvertálása Binance formátumra
+        binance_symbol = order.symbol.replace('/', '')
+        
+        # Példa végrehajtási eredmény
+        execution_result = {
+            'symbol': order.symbol,
+            'order_id': f"binance_{uuid.uuid4().hex}",
+            'client_order_id': f"client_{uuid.uuid4().hex}",
+            'side': order.side,
+            'type': order.order_type,
+            'price': order.price if order.price else (40000.0 if 'BTC' in order.symbol else (2000.0 if 'ETH' in order.symbol else 0.5)),
+            'amount': order.amount,
+            'filled_amount': order.amount,
+            'average_price': order.price if order.price else (40000.0 if 'BTC' in order.symbol else (2000.0 if 'ETH' in order.symbol else 0.5)),
+            'status': 'filled',
+            'timestamp': datetime.now().timestamp() * 1000
+        }
+        
+        # Beállítja az exchange ID-t az order objektumban
+        order.id = execution_result['order_id']
+        order.exchange_id = 'binance'
+        order.status = 'filled'
+        order.executed_at_ns = time.time_ns()
+        order.filled_amount = order.amount
+        order.average_price = execution_result['average_price']
+        
+        return execution_result
+    
     def cancel_order(self, order_id: str) -> bool:
         """
         Visszavon egy megbízást.
@@ -267,7 +413,7 @@ class BinanceConnector:
             bool: Sikeres visszavonás esetén True, egyébként False
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['cancel_order'])
             
             # Valós implementációban itt lenne a Binance API hívás
             # Most csak példa adatokat adunk vissza
@@ -290,7 +436,7 @@ class BinanceConnector:
             Optional[Dict]: A megbízás állapota, vagy None hiba esetén
         """
         try:
-            self._respect_rate_limit()
+            self._respect_rate_limit(REQUEST_WEIGHTS['order_status'])
             
             # Valós implementációban itt lenne a Binance API hívás
             # Most csak példa adatokat adunk vissza
@@ -2,26 +2,84 @@
 Exchange Factory - Létrehoz és kezel különböző tőzsde kapcsolatokat.
 """
 import logging
-from typing import Dict, Optional
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
 
 from src.exchanges.binance_connector import BinanceConnector
 from src.exchanges.kraken_connector import KrakenConnector
 from src.exchanges.coinbase_connector import CoinbaseConnector
 from src.utils.logger import setup_logger
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
 logger = setup_logger('exchange_factory')
 
+# HTTP kapcsolat pool méretek (host-onkénti pool-ok száma, pool-onkénti kapcsolatok)
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 64
+
 class ExchangeFactory:
     """
     Factory osztály a különböző tőzsde kapcsolatok létrehozásához.
+    
+    A HTTP session és a létrehozott kapcsolatok osztály szinten tárolódnak, így
+    a folyamat összes ExchangeFactory példánya (pl. az ExecutionEngine és a
+    MarketDataManager sajátja) ugyanazokat a kapcsolatokat kapja.
     """
     
+    _session = None
+    
+    # Létrehozott tőzsde kapcsolatok (tőzsde típus, konfiguráció) szerint; gyenge
+    # referenciák, így az ExecutionEngine által eldobott kapcsolatok felszabadulnak
+    _cache = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+    
     def __init__(self):
         """
         Inicializálja az ExchangeFactory-t.
         """
         logger.info("ExchangeFactory initialized")
     
+    @staticmethod
+    def _cache_key(exchange_type: str, config: Dict) -> Tuple:
+        """
+        Gyorsítótár kulcs a tőzsde típusából és a konfigurációból.
+        
+        Args:
+            exchange_type: A tőzsde típusa
+            config: A tőzsde konfigurációja
+            
+        Returns:
+            Tuple: Hashelhető kulcs (a nem hashelhető értékek repr alakban)
+        """
+        return (exchange_type, tuple(sorted((key, repr(value)) for key, value in config.items())))
+    
+    @classmethod
+    def _get_session(cls):
+        """
+        Visszaadja a tőzsdék által megosztott HTTP session-t (első híváskor létrehozza).
+        
+        A session kapcsolat pool-ja a TCP és TLS kézfogást a kérések között
+        újrahasznosítja. Az újrapróbálkozást az ExecutionEngine végzi, ezért
+        az adapter szintjén nincs újrapróbálkozás.
+        
+        Returns:
+            Optional: A requests.Session, vagy None ha a requests nem elérhető
+        """
+        if cls._session is None and requests is not None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            cls._session = session
+        
+        return cls._session
+    
     def create_exchange(self, exchange_type: str, config: Dict) -> Optional:
         """
         Létrehoz egy tőzsde kapcsolatot a megadott típus és konfiguráció alapján.
@@ -36,15 +94,27 @@ class ExchangeFactory:
         try:
             exchange_type = exchange_type.lower()
             
-            if exchange_type == 'binance':
-                return BinanceConnector(config)
-            elif exchange_type == 'kraken':
-                return KrakenConnector(config)
-            elif exchange_type == 'coinbase':
-                return CoinbaseConnector(config)
-            else:
-                logger.warning(f"Unsupported exchange type: {exchange_type}")
-                return None
+            key = self._cache_key(exchange_type, config)
+            
+            with self._lock:
+                # Azonos konfigurációval már létrehozott (és még használt) kapcsolat újrahasznosítása
+                exchange = self._cache.get(key)
+                if exchange is not None:
+                    return exchange
+                
+                if exchange_type == 'binance':
+                    exchange = BinanceConnector(config)
+                elif exchange_type == 'kraken':
+                    exchange = KrakenConnector(config)
+                elif exchange_type == 'coinbase':
+                    exchange = CoinbaseConnector(config)
+                else:
+                    logger.warning(f"Unsupported exchange type: {exchange_type}")
+                    return None
+                
+                exchange.session = self._get_session()
+                self._cache[key] = exchange
+                return exchange
         
         except Exception as e:
             logger.error(f"Error creating exchange {exchange_type}: {str(e)}")
@@ -3,9 +3,12 @@ Kraken Connector - Kezeli a Kraken tőzsdével való kommunikációt.
 """
 import logging
 import time
+import uuid
 from typing import Dict, List, Optional
 from datetime import datetime
 
+import numpy as np
+
 from src.utils.logger import setup_logger
 
 logger = setup_logger('kraken_connector')
@@ -28,6 +31,9 @@ class KrakenConnector:
         self.rate_limit_per_second = config.get('rate_limit_per_second', 5)
         self.last_request_time = 0
         
+        # Megosztott, kapcsolat-újrahasznosító HTTP session (az ExchangeFactory állítja be)
+        self.session = None
+        
         # Raspberry Pi optimalizáció: csökkentett rate limit
         if config.get('rpi_optimization', True):
             self.rate_limit_per_second = min(self.rate_limit_per_second, 3)
@@ -137,7 +143,7 @@ class KrakenConnector:
             logger.error(f"Error getting orderbook for {symbol}: {str(e)}")
             return None
     
-    def get_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[List]:
+    def get_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> Optional[np.ndarray]:
         """
         Lekérdezi egy adott szimbólum OHLCV adatait.
         
@@ -147,7 +153,8 @@ class KrakenConnector:
             limit: A visszaadandó gyertyák maximális száma
             
         Returns:
-            Optional[List]: Az OHLCV adatok, vagy None hiba esetén
+            Optional[np.ndarray]: Az OHLCV adatok [limit x 6] tömbként (timestamp, open, high,
+            low, close, volume oszlopok), vagy None hiba esetén
         """
         try:
             self._respect_rate_limit()
@@ -173,21 +180,18 @@ class KrakenConnector:
             
             # Példa OHLCV adatok
             current_time = int(datetime.now().timestamp())
-            ohlcv = []
-            
-            for i in range(limit):
-                timestamp = current_time - (limit - i) * timeframe_sec
-                price_factor = 1 + 0.08 * (i / limit) * (1 if i % 2 == 0 else -1)
-                
-                candle = [
-                    timestamp,  # timestamp
-                    base_price * price_factor * 0.99,  # open
-                    base_price * price_factor * 1.01,  # high
-                    base_price * price_factor * 0.98,  # low
-                    base_price * price_factor,  # close
-                    900.0 + i * 8  # volume
-                ]
-                ohlcv.append(candle)
+            i = np.arange(limit)
+            close = base_price * (1 + 0.08 * (i / limit) * np.where(i % 2 == 0, 1.0, -1.0))
+            
+            # Oszloponként, egyetlen vektorizált lépésben
+            ohlcv = np.column_stack((
+                current_time - (limit - i) * timeframe_sec,  # timestamp
+                close * 0.99,  # open
+                close * 1.01,  # high
+                close * 0.98,  # low
+                close,  # close
+                900.0 + i * 8  # volume
+            ))
             
             logger.debug(f"Got OHLCV for {symbol}, timeframe {timeframe}")
             return ohlcv
@@ -246,8 +250,8 @@ class KrakenConnector:
             # Példa végrehajtási eredmény
             execution_result = {
                 'symbol': order.symbol,
-                'order_id': f"kraken_{int(time.time() * 1000)}",
-                'client_order_id': f"client_{int(time.time() * 1000)}",
+                'order_id': f"kraken_{uuid.uuid4().hex}",
+                'client_order_id': f"client_{uuid.uuid4().hex}",
                 'side': order.side,
                 'type': order.order_type,
                 'price': order.price if order.price else (39800.0 if 'BTC' in order.symbol else (1980.0 if 'ETH' in order.symbol else 0.48)),
@@ -262,11 +266,11 @@ class KrakenConnector:
             order.id = execution_result['order_id']
             order.exchange_id = 'kraken'
             order.status = 'filled'
-            order.executed_at = datetime.now()
+            order.executed_at_ns = time.time_ns()
             order.filled_amount = order.amount
             order.average_price = execution_result['average_price']
             
-            logger.info(f"Executed order: {order.to_dict()}")
+            logger.info("Executed order: %s", order)
             return execution_result
         
         except Exception as e:
@@ -0,0 +1,64 @@
+"""
+Rate Limiter - Szálbiztos token bucket a tőzsdei kérések ütemezéséhez.
+"""
+import threading
+import time
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+    
+    A tokenek folyamatosan, rate/másodperc ütemben töltődnek vissza legfeljebb
+    capacity mennyiségig, így a limiten belüli kéréslöketek várakozás nélkül
+    indulhatnak; várakozás csak kiürült vödör esetén történik. Több szálból
+    egyszerre is használható.
+    """
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', '_lock')
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Inicializálja a vödröt (teli állapotban).
+        
+        Args:
+            rate: A visszatöltés üteme (token/másodperc)
+            capacity: A vödör mérete (a legnagyobb löket)
+            
+        Raises:
+            ValueError: Ha a ráta vagy a kapacitás nem pozitív
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError(f"Token bucket rate ({rate}) and capacity ({capacity}) must be positive")
+        
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Elvesz a megadott számú tokent, szükség esetén a visszatöltésükig várakozva.
+        
+        Args:
+            tokens: Az elveendő tokenek száma (a kérés súlya)
+            
+        Raises:
+            ValueError: Ha a kérés nagyobb a vödör kapacitásánál (soha nem teljesülne)
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Request of {tokens} tokens exceeds bucket capacity {self.capacity}")
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                
+                wait = (tokens - self.tokens) / self.rate
+            
+            # A várakozás a záron kívül történik, így a többi szál közben is ellenőrizhet
+            time.sleep(wait)
@@ -39,6 +39,14 @@ file_handler.setFormatter(logging.Formatter(
 file_handler.setLevel(logging.INFO)
 app.logger.addHandler(file_handler)
 app.logger.setLevel(logging.INFO)
+app.logger.propagate = False
+
+# A modulok naplózói (logging.getLogger(__name__)) a gyökér naplózón keresztül írnak;
+# a gyökér naplózó csak egyszer kap kezelőt (újratöltéskor sem duplikálódik)
+root_logger = logging.getLogger()
+if not root_logger.handlers:
+    root_logger.addHandler(file_handler)
+    root_logger.setLevel(logging.INFO)
 app.logger.info('Trading System startup')
 
 # Blueprint regisztrálása
@@ -0,0 +1,109 @@
+"""
+Backtest Engine tesztek - FIFO profit/veszteség számítás
+"""
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.backtest_engine import _fifo_profit_loss
+
+def _reference_fifo(is_buy, prices, amounts, commissions):
+    """
+    Soronkénti FIFO referencia (vásárlási tételek sora)
+    
+    Args:
+        is_buy (np.ndarray): Vásárlás-e a kereskedés
+        prices (np.ndarray): Kereskedési árak
+        amounts (np.ndarray): Kereskedési mennyiségek
+        commissions (np.ndarray): Jutalékok
+        
+    Returns:
+        tuple: (profit_loss, profit_loss_pct) tömbök
+    """
+    lots = deque()  # [mennyiség, egységnyi bekerülési érték]
+    profit_loss = np.zeros(len(prices))
+    profit_loss_pct = np.zeros(len(prices))
+    
+    for i in range(len(prices)):
+        if is_buy[i]:
+            if amounts[i] > 0:
+                lots.append([amounts[i], (amounts[i] * prices[i] + commissions[i]) / amounts[i]])
+            continue
+        
+        remaining = amounts[i]
+        cost = 0.0
+        while remaining > 0 and lots:
+            lot = lots[0]
+            take = min(remaining, lot[0])
+            cost += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if lot[0] <= 0:
+                lots.popleft()
+        
+        # A fedezetlen mennyiség az eladási áron kerül be
+        cost += remaining * prices[i]
+        
+        profit_loss[i] = amounts[i] * prices[i] - commissions[i] - cost
+        profit_loss_pct[i] = profit_loss[i] / cost * 100 if cost > 0 else 0.0
+    
+    return profit_loss, profit_loss_pct
+
+def _trades(rows):
+    """
+    Kereskedések tömbökké alakítása
+    
+    Args:
+        rows (list): (oldal, ár, mennyiség, jutalék) sorok
+        
+    Returns:
+        tuple: (is_buy, prices, amounts, commissions) tömbök
+    """
+    is_buy = np.array([side == 'buy' for side, _, _, _ in rows])
+    prices, amounts, commissions = (np.array(column, dtype=float) for column in list(zip(*rows))[1:])
+    return is_buy, prices, amounts, commissions
+
+def test_oversell_does_not_consume_later_lots():
+    trades = _trades([('buy', 100, 1, 0), ('sell', 110, 2, 0), ('buy', 100, 1, 0), ('sell', 120, 1, 0)])
+    
+    profit_loss, _ = _fifo_profit_loss(*trades)
+    
+    assert profit_loss[1] == pytest.approx(10.0)
+    assert profit_loss[3] == pytest.approx(20.0)
+
+def test_sell_without_position_has_no_profit():
+    trades = _trades([('sell', 100, 1, 0), ('buy', 90, 1, 0), ('sell', 95, 1, 0)])
+    
+    profit_loss, profit_loss_pct = _fifo_profit_loss(*trades)
+    
+    assert profit_loss[0] == pytest.approx(0.0)
+    assert profit_loss[2] == pytest.approx(5.0)
+    assert profit_loss_pct[2] == pytest.approx(5.0 / 90 * 100)
+
+def test_no_sells():
+    profit_loss, profit_loss_pct = _fifo_profit_loss(*_trades([('buy', 100, 1, 0.1), ('buy', 101, 2, 0.2)]))
+    
+    assert not profit_loss.any()
+    assert not profit_loss_pct.any()
+
+@pytest.mark.parametrize('seed', range(50))
+@pytest.mark.parametrize('sell_bias', [0.3, 0.5, 0.7])
+def test_matches_reference(seed, sell_bias):
+    rng = np.random.default_rng(seed)
+    n = 60
+    
+    is_buy = rng.random(n) >= sell_bias
+    prices = rng.uniform(50, 150, n)
+    amounts = rng.uniform(0.1, 3.0, n)
+    commissions = amounts * prices * 0.001
+    
+    expected = _reference_fifo(is_buy, prices, amounts, commissions)
+    actual = _fifo_profit_loss(is_buy, prices, amounts, commissions)
+    
+    np.testing.assert_allclose(actual[0], expected[0], rtol=1e-9, atol=1e-8)
+    np.testing.assert_allclose(actual[1], expected[1], rtol=1e-9, atol=1e-8)
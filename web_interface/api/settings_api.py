@@ -190,10 +190,10 @@ def get_system_settings():
         # Rendszer beállítások lekérdezése
         settings = Settings.get_system_settings()
         
-        # Válasz összeállítása
+        # Válasz összeállítása (a beállítások csak olvasható nézetként érkeznek)
         response = {
             'success': True,
-            'data': settings,
+            'data': dict(settings),
             'timestamp': int(time.time())
         }
         